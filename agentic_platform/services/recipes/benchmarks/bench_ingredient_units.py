@@ -0,0 +1,88 @@
+"""
+Micro-benchmark for ingredient quantity/unit normalization.
+
+Replays the recorded LLM ingredient lists plus messier free-form variants
+(string fractions, ranges, unit aliases, amounts embedded in the name)
+through ingredient_units.normalize_ingredients, both one recipe at a time
+(as the scraper step calls it) and as one large batch.
+
+Usage (from services/recipes):
+
+    python benchmarks/bench_ingredient_units.py [--lines 100000] [--output units.json]
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+from fakes import _strip_fences, load_fixtures  # noqa: E402
+from ingredient_units import normalize_ingredients  # noqa: E402
+
+MESSY_LINES = [
+    {"name": "olive oil", "quantity": "1 1/2", "unit": "Tbs."},
+    {"name": "garlic", "quantity": "2-3", "unit": "cloves", "notes": "minced"},
+    {"name": "2 cups all-purpose flour", "quantity": None, "unit": None},
+    {"name": "milk", "quantity": "½", "unit": "cups"},
+    {"name": "chicken thighs", "quantity": 1.5, "unit": "pounds"},
+    {"name": "salt", "quantity": None, "unit": None, "notes": "to taste"},
+    {"name": "butter", "quantity": 4, "unit": "ounces"},
+    {"name": "stock", "quantity": 1, "unit": "quart"},
+]
+
+
+def ingredient_lines(count: int) -> list:
+    _, llm_responses, _ = load_fixtures()
+    recorded = []
+    for response in llm_responses.values():
+        recorded.extend(json.loads(_strip_fences(response))["ingredients"])
+    source = itertools.cycle(recorded + MESSY_LINES)
+    return [dict(next(source)) for _ in range(count)]
+
+
+def lines_per_ms(lines: list, batch_size: int, rounds: int = 3) -> float:
+    """Best of `rounds` passes over fresh copies of `lines`."""
+    best = float("inf")
+    for _ in range(rounds):
+        batches = [
+            copy.deepcopy(lines[i : i + batch_size]) for i in range(0, len(lines), batch_size)
+        ]
+        started = time.perf_counter()
+        for batch in batches:
+            normalize_ingredients(batch)
+        best = min(best, time.perf_counter() - started)
+    return round(len(lines) / (best * 1000), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingredient normalization")
+    parser.add_argument("--lines", type=int, default=100000)
+    parser.add_argument("--recipe-size", type=int, default=12, help="Lines per recipe batch")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    lines = ingredient_lines(args.lines)
+    normalize_ingredients(copy.deepcopy(lines[:100]))  # warm up
+
+    report = {
+        "benchmark": "ingredient_units",
+        "lines": args.lines,
+        "per_recipe_lines_per_ms": lines_per_ms(lines, args.recipe_size),
+        "single_batch_lines_per_ms": lines_per_ms(lines, len(lines)),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Micro-benchmark for streaming page fetch and recipe extraction.
+
+Pads each fixture page with ad/script markup after its JSON-LD block (to
+--page-kb, like a real 1-3 MB recipe page), then measures:
+
+- bytes read by the streaming JsonLdScanner vs. the whole page,
+- extraction time of the JSON-LD fast path vs. a full recipe_scrapers parse.
+
+Usage (from services/recipes):
+
+    python benchmarks/bench_page_extract.py [--page-kb 1500] [--output extract.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from jsonld import JsonLdScanner, extract_recipe  # noqa: E402
+
+AD_BLOCK = (
+    '<div class="ad-slot"><script>window.adq=window.adq||[];adq.push({slot:"%d",'
+    'sizes:[[300,250],[728,90]],targeting:{section:"recipes"}});</script>'
+    '<p>Advertisement</p></div>\n'
+)
+
+
+def padded_page(path: str, page_kb: int) -> bytes:
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    body_at = html.index("<body>") + len("<body>")
+    padding = []
+    size = len(html)
+    slot = 0
+    while size < page_kb * 1024:
+        block = AD_BLOCK % slot
+        padding.append(block)
+        size += len(block)
+        slot += 1
+    return (html[:body_at] + "\n" + "".join(padding) + html[body_at:]).encode()
+
+
+def streamed_bytes(page: bytes, chunk_size: int = 65536) -> int:
+    scanner = JsonLdScanner()
+    for start in range(0, len(page), chunk_size):
+        if scanner.feed(page[start : start + chunk_size]):
+            break
+    return len(scanner.buffer)
+
+
+def best_ms(func, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming fetch and JSON-LD extraction")
+    parser.add_argument("--page-kb", type=int, default=1500)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    from recipe_scrapers import scrape_html
+
+    pages_dir = os.path.join(BENCH_DIR, "fixtures", "pages")
+    report = {"benchmark": "page_extract", "page_kb": args.page_kb, "pages": {}}
+    for filename in sorted(os.listdir(pages_dir)):
+        page = padded_page(os.path.join(pages_dir, filename), args.page_kb)
+        url = f"https://example.com/{filename[:-5]}"
+        html = page.decode()
+        read = streamed_bytes(page)
+        prefix = page[:read].decode()
+        report["pages"][filename] = {
+            "page_bytes": len(page),
+            "streamed_bytes": read,
+            "stream_scan_ms": best_ms(lambda: streamed_bytes(page), args.rounds),
+            "fast_path_ms": best_ms(lambda: extract_recipe(prefix, url), args.rounds),
+            "recipe_scrapers_ms": best_ms(
+                lambda: scrape_html(html=html, org_url=url, wild_mode=True).to_json(),
+                args.rounds,
+            ),
+        }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
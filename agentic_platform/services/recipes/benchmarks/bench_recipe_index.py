@@ -0,0 +1,122 @@
+"""
+Benchmark for the local recipe index (SQLite FTS5).
+
+Fills an index with synthetic recipes (dish x style x protein titles with
+realistic ingredient lists), then times the consumer's coverage check and a
+ranked search for a mix of common and rare queries.
+
+Usage (from services/recipes):
+
+    python benchmarks/bench_recipe_index.py [--recipes 1000000] [--output index.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from recipe_index import RecipeIndex  # noqa: E402
+
+DISHES = ["curry", "stew", "soup", "salad", "tacos", "pasta", "stir fry", "pie", "bake", "skewers",
+          "noodles", "risotto", "casserole", "burger", "wrap", "bowl", "roast", "chili", "fritters", "dumplings"]
+STYLES = ["thai", "indian", "mexican", "italian", "greek", "korean", "moroccan", "cajun", "japanese",
+          "spicy", "smoky", "lemony", "creamy", "garlic", "herby", "sticky", "crispy", "vegan", "rustic", "weeknight"]
+PROTEINS = ["chicken", "beef", "pork", "lamb", "tofu", "chickpea", "lentil", "salmon", "shrimp", "mushroom",
+            "turkey", "cod", "tempeh", "bean", "egg", "halloumi", "duck", "sausage", "paneer", "squid"]
+PANTRY = ["onion", "garlic", "ginger", "olive oil", "butter", "flour", "rice", "tomato", "coconut milk", "stock",
+          "cumin", "paprika", "chili flakes", "lime", "lemon", "cilantro", "parsley", "yogurt", "cream", "cheese",
+          "potato", "carrot", "celery", "spinach", "kale", "soy sauce", "honey", "sugar", "salt", "pepper"]
+
+
+def fill(index: RecipeIndex, count: int, seed: int = 7):
+    rng = random.Random(seed)
+    conn = index._conn
+    batch = []
+    for i in range(count):
+        style, protein, dish = rng.choice(STYLES), rng.choice(PROTEINS), rng.choice(DISHES)
+        title = f"{style.title()} {protein.title()} {dish.title()} #{i}"
+        ingredients = " ".join([protein] + rng.sample(PANTRY, 8))
+        batch.append((f"https://site{i % 5000}.example/{i}", str(i), title, ingredients, f"{protein} {dish}"))
+        if len(batch) == 20000 or i == count - 1:
+            # Bulk load through the same tables add() writes, in large transactions
+            with index._lock:
+                first = conn.execute("SELECT COALESCE(MAX(id), 0) FROM recipes").fetchone()[0] + 1
+                conn.executemany(
+                    "INSERT INTO recipes (source_url, recipe_id, title, ingredients, created_from_query, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?, 0)",
+                    batch,
+                )
+                conn.executemany(
+                    "INSERT INTO recipe_fts (rowid, title, ingredients, created_from_query) VALUES (?, ?, ?, ?)",
+                    [(first + n, title, ingredients, query) for n, (_, _, title, ingredients, query) in enumerate(batch)],
+                )
+                conn.commit()
+            batch = []
+
+
+def percentiles_ms(func, queries, rounds: int) -> dict:
+    samples = []
+    for _ in range(rounds):
+        for query in queries:
+            started = time.perf_counter()
+            func(query)
+            samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "p50_ms": round(1000 * samples[len(samples) // 2], 3),
+        "p99_ms": round(1000 * samples[int(len(samples) * 0.99)], 3),
+        "max_ms": round(1000 * samples[-1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local recipe index")
+    parser.add_argument("--recipes", type=int, default=1000000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="recipe-index-bench-") as tmp:
+        index = RecipeIndex(os.path.join(tmp, "recipe_index.db"))
+        started = time.perf_counter()
+        fill(index, args.recipes)
+        build_seconds = time.perf_counter() - started
+
+        queries = [
+            "chicken curry",            # common: matches ~0.25% of recipes
+            "easy thai chicken curry",  # stop words dropped, three terms
+            "chickpea stew recipe",
+            "korean duck dumplings",
+            "halloumi risotto",
+            "beef wellington",          # no match
+        ]
+        report = {
+            "benchmark": "recipe_index",
+            "recipes": args.recipes,
+            "build_seconds": round(build_seconds, 1),
+            "db_mb": round(os.path.getsize(index.path) / 1e6, 1),
+            "count_matches": percentiles_ms(lambda q: index.count_matches(q, 10), queries, args.rounds),
+            "search": percentiles_ms(lambda q: index.search(q, 10), queries, args.rounds),
+            "add": percentiles_ms(
+                lambda q: index.add(f"https://new.example/{q}", q.title(), ["onion", "garlic"], q),
+                queries,
+                1,
+            ),
+        }
+        index.close()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Micro-benchmark: pydantic models vs. generated transport structs.
+
+Measures encode, decode and validate throughput (operations/sec) for
+MetricsEvent and Recipe, using the recorded LLM fixtures for recipe data.
+
+Usage (from services/recipes):
+
+    python benchmarks/bench_structs.py [--iterations 20000] [--output structs.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+import structs  # noqa: E402
+from event_models import MetricsEvent  # noqa: E402
+from fakes import _strip_fences, load_fixtures  # noqa: E402
+from models import Recipe  # noqa: E402
+
+
+def ops_per_sec(func, iterations: int, rounds: int = 3) -> float:
+    """Best of `rounds` timed loops, to damp scheduler noise."""
+    func()  # warm up caches outside the measurement
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        best = min(best, time.perf_counter() - started)
+    return round(iterations / best, 1)
+
+
+def sample_recipe() -> dict:
+    _, llm_responses, _ = load_fixtures()
+    parsed = json.loads(_strip_fences(next(iter(sorted(llm_responses.items())))[1]))
+    recipe = parsed["recipe"]
+    recipe["source_url"] = recipe["source_url"].replace("{url}", "https://example.com/recipe")
+    recipe["ingredients"] = [
+        ingredient
+        for ingredient in parsed["ingredients"]
+        if ingredient.get("quantity") is not None or ingredient.get("unit") is not None
+    ]
+    return recipe
+
+
+def sample_metrics_event() -> dict:
+    return {
+        "event_type": "recipe_workflow_full.status",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "duration": 1.25,
+        "metadata": {
+            "workflow_id": "0b6d3a4e-8a57-4d0e-9d1c-2f7c1f0e5a11",
+            "status": "recipe_scraping_completed",
+            "current_step": "recipe_scraping",
+        },
+    }
+
+
+def compare(name: str, pydantic_cls, struct_cls, data: dict, iterations: int) -> dict:
+    raw = json.dumps(data).encode()
+    model = pydantic_cls.model_validate(data)
+    struct = struct_cls.from_dict(data)
+
+    results = {
+        "pydantic": {
+            "encode": ops_per_sec(model.model_dump_json, iterations),
+            "decode": ops_per_sec(lambda: pydantic_cls.model_validate_json(raw), iterations),
+            "validate": ops_per_sec(lambda: pydantic_cls.model_validate(data), iterations),
+        },
+        "struct": {
+            "encode": ops_per_sec(struct.encode, iterations),
+            "decode": ops_per_sec(lambda: struct_cls.decode(raw), iterations),
+            "validate": ops_per_sec(struct.validate, iterations),
+        },
+    }
+    results["speedup"] = {
+        operation: round(results["struct"][operation] / results["pydantic"][operation], 2)
+        for operation in results["struct"]
+    }
+    return {name: results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pydantic models vs. generated structs")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = {"benchmark": "structs", "iterations": args.iterations}
+    report.update(
+        compare("MetricsEvent", MetricsEvent, structs.MetricsEvent, sample_metrics_event(), args.iterations)
+    )
+    report.update(compare("Recipe", Recipe, structs.Recipe, sample_recipe(), args.iterations))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
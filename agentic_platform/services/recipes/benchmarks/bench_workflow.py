@@ -0,0 +1,274 @@
+"""
+Offline benchmark for the full recipe workflow.
+
+Replays recorded search results, HTML pages and LLM responses through the
+real WorkflowOrchestrator and RecipeScraperWorkflowStep, with an in-memory
+broker and a local fake Pantry Chef API. No external network is used.
+
+Usage (from services/recipes):
+
+    python benchmarks/bench_workflow.py --workflows 200 --concurrency 8 \
+        --output bench.json [--compare baseline.json --max-regression 0.15]
+
+The report is JSON: workflows/sec, per-stage latency percentiles (ms),
+peak RSS and allocation counts from a separate tracemalloc pass. With
+--soak-workflows, RSS is also sampled over a longer run to check that it
+stays flat once warm.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+# Keep checkpoints, caches, the near-duplicate index and domain stats of earlier runs out of the measurement
+os.environ.setdefault("RECIPE_STATE_DIR", tempfile.mkdtemp(prefix="recipe-bench-"))
+# The fixtures re-serve the same few pages, so the recipe index would skip every
+# workflow after the warm-up; measure the full pipeline instead
+os.environ.setdefault("RECIPE_INDEX_ENABLED", "false")
+
+from fakes import (  # noqa: E402
+    FakeConnection,
+    FakeModel,
+    FakeSearch,
+    FixtureServer,
+    load_fixtures,
+)
+
+
+def build_orchestrator(model, search, connection):
+    import workflow_orchestrator
+    from recipe_scraper_step import RecipeScraperWorkflowStep
+
+    workflow_orchestrator.search_recipes = search
+    orchestrator = workflow_orchestrator.WorkflowOrchestrator()
+    orchestrator.scraperStep = RecipeScraperWorkflowStep(model)
+    orchestrator.connection = connection
+    orchestrator.channel = connection._channel
+    return orchestrator
+
+
+async def run_workflows(orchestrator, queries, count: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    query_cycle = itertools.cycle(queries)
+
+    async def run_one(query):
+        async with semaphore:
+            await orchestrator.initiate_workflow(
+                "recipe_workflow_full",
+                {"search_query": query, "excluded_domains": [], "number_of_urls": 3},
+            )
+
+    await asyncio.gather(*(run_one(next(query_cycle)) for _ in range(count)))
+
+
+async def soak(orchestrator, queries, count: int, concurrency: int, samples: int = 10) -> dict:
+    """
+    Runs `count` workflows in `samples` batches and samples RSS after each;
+    once warm, a leak shows up as RSS that keeps growing batch after batch.
+    """
+    from memory import memory_accounting, rss_bytes
+
+    batch = max(1, count // samples)
+    rss_mb = []
+    for _ in range(samples):
+        await run_workflows(orchestrator, queries, batch, concurrency)
+        rss_mb.append(round(rss_bytes() / 2**20, 2))
+    settled = rss_mb[len(rss_mb) // 2 :]
+    return {
+        "workflows": batch * samples,
+        "rss_mb": rss_mb,
+        # Growth over the second half of the run, after caches have filled
+        "steady_state_growth_mb": round(settled[-1] - settled[0], 2),
+        "workflow_instances": len(orchestrator.workflow_instances),
+        "held_bytes_after": memory_accounting.snapshot()["held_bytes"],
+    }
+
+
+def logging_report(before: dict, after: dict, workflows: int) -> dict:
+    """Log volume and calling-thread cost per workflow (with --structured-logging)."""
+    if not after:
+        return {}
+    delta = {key: after[key] - before.get(key, 0) for key in after if key != "queued"}
+    return {
+        **delta,
+        "records_per_workflow": round(delta["enqueued"] / workflows, 2),
+        "caller_us_per_workflow": round(1e6 * delta["caller_seconds"] / workflows, 1),
+    }
+
+
+def stage_report(snapshot: dict) -> dict:
+    return {
+        stage: {
+            "count": values["count"],
+            "mean_ms": round(1000 * values["total"] / values["count"], 3),
+            "p50_ms": round(1000 * values["p50"], 3),
+            "p95_ms": round(1000 * values["p95"], 3),
+            "p99_ms": round(1000 * values["p99"], 3),
+            "max_ms": round(1000 * values["max"], 3),
+        }
+        for stage, values in sorted(snapshot.items())
+        if values["count"]
+    }
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list:
+    """Returns human-readable regressions of `report` against `baseline`."""
+    regressions = []
+    base_rate = baseline.get("workflows_per_sec", 0)
+    if base_rate and report["workflows_per_sec"] < base_rate * (1 - max_regression):
+        regressions.append(
+            f"workflows_per_sec {report['workflows_per_sec']} < baseline {base_rate}"
+        )
+    for stage, values in report["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if base and base["p95_ms"] and values["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            regressions.append(
+                f"{stage} p95 {values['p95_ms']}ms > baseline {base['p95_ms']}ms"
+            )
+    return regressions
+
+
+async def main(args) -> dict:
+    from log_config import logging_stats
+    from profiling import stage_timings
+
+    pages, llm_responses, search_results = load_fixtures()
+    server = FixtureServer(
+        pages, page_padding_bytes=args.page_padding_kb * 1024, latency=args.fetch_latency
+    )
+    server.start()
+
+    token_file = tempfile.NamedTemporaryFile("w", suffix=".token", delete=False)
+    token_file.write("benchmark-token")
+    token_file.close()
+    os.environ["PANTRY_CHEF_API_URL"] = server.base_url
+    os.environ["SERVICE_ACCOUNT_TOKEN_PATH"] = token_file.name
+
+    model = FakeModel(llm_responses, latency=args.llm_latency)
+    search = FakeSearch(search_results, server)
+    connection = FakeConnection()
+    orchestrator = build_orchestrator(model, search, connection)
+    queries = list(search_results)
+
+    try:
+        # Warm up imports, connection pools and caches outside the measurement.
+        await run_workflows(orchestrator, queries, min(args.warmup, args.workflows), args.concurrency)
+        stage_timings.reset()
+        saved_before, llm_before = server.saved_recipes, model.calls
+        connection._channel.published_count = 0
+
+        logs_before = logging_stats()
+        started = time.perf_counter()
+        await run_workflows(orchestrator, queries, args.workflows, args.concurrency)
+        wall = time.perf_counter() - started
+        logs = logging_report(logs_before, logging_stats(), args.workflows)
+        stages = stage_report(stage_timings.snapshot())
+        recipes_saved = server.saved_recipes - saved_before
+        llm_calls = model.calls - llm_before
+        metrics_published = connection._channel.published_count
+
+        soak_report = {}
+        if args.soak_workflows:
+            soak_report = await soak(orchestrator, queries, args.soak_workflows, args.concurrency)
+
+        allocations = {}
+        if args.alloc_workflows:
+            tracemalloc.start()
+            await run_workflows(orchestrator, queries, args.alloc_workflows, args.concurrency)
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            stats = snapshot.statistics("filename")
+            allocations = {
+                "workflows": args.alloc_workflows,
+                "peak_traced_bytes": peak,
+                "live_blocks": sum(stat.count for stat in stats),
+                "live_bytes": sum(stat.size for stat in stats),
+                "top_files": [
+                    {"file": str(stat.traceback), "bytes": stat.size, "blocks": stat.count}
+                    for stat in stats[:5]
+                ],
+            }
+    finally:
+        server.stop()
+        os.unlink(token_file.name)
+
+    return {
+        "benchmark": "recipe_workflow_full",
+        "config": {
+            "workflows": args.workflows,
+            "concurrency": args.concurrency,
+            "page_padding_kb": args.page_padding_kb,
+            "fetch_latency": args.fetch_latency,
+            "llm_latency": args.llm_latency,
+        },
+        "wall_seconds": round(wall, 4),
+        "workflows_per_sec": round(args.workflows / wall, 3),
+        "recipes_saved": recipes_saved,
+        "llm_calls": llm_calls,
+        "metrics_published": metrics_published,
+        "stages": stages,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2),
+        "allocations": allocations,
+        "soak": soak_report,
+        "logging": logs,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workflows", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--alloc-workflows", type=int, default=10,
+                        help="Workflows to run under tracemalloc (0 disables)")
+    parser.add_argument("--soak-workflows", type=int, default=0,
+                        help="Extra workflows run while sampling RSS (0 disables)")
+    parser.add_argument("--page-padding-kb", type=int, default=256,
+                        help="Script filler appended to each page")
+    parser.add_argument("--fetch-latency", type=float, default=0.0)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--structured-logging", action="store_true",
+                        help="Log through the service's queue handler (to /dev/null) and report its cost")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.structured_logging:
+        from log_config import configure_logging
+
+        os.environ["LOG_LEVEL"] = args.log_level
+        configure_logging(stream=open(os.devnull, "w"))
+    else:
+        logging.basicConfig(level=args.log_level)
+    report = asyncio.run(main(args))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
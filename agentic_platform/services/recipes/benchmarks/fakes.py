@@ -0,0 +1,499 @@
+"""
+Offline stand-ins for the recipe service's external dependencies.
+
+Everything here replays the recorded fixtures in ./fixtures so that the
+real WorkflowOrchestrator / RecipeScraperWorkflowStep code paths can run
+with no network access:
+
+- FixtureServer: local HTTP server serving recorded recipe pages and a
+  fake Pantry Chef API (POST /api/v1/internal/recipes,
+  GET /api/v1/internal/ingredients).
+- FakeModel: replays recorded LLM responses.
+- FakeSearch: replays recorded search results.
+- FakeConnection / FakeChannel: in-memory aio_pika stand-ins that count
+  published messages.
+- InMemoryBroker: a routing in-memory stand-in for RabbitMQ (queues,
+  consumers with prefetch, ack/nack, passive declares), for running the
+  real consumers offline.
+- LatencyDistribution: tunable stub latencies ("lognormal:0.8,0.6").
+
+Latencies may be a number of seconds or a zero-argument callable returning one.
+"""
+
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+Latency = Union[float, Callable[[], float]]
+
+
+class LatencyDistribution:
+    """
+    Random stub latency in seconds, parsed from "kind:params":
+
+    - fixed:0.2
+    - uniform:0.1,0.5 (low, high)
+    - exp:0.3 (mean)
+    - lognormal:0.8,0.6 (median, sigma) - long-tailed, like LLM calls
+    """
+
+    def __init__(self, spec: str, seed: Optional[int] = None):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(param) for param in params.split(",") if param]
+        self._random = random.Random(seed)
+        if kind not in ("fixed", "uniform", "exp", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def __call__(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self._random.uniform(self.params[0], self.params[1])
+        if self.kind == "exp":
+            return self._random.expovariate(1.0 / self.params[0]) if self.params[0] else 0.0
+        median, sigma = self.params
+        return self._random.lognormvariate(math.log(median), sigma) if median else 0.0
+
+    def __repr__(self) -> str:
+        return self.spec
+
+
+def _delay(latency: Latency) -> float:
+    return latency() if callable(latency) else latency
+
+
+def load_fixtures(fixtures_dir: str = FIXTURES_DIR) -> Tuple[Dict, Dict, Dict]:
+    """Returns (pages, llm_responses, search_results) keyed by fixture slug / query."""
+    pages = {}
+    for name in os.listdir(os.path.join(fixtures_dir, "pages")):
+        with open(os.path.join(fixtures_dir, "pages", name)) as f:
+            pages[os.path.splitext(name)[0]] = f.read()
+
+    llm_responses = {}
+    for name in os.listdir(os.path.join(fixtures_dir, "llm_responses")):
+        with open(os.path.join(fixtures_dir, "llm_responses", name)) as f:
+            llm_responses[os.path.splitext(name)[0]] = f.read()
+
+    with open(os.path.join(fixtures_dir, "search_results.json")) as f:
+        search_results = json.load(f)
+
+    return pages, llm_responses, search_results
+
+
+class _FixtureHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def handle_error(self, request, client_address):
+        # Streaming fetches hang up once the JSON-LD block has arrived
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class FixtureServer:
+    """
+    Threaded local HTTP server for recorded pages and the fake recipes API.
+
+    `page_padding_bytes` appends inert script filler to every page to mimic
+    the ad/script weight of real recipe sites.
+    """
+
+    def __init__(
+        self,
+        pages: Dict[str, str],
+        page_padding_bytes: int = 0,
+        latency: Latency = 0.0,
+        api_latency: Latency = 0.0,
+    ):
+        self.pages = pages
+        self.page_padding = (
+            "<script>/*" + "x" * page_padding_bytes + "*/</script>"
+            if page_padding_bytes
+            else ""
+        )
+        self.latency = latency
+        self.api_latency = api_latency
+        self.saved_recipes = 0
+        self._lock = threading.Lock()
+        self._server = _FixtureHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def page_url(self, slug: str) -> str:
+        return f"{self.base_url}/pages/{slug}"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        fixture_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/api/v1/internal/ingredients":
+                    time.sleep(_delay(fixture_server.api_latency))
+                    body = json.dumps({"data": {"ingredients": [], "count": 0}}).encode()
+                    self._respond(200, body, "application/json")
+                    return
+                time.sleep(_delay(fixture_server.latency))
+                slug = self.path.rstrip("/").split("/")[-1]
+                page = fixture_server.pages.get(slug)
+                if not self.path.startswith("/pages/") or page is None:
+                    self._respond(404, b"not found", "text/plain")
+                    return
+                body = page.replace("</body>", fixture_server.page_padding + "</body>")
+                self._respond(200, body.encode(), "text/html; charset=utf-8")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(length)
+                time.sleep(_delay(fixture_server.api_latency))
+                if self.path != "/api/v1/internal/recipes":
+                    self._respond(404, b"not found", "text/plain")
+                    return
+                with fixture_server._lock:
+                    fixture_server.saved_recipes += 1
+                body = json.dumps({"id": str(uuid.uuid4())}).encode()
+                self._respond(201, body, "application/json")
+
+            def _respond(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+class _FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """
+    Replays recorded LLM responses, matched on the recipe title in the prompt.
+    """
+
+    _canonical_url = re.compile(r"'canonical_url': '([^']+)'")
+
+    def __init__(self, llm_responses: Dict[str, str], latency: Latency = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self._by_title = {}
+        for response in llm_responses.values():
+            title = json.loads(_strip_fences(response))["recipe"]["title"]
+            self._by_title[title] = response
+
+    def _respond(self, prompt: str) -> _FakeResponse:
+        self.calls += 1
+        url_match = self._canonical_url.search(prompt)
+        url = url_match.group(1) if url_match else ""
+        for title, response in self._by_title.items():
+            if f"'title': '{title}'" in prompt:
+                return _FakeResponse(response.replace("{url}", url))
+        return _FakeResponse("not json")
+
+    def generate_content(self, prompt: str) -> _FakeResponse:
+        time.sleep(_delay(self.latency))
+        return self._respond(prompt)
+
+
+def _strip_fences(text: str) -> str:
+    return text.replace("```json\n", "").replace("\n```", "")
+
+
+class FakeSearch:
+    """
+    Replays recorded search results, returning fixture page URLs. With
+    `any_query`, unknown queries get the results of a recorded query chosen
+    by hash, so synthetic queries still run the full workflow.
+    """
+
+    def __init__(
+        self,
+        search_results: Dict[str, List[str]],
+        server: FixtureServer,
+        latency: Latency = 0.0,
+        any_query: bool = False,
+    ):
+        self.search_results = search_results
+        self.server = server
+        self.latency = latency
+        self.any_query = any_query
+        self._recorded = sorted(search_results)
+        self.calls = 0
+
+    def __call__(
+        self,
+        search_query: str,
+        excluded_domains: Optional[List[str]] = None,
+        num_urls: int = 10,
+        **kwargs,
+    ):
+        from event_models import MetricsEvent
+
+        self.calls += 1
+        time.sleep(_delay(self.latency))
+        slugs = self.search_results.get(search_query)
+        if slugs is None and self.any_query:
+            slugs = self.search_results[self._recorded[zlib.crc32(search_query.encode()) % len(self._recorded)]]
+        slugs = (slugs or [])[:num_urls]
+        urls = [self.server.page_url(slug) for slug in slugs]
+        metrics_event = MetricsEvent(
+            event_type="recipe_search.duration",
+            duration=0.0,
+            timestamp=datetime.utcnow(),
+            metadata={"search_query": search_query, "attempts": 1},
+        )
+        return urls, metrics_event
+
+
+class FakeExchange:
+    def __init__(self, broker: "FakeChannel"):
+        self.broker = broker
+
+    async def publish(self, message, routing_key: str, **kwargs):
+        self.broker.published_count += 1
+        self.broker.published.append((routing_key, message.body))
+
+
+class FakeChannel:
+    """
+    In-memory aio_pika channel stand-in counting published messages and
+    keeping the most recent ones for inspection.
+    """
+
+    def __init__(self, keep_last: int = 1000):
+        self.published_count = 0
+        self.published = deque(maxlen=keep_last)
+        self.is_closed = False
+        self.default_exchange = FakeExchange(self)
+
+    async def close(self):
+        self.is_closed = True
+
+
+class FakeConnection:
+    def __init__(self, channel: Optional[FakeChannel] = None):
+        self._channel = channel or FakeChannel()
+        self.is_closed = False
+
+    async def channel(self) -> FakeChannel:
+        return self._channel
+
+    async def close(self):
+        self.is_closed = True
+
+
+class _DeclarationResult:
+    def __init__(self, message_count: int):
+        self.message_count = message_count
+
+
+class MemoryMessage:
+    """Delivered message with the aio_pika IncomingMessage surface the consumers use."""
+
+    _tags = itertools.count(1)
+
+    def __init__(self, queue: "MemoryQueue", message: Any, consumer_tag: str):
+        self._queue = queue
+        self._message = message
+        self._consumer_tag = consumer_tag
+        self._settled = False
+        self.body = message.body
+        self.headers = dict(message.headers or {})
+        self.content_type = message.content_type
+        self.correlation_id = message.correlation_id
+        self.message_id = message.message_id
+        self.routing_key = queue.name
+        self.delivery_tag = next(self._tags)
+
+    async def ack(self):
+        self._queue._settle(self)
+
+    async def nack(self, requeue: bool = True):
+        if not self._settled and requeue:
+            self._queue._put(self._message)
+        self._queue._settle(self)
+
+    async def reject(self, requeue: bool = False):
+        await self.nack(requeue=requeue)
+
+
+class MemoryQueue:
+    """A queue delivering round-robin to its consumers, bounded by each channel's prefetch."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._messages: deque = deque()
+        self._consumers: Dict[str, Tuple[Callable, Optional["MemoryChannel"]]] = {}
+        self._unacked: Dict[str, set] = {}
+        self._ready = asyncio.Event()
+        self._pump_task: Optional[asyncio.Task] = None
+        self._turn = 0
+
+    @property
+    def message_count(self) -> int:
+        return len(self._messages)
+
+    def _put(self, message: Any):
+        self._messages.append(message)
+        self._ready.set()
+
+    def _settle(self, delivery: MemoryMessage):
+        if not delivery._settled:
+            delivery._settled = True
+            self._unacked.get(delivery._consumer_tag, set()).discard(delivery)
+            self._ready.set()
+
+    def _has_capacity(self, tag: str) -> bool:
+        channel = self._consumers[tag][1]
+        prefetch = channel.prefetch_count if channel is not None else 0
+        return not prefetch or len(self._unacked[tag]) < prefetch
+
+    def _next_consumer(self) -> Optional[str]:
+        tags = list(self._consumers)
+        for offset in range(len(tags)):
+            tag = tags[(self._turn + offset) % len(tags)]
+            if self._has_capacity(tag):
+                self._turn += offset + 1
+                return tag
+        return None
+
+    async def consume(self, callback: Callable, channel: Optional["MemoryChannel"] = None) -> str:
+        tag = f"ctag-{uuid.uuid4().hex[:8]}"
+        self._consumers[tag] = (callback, channel)
+        self._unacked[tag] = set()
+        if self._pump_task is None:
+            self._pump_task = asyncio.create_task(self._pump())
+        self._ready.set()
+        return tag
+
+    async def cancel(self, consumer_tag: str):
+        self._consumers.pop(consumer_tag, None)
+
+    async def _pump(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self._messages and self._consumers:
+                tag = self._next_consumer()
+                if tag is None:
+                    break
+                delivery = MemoryMessage(self, self._messages.popleft(), tag)
+                self._unacked[tag].add(delivery)
+                asyncio.create_task(self._consumers[tag][0](delivery))
+
+
+class MemoryExchange:
+    def __init__(self, broker: "InMemoryBroker"):
+        self.broker = broker
+
+    async def publish(self, message: Any, routing_key: str, **kwargs):
+        self.broker.publish(message, routing_key)
+
+
+class MemoryChannel:
+    def __init__(self, broker: "InMemoryBroker"):
+        self.broker = broker
+        self.prefetch_count = 0
+        self.is_closed = False
+        self.default_exchange = MemoryExchange(broker)
+
+    async def set_qos(self, prefetch_count: int = 0, **kwargs):
+        self.prefetch_count = prefetch_count
+
+    async def declare_queue(self, name: str, passive: bool = False, **kwargs) -> "_BoundQueue":
+        if passive and name not in self.broker.queues:
+            raise LookupError(f"Queue {name} does not exist")
+        return _BoundQueue(self.broker.queue(name), self)
+
+    async def get_queue(self, name: str, **kwargs) -> "_BoundQueue":
+        return await self.declare_queue(name, passive=True)
+
+    async def close(self):
+        self.is_closed = True
+
+
+class _BoundQueue:
+    """A queue as seen through one channel (its consumers get the channel's prefetch)."""
+
+    def __init__(self, queue: MemoryQueue, channel: MemoryChannel):
+        self._queue = queue
+        self._channel = channel
+        self.name = queue.name
+        self.declaration_result = _DeclarationResult(queue.message_count)
+
+    async def consume(self, callback: Callable, **kwargs) -> str:
+        return await self._queue.consume(callback, self._channel)
+
+    async def cancel(self, consumer_tag: str, **kwargs):
+        await self._queue.cancel(consumer_tag)
+
+
+class MemoryConnection:
+    def __init__(self, broker: "InMemoryBroker"):
+        self.broker = broker
+        self.is_closed = False
+
+    async def channel(self, **kwargs) -> MemoryChannel:
+        return MemoryChannel(self.broker)
+
+    async def close(self):
+        self.is_closed = True
+
+
+class InMemoryBroker:
+    """
+    In-process stand-in for RabbitMQ: default-exchange routing to named
+    queues, consumer prefetch, ack/nack with requeue and passive declares
+    reporting depth. Queue arguments (TTLs, dead-lettering, length limits)
+    are ignored. Install it with `aio_pika.connect = broker.connect`.
+    """
+
+    def __init__(self):
+        self.queues: Dict[str, MemoryQueue] = {}
+
+    def queue(self, name: str) -> MemoryQueue:
+        if name not in self.queues:
+            self.queues[name] = MemoryQueue(name)
+        return self.queues[name]
+
+    def publish(self, message: Any, routing_key: str):
+        # Like the default exchange, messages for undeclared queues are dropped
+        queue = self.queues.get(routing_key)
+        if queue is not None:
+            queue._put(message)
+
+    async def connect(self, *args, **kwargs) -> MemoryConnection:
+        return MemoryConnection(self)
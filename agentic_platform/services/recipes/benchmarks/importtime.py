@@ -0,0 +1,75 @@
+"""
+Import-time budget check for the service entry point.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter from
+src/, reports the cumulative import time and the slowest top-level imports
+as JSON, and exits non-zero when the budget is exceeded.
+
+    python benchmarks/importtime.py --module workflow_consumer --budget-ms 600
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# Modules that must only be imported lazily (on first use), never at startup.
+LAZY_MODULES = [
+    "google.generativeai",
+    "recipe_scrapers",
+    "duckduckgo_search",
+    "requests",
+    "pika",
+    "numpy",
+]
+
+
+def measure(module: str) -> dict:
+    probe = (
+        f"import sys, json, {module}; "
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            imports.append((name.rstrip(), int(cumulative)))
+
+    top_level = [(name.strip(), us) for name, us in imports if not name.startswith("  ")]
+    total_us = next((us for name, us in top_level if name == module), 0)
+    return {
+        "module": module,
+        "total_ms": round(total_us / 1000, 1),
+        "slowest_imports_ms": {
+            name.strip(): round(us / 1000, 1)
+            for name, us in sorted(imports, key=lambda item: -item[1])[:15]
+        },
+        "eagerly_imported_lazy_modules": json.loads(result.stdout.strip() or "[]"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="workflow_consumer")
+    parser.add_argument("--budget-ms", type=float, default=600)
+    args = parser.parse_args()
+
+    report = measure(args.module)
+    report["budget_ms"] = args.budget_ms
+    print(json.dumps(report, indent=2))
+
+    if report["eagerly_imported_lazy_modules"] or report["total_ms"] > args.budget_ms:
+        sys.exit(1)
@@ -0,0 +1,390 @@
+"""
+Broker-level load generator and end-to-end latency harness.
+
+Runs the real RecipeConsumer and MetricsConsumer in-process against a
+broker, with search, LLM, page fetches and the Pantry Chef API stubbed by
+the benchmark fakes at tunable latency distributions. Then, per
+configuration (offered rate), it:
+
+- publishes WorkflowInitiateMessages at the offered rate (constant or
+  Poisson arrivals, interactive/batch mix, a share of repeated queries)
+  and synthetic MetricsEvents at --metrics-rate, each stamped with its send
+  time (x-sent-at header),
+- consumes the workflow status events the orchestrator publishes
+  (_publish_metrics) and correlates them to sends by workflow_id
+  (coalesced and index-served requests included),
+- reports completion throughput, end-to-end latency percentiles and the
+  backlog left, plus the saturation throughput across configurations.
+
+The orchestrator's status events are routed to a private queue so the
+harness, not the service's MetricsConsumer, sees them.
+
+Usage (from services/recipes):
+
+    python benchmarks/loadgen.py --rates 2,4,8,16 --duration 30 \\
+        --llm-latency lognormal:1.5,0.5 --search-latency lognormal:0.8,0.4 \\
+        --output load.json
+
+--broker rabbitmq (default) uses RABBITMQ_HOST/PORT/USER/PASSWORD like the
+service; --broker memory runs on an in-process broker with no RabbitMQ.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+os.environ.setdefault("RECIPE_STATE_DIR", tempfile.mkdtemp(prefix="recipe-loadgen-"))
+# The fixtures re-serve the same few pages; measure full workflows
+os.environ.setdefault("RECIPE_INDEX_ENABLED", "false")
+os.environ.setdefault("ADMIN_SERVER_ENABLED", "false")
+
+from fakes import (  # noqa: E402
+    FakeModel,
+    FakeSearch,
+    FixtureServer,
+    InMemoryBroker,
+    LatencyDistribution,
+    load_fixtures,
+)
+
+SENT_AT_HEADER = "x-sent-at"
+TERMINAL_STATUSES = {"completed", "failed", "deadline_exceeded"}
+
+
+def percentiles_ms(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    samples = sorted(samples)
+
+    def at(fraction: float) -> float:
+        return round(1000 * samples[min(len(samples) - 1, int(fraction * len(samples)))], 1)
+
+    return {"p50_ms": at(0.50), "p95_ms": at(0.95), "p99_ms": at(0.99), "max_ms": round(1000 * samples[-1], 1)}
+
+
+class LatencyCollector:
+    """
+    Correlates workflow status events with sends by workflow_id and keeps
+    end-to-end latencies (send to terminal status) per outcome.
+    """
+
+    def __init__(self):
+        self.sent: Dict[str, float] = {}
+        self.done: Dict[str, float] = {}
+        self.outcomes: Dict[str, str] = {}
+        self.first_sent: Optional[float] = None
+        self.last_done: Optional[float] = None
+        self.events = 0
+
+    def record_send(self, workflow_id: str, sent_at: float):
+        self.sent[workflow_id] = sent_at
+        if self.first_sent is None:
+            self.first_sent = sent_at
+
+    def record_event(self, event: dict, received_at: float):
+        self.events += 1
+        event_type = event.get("event_type", "")
+        metadata = event.get("metadata") or {}
+        if event_type.endswith(".status") and metadata.get("status") in TERMINAL_STATUSES:
+            self._finish(metadata.get("workflow_id"), metadata["status"], received_at)
+        elif event_type == "workflow.coalesced":
+            self._finish(metadata.get("request_workflow_id"), f"coalesced_{metadata.get('role')}", received_at)
+        elif event_type == "workflow.served_from_index":
+            self._finish(metadata.get("workflow_id"), "served_from_index", received_at)
+
+    def _finish(self, workflow_id: Optional[str], outcome: str, received_at: float):
+        if workflow_id not in self.sent or workflow_id in self.done:
+            return
+        self.done[workflow_id] = received_at
+        self.outcomes[workflow_id] = outcome
+        self.last_done = received_at
+
+    @property
+    def pending(self) -> int:
+        return len(self.sent) - len(self.done)
+
+    def report(self) -> dict:
+        latencies = [self.done[workflow_id] - self.sent[workflow_id] for workflow_id in self.done]
+        by_outcome: Dict[str, int] = {}
+        for outcome in self.outcomes.values():
+            by_outcome[outcome] = by_outcome.get(outcome, 0) + 1
+        span = (self.last_done - self.first_sent) if self.done else 0.0
+        return {
+            "sent": len(self.sent),
+            "finished": len(self.done),
+            "unfinished": self.pending,
+            "outcomes": by_outcome,
+            "throughput_per_sec": round(len(self.done) / span, 3) if span else 0.0,
+            "latency": percentiles_ms(latencies),
+        }
+
+
+class LoadGenerator:
+    def __init__(self, args, status_queue: str):
+        self.args = args
+        self.status_queue = status_queue
+        self.random = random.Random(args.seed)
+        self.queries = list(load_fixtures()[2])
+        self.connection = None
+        self.channel = None
+
+    async def connect(self):
+        import aio_pika
+
+        self.connection = await aio_pika.connect(
+            host=os.environ.get("RABBITMQ_HOST", "localhost"),
+            port=int(os.environ.get("RABBITMQ_PORT", 5672)),
+            login=os.environ.get("RABBITMQ_USER", "guest"),
+            password=os.environ.get("RABBITMQ_PASSWORD", "guest"),
+        )
+        self.channel = await self.connection.channel()
+        queue = await self.channel.declare_queue(self.status_queue, auto_delete=True)
+        return queue
+
+    def _query(self) -> str:
+        query = self.random.choice(self.queries)
+        if self.random.random() < self.args.repeat_fraction:
+            return query  # repeated queries exercise coalescing and caches
+        # A distinct word keeps the query out of other requests' coalescing group
+        return f"{query} v{self.random.getrandbits(32):08x}"
+
+    def _interval(self, rate: float) -> float:
+        if self.args.arrivals == "poisson":
+            return self.random.expovariate(rate)
+        return 1.0 / rate
+
+    async def publish_workflows(self, collector: LatencyCollector, rate: float):
+        import aio_pika
+
+        routing_key = os.environ.get("WORKFLOW_MESSAGES_QUEUE_NAME", "workflow_messages")
+        started = time.monotonic()
+        next_at = started
+        while next_at - started < self.args.duration:
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+            workflow_id = str(uuid.uuid4())
+            body = {
+                "workflow_id": workflow_id,
+                "workflow_type": "recipe_workflow_full",
+                "workflow_payload": {
+                    "search_query": self._query(),
+                    "excluded_domains": [],
+                    "number_of_urls": self.args.urls,
+                },
+                "priority": "batch" if self.random.random() < self.args.batch_fraction else "interactive",
+            }
+            sent_at = time.time()
+            collector.record_send(workflow_id, sent_at)
+            await self.channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=json.dumps(body).encode(),
+                    headers={SENT_AT_HEADER: sent_at},
+                    content_type="application/json",
+                ),
+                routing_key=routing_key,
+            )
+            next_at += self._interval(rate)
+
+    async def publish_metrics_events(self, rate: float):
+        import aio_pika
+
+        if rate <= 0:
+            return
+        routing_key = os.environ.get("METRICS_QUEUE_NAME", "metrics_queue")
+        started = time.monotonic()
+        next_at = started
+        while next_at - started < self.args.duration:
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+            sent_at = time.time()
+            event = {
+                "event_type": "loadgen.synthetic",
+                "duration": self.random.random(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "metadata": {"sent_at": sent_at},
+            }
+            await self.channel.default_exchange.publish(
+                aio_pika.Message(body=json.dumps(event).encode(), headers={SENT_AT_HEADER: sent_at}),
+                routing_key=routing_key,
+            )
+            next_at += self._interval(rate)
+
+
+async def start_service(args, status_queue: str, server: FixtureServer, llm_responses, search_results):
+    """The real consumers, with the orchestrator wired to the stub backends."""
+    import aio_pika
+    import workflow_orchestrator
+    from metrics_consumer import MetricsConsumer
+    from recipe_consumer import RecipeConsumer
+    from recipe_scraper_step import RecipeScraperWorkflowStep
+
+    model = FakeModel(llm_responses, latency=LatencyDistribution(args.llm_latency, args.seed))
+    workflow_orchestrator.search_recipes = FakeSearch(
+        search_results, server, latency=LatencyDistribution(args.search_latency, args.seed), any_query=True
+    )
+    orchestrator = workflow_orchestrator.WorkflowOrchestrator()
+    orchestrator.scraperStep = RecipeScraperWorkflowStep(model)
+    orchestrator.metrics_queue_name = status_queue
+    orchestrator.connection = await aio_pika.connect(
+        host=os.environ.get("RABBITMQ_HOST", "localhost"),
+        port=int(os.environ.get("RABBITMQ_PORT", 5672)),
+        login=os.environ.get("RABBITMQ_USER", "guest"),
+        password=os.environ.get("RABBITMQ_PASSWORD", "guest"),
+    )
+    orchestrator.channel = await orchestrator.connection.channel()
+
+    recipe_consumer = RecipeConsumer()
+    recipe_consumer.orchestrator = orchestrator
+    metrics_consumer = MetricsConsumer()
+    for consumer in (recipe_consumer, metrics_consumer):
+        await consumer.connect_to_rabbitmq()
+        await consumer.start_consuming()
+    return recipe_consumer, metrics_consumer, model
+
+
+async def wait_for_drain(collector: LatencyCollector, timeout: float):
+    deadline = time.monotonic() + timeout
+    while collector.pending and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+
+
+async def main(args) -> dict:
+    if args.broker == "memory":
+        import aio_pika
+
+        broker = InMemoryBroker()
+        aio_pika.connect = aio_pika.connect_robust = broker.connect
+
+    pages, llm_responses, search_results = load_fixtures()
+    server = FixtureServer(
+        pages,
+        page_padding_bytes=args.page_padding_kb * 1024,
+        latency=LatencyDistribution(args.fetch_latency, args.seed),
+        api_latency=LatencyDistribution(args.api_latency, args.seed),
+    )
+    server.start()
+    token_file = tempfile.NamedTemporaryFile("w", suffix=".token", delete=False)
+    token_file.write("loadgen-token")
+    token_file.close()
+    os.environ["PANTRY_CHEF_API_URL"] = server.base_url
+    os.environ["SERVICE_ACCOUNT_TOKEN_PATH"] = token_file.name
+
+    status_queue = f"loadgen.status.{uuid.uuid4().hex[:8]}"
+    generator = LoadGenerator(args, status_queue)
+    collector = LatencyCollector()
+    consumers = ()
+    configs = []
+    try:
+        status = await generator.connect()
+        consumers = await start_service(args, status_queue, server, llm_responses, search_results)
+        recipe_consumer, metrics_consumer, model = consumers
+
+        async def on_status(message):
+            collector.record_event(json.loads(message.body), time.time())
+            await message.ack()
+
+        await status.consume(on_status)
+
+        for rate in args.rates:
+            collector.__init__()
+            llm_before = model.calls
+            await asyncio.gather(
+                generator.publish_workflows(collector, rate),
+                generator.publish_metrics_events(args.metrics_rate),
+            )
+            backlog_at_end_of_sends = sum((await recipe_consumer.queue_depths()).values())
+            await wait_for_drain(collector, args.drain_timeout)
+            report = collector.report()
+            report.update(
+                {
+                    "offered_rate": rate,
+                    "backlog_at_end_of_sends": backlog_at_end_of_sends,
+                    "metrics_backlog": sum((await metrics_consumer.queue_depths()).values()),
+                    "llm_calls": model.calls - llm_before,
+                    "service_time_seconds": round(recipe_consumer.processing.service_time or 0.0, 3),
+                }
+            )
+            configs.append(report)
+            logging.warning(
+                f"rate={rate}/s: {report['throughput_per_sec']}/s done, p95={report['latency']['p95_ms']}ms, "
+                f"unfinished={report['unfinished']}"
+            )
+    finally:
+        for consumer in consumers[:2]:
+            await consumer.stop_consuming()
+        server.stop()
+        os.unlink(token_file.name)
+
+    # Saturation: the best completion rate, and the first offered rate the service fell behind on
+    saturated = next(
+        (config["offered_rate"] for config in configs
+         if config["unfinished"] or config["throughput_per_sec"] < 0.9 * config["offered_rate"]),
+        None,
+    )
+    return {
+        "benchmark": "loadgen",
+        "config": {
+            "broker": args.broker,
+            "duration": args.duration,
+            "arrivals": args.arrivals,
+            "batch_fraction": args.batch_fraction,
+            "repeat_fraction": args.repeat_fraction,
+            "metrics_rate": args.metrics_rate,
+            "urls": args.urls,
+            "search_latency": args.search_latency,
+            "llm_latency": args.llm_latency,
+            "fetch_latency": args.fetch_latency,
+            "api_latency": args.api_latency,
+            "interactive_concurrency": int(os.environ.get("WORKFLOW_INTERACTIVE_CONCURRENCY", 8)),
+            "batch_concurrency": int(os.environ.get("WORKFLOW_BATCH_CONCURRENCY", 2)),
+        },
+        "saturation_throughput_per_sec": max((config["throughput_per_sec"] for config in configs), default=0.0),
+        "saturated_at_offered_rate": saturated,
+        "configs": configs,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--broker", choices=["rabbitmq", "memory"], default="rabbitmq")
+    parser.add_argument("--rates", type=lambda value: [float(rate) for rate in value.split(",")], default=[1, 2, 4],
+                        help="Comma-separated workflow messages/sec, one configuration each")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds of sending per configuration")
+    parser.add_argument("--drain-timeout", type=float, default=120,
+                        help="Seconds to wait for outstanding workflows after sending")
+    parser.add_argument("--arrivals", choices=["constant", "poisson"], default="poisson")
+    parser.add_argument("--batch-fraction", type=float, default=0.0, help="Share of batch-priority workflows")
+    parser.add_argument("--repeat-fraction", type=float, default=0.0,
+                        help="Share of requests repeating a recorded query verbatim")
+    parser.add_argument("--metrics-rate", type=float, default=0.0, help="Synthetic MetricsEvents/sec")
+    parser.add_argument("--urls", type=int, default=3, help="number_of_urls per workflow")
+    parser.add_argument("--search-latency", default="lognormal:0.8,0.4")
+    parser.add_argument("--llm-latency", default="lognormal:1.5,0.5")
+    parser.add_argument("--fetch-latency", default="lognormal:0.3,0.6")
+    parser.add_argument("--api-latency", default="fixed:0.02")
+    parser.add_argument("--page-padding-kb", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=args.log_level)
+    report = asyncio.run(main(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
@@ -0,0 +1,325 @@
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from autoscaling import ReplicaAdvisor
+from log_config import logging_stats
+from memory import memory_accounting, memory_tracer, rss_bytes
+from profiling import LoopLagMonitor, stage_timings
+from readiness import is_ready
+from supervisor import admin_port, worker_admin_port
+
+# Workflow statuses after which an instance is no longer in flight
+TERMINAL_STATUSES = frozenset({"completed", "failed", "deadline_exceeded", "interrupted"})
+
+
+def _label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class PrometheusText:
+    """Minimal builder for the Prometheus text exposition format."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def _sample(self, name: str, labels: Dict[str, Any], value: float):
+        label_text = ",".join(f'{key}="{_label(val)}"' for key, val in labels.items())
+        self.lines.append(f"{name}{{{label_text}}} {float(value):g}" if labels else f"{name} {float(value):g}")
+
+    def metric(self, name: str, kind: str, help_text: str, samples: List[Tuple[Dict[str, Any], float]]):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self._sample(name, labels, value)
+
+    def summary(self, name: str, help_text: str, label: str, snapshot: Dict[str, Dict[str, float]]):
+        """A summary family from a StageTimings snapshot."""
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} summary")
+        for key, entry in sorted(snapshot.items()):
+            for quantile, field in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+                self._sample(name, {label: key, "quantile": quantile}, entry[field])
+            self._sample(f"{name}_sum", {label: key}, entry["total"])
+            self._sample(f"{name}_count", {label: key}, entry["count"])
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def pod_autoscale_metrics(text: PrometheusText, signal: Dict[str, Any]):
+    """The pod-level autoscaling series the ScaledObject queries (see ReplicaAdvisor.combine)."""
+    text.metric("recipe_pod_desired_replicas", "gauge",
+                "Replicas needed to drain the workflow backlog, from every worker in the pod.",
+                [({}, signal["desired_replicas"])])
+    text.metric("recipe_pod_utilization", "gauge", "In-flight messages over message slots across the pod.",
+                [({}, signal["utilization"])])
+    text.metric("recipe_pod_in_flight", "gauge", "Messages being processed across the pod.",
+                [({}, signal["in_flight"])])
+
+
+class AdminServer:
+    """
+    Embedded HTTP admin surface on the consumer's event loop:
+
+    - /healthz: the process and its loop are alive
+    - /readyz: warmed up and consuming (503 otherwise)
+    - /metrics: Prometheus text (stage timings, loop lag, in-flight work,
+      queue depth, workflow statuses)
+    - /debug/workflows: in-flight workflow ids, current step and age
+    - /debug/loop: event-loop lag and task counts
+    - /debug/autoscale: the desired-replica signal and its inputs
+    - /debug/memory: RSS, bytes held per workflow and stage, and the top
+      allocations while tracemalloc tracing is on (see memory.MemoryTracer)
+
+    Handlers only read in-memory state; the one broker round trip (queue
+    depth) is cached for QUEUE_DEPTH_CACHE_SECONDS and uses a side
+    channel, so a scrape costs well under a millisecond of loop time and
+    never touches the consuming channels.
+    Supervised workers listen on ADMIN_PORT + 1 + RECIPE_WORKER_INDEX; the
+    supervisor serves ADMIN_PORT for the pod (see SupervisorAdminServer).
+    """
+
+    def __init__(
+        self,
+        recipe_consumer,
+        metrics_consumer=None,
+        loop_lag_monitor: Optional[LoopLagMonitor] = None,
+        replica_advisor: Optional[ReplicaAdvisor] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+    ):
+        self.recipe_consumer = recipe_consumer
+        self.metrics_consumer = metrics_consumer
+        self.loop_lag_monitor = loop_lag_monitor
+        self.replica_advisor = replica_advisor or ReplicaAdvisor(recipe_consumer)
+        self.host = host or os.environ.get("ADMIN_HOST", "0.0.0.0")
+        if port is None:
+            worker_index = os.environ.get("RECIPE_WORKER_INDEX")
+            port = admin_port() if worker_index is None else worker_admin_port(int(worker_index))
+        self.port = port
+        self.queue_depth_ttl = float(os.environ.get("QUEUE_DEPTH_CACHE_SECONDS", 5))
+        self._queue_depths: Dict[str, int] = {}
+        self._queue_depths_at = 0.0
+        self._runner = None
+
+    def build_app(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.add_routes(
+            [
+                web.get("/healthz", self.healthz),
+                web.get("/readyz", self.readyz),
+                web.get("/metrics", self.metrics),
+                web.get("/debug/workflows", self.debug_workflows),
+                web.get("/debug/loop", self.debug_loop),
+                web.get("/debug/autoscale", self.debug_autoscale),
+                web.get("/debug/memory", self.debug_memory),
+            ]
+        )
+        return app
+
+    async def start(self):
+        from aiohttp import web
+
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        logging.info("Admin server listening on %s:%s", self.host, self.port)
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _workflow_instances(self) -> Dict[Any, Dict[str, Any]]:
+        orchestrator = getattr(self.recipe_consumer, "orchestrator", None)
+        return getattr(orchestrator, "workflow_instances", None) or {}
+
+    def in_flight_workflows(self) -> List[Dict[str, Any]]:
+        """In-flight workflows, oldest first."""
+        now = datetime.now()
+        workflows = []
+        for workflow_id, instance in list(self._workflow_instances().items()):
+            if instance.get("status") in TERMINAL_STATUSES:
+                continue
+            try:
+                age = (now - datetime.fromisoformat(instance["start_timestamp"])).total_seconds()
+            except (KeyError, TypeError, ValueError):
+                age = None
+            workflows.append(
+                {
+                    "workflow_id": str(workflow_id),
+                    "workflow_type": instance.get("workflow_type"),
+                    "status": instance.get("status"),
+                    "current_step": instance.get("current_step"),
+                    "age_seconds": round(age, 3) if age is not None else None,
+                    "search_query": (instance.get("payload") or {}).get("search_query"),
+                }
+            )
+        workflows.sort(key=lambda workflow: -(workflow["age_seconds"] or 0))
+        return workflows
+
+    async def queue_depths(self) -> Dict[str, int]:
+        if time.monotonic() - self._queue_depths_at >= self.queue_depth_ttl:
+            self._queue_depths_at = time.monotonic()
+            depths = {}
+            for consumer in (self.recipe_consumer, self.metrics_consumer):
+                if consumer is None:
+                    continue
+                try:
+                    depths.update(await asyncio.wait_for(consumer.queue_depths(), timeout=1.0))
+                except Exception as e:
+                    logging.debug("Could not read queue depths: %s", e)
+            self._queue_depths = depths
+        return self._queue_depths
+
+    def loop_stats(self) -> Dict[str, Any]:
+        tasks = asyncio.all_tasks()
+        by_coroutine = Counter(
+            getattr(task.get_coro(), "__qualname__", type(task.get_coro()).__name__) for task in tasks
+        )
+        monitor = self.loop_lag_monitor
+        return {
+            "lag_seconds": monitor.last_lag if monitor else None,
+            "max_lag_seconds": monitor.max_lag if monitor else None,
+            "blocked_count": monitor.blocked_count if monitor else None,
+            "tasks": len(tasks),
+            "tasks_by_coroutine": dict(by_coroutine.most_common(20)),
+            "in_flight_messages": self.recipe_consumer.in_flight_count,
+            "in_flight_by_lane": self.recipe_consumer.in_flight_by_lane,
+        }
+
+    async def healthz(self, request):
+        from aiohttp import web
+
+        return web.Response(text="ok\n")
+
+    async def readyz(self, request):
+        from aiohttp import web
+
+        connection = getattr(self.recipe_consumer, "connection", None)
+        ready = is_ready() and connection is not None and not connection.is_closed
+        return web.Response(text="ready\n" if ready else "not ready\n", status=200 if ready else 503)
+
+    async def debug_workflows(self, request):
+        from aiohttp import web
+
+        workflows = self.in_flight_workflows()
+        return web.json_response({"in_flight": len(workflows), "workflows": workflows})
+
+    async def debug_loop(self, request):
+        from aiohttp import web
+
+        return web.json_response(self.loop_stats())
+
+    async def debug_autoscale(self, request):
+        from aiohttp import web
+
+        return web.json_response(self.replica_advisor.compute(await self.queue_depths()))
+
+    async def debug_memory(self, request):
+        from aiohttp import web
+
+        try:
+            limit = int(request.query.get("top", 20))
+        except ValueError:
+            limit = 20
+        return web.json_response(
+            {
+                "rss_bytes": rss_bytes(),
+                "accounting": memory_accounting.snapshot(),
+                "tracing": memory_tracer.running,
+                # Snapshotting takes a while with many traces; run it off the loop
+                "top_allocations": await asyncio.to_thread(memory_tracer.top_allocations, limit),
+            }
+        )
+
+    async def metrics(self, request):
+        from aiohttp import web
+
+        return web.Response(
+            text=await self.render_metrics(), content_type="text/plain", charset="utf-8"
+        )
+
+    async def render_metrics(self) -> str:
+        text = PrometheusText()
+        text.metric("recipe_ready", "gauge", "1 when the service is ready to consume.", [({}, is_ready())])
+
+        text.summary(
+            "recipe_stage_duration_seconds",
+            "Wall-clock duration per workflow stage.",
+            "stage",
+            stage_timings.snapshot(),
+        )
+
+        loop = self.loop_stats()
+        if self.loop_lag_monitor is not None:
+            text.metric("recipe_event_loop_lag_seconds", "gauge", "Last measured event-loop lag.",
+                        [({}, loop["lag_seconds"])])
+            text.metric("recipe_event_loop_max_lag_seconds", "gauge", "Largest event-loop lag seen.",
+                        [({}, loop["max_lag_seconds"])])
+            text.metric("recipe_event_loop_blocked_total", "counter", "Loop stalls above the lag threshold.",
+                        [({}, loop["blocked_count"])])
+        text.metric("recipe_event_loop_tasks", "gauge", "Tasks alive on the event loop.", [({}, loop["tasks"])])
+        text.metric("recipe_consumer_in_flight", "gauge", "Messages being processed, per lane.",
+                    [({"lane": lane}, count) for lane, count in sorted(loop["in_flight_by_lane"].items())])
+
+        depths = await self.queue_depths()
+        text.metric("recipe_queue_messages", "gauge", "Messages ready in each consumed queue.",
+                    [({"queue": queue}, depth) for queue, depth in sorted(depths.items())])
+
+        signal = self.replica_advisor.compute(depths)
+        text.metric("recipe_autoscale_desired_replicas", "gauge",
+                    "Replicas needed to drain the workflow backlog within the target drain time.",
+                    [({}, signal["desired_replicas"])])
+        text.metric("recipe_backlog_drain_seconds", "gauge", "Time one replica needs to drain the backlog.",
+                    [({}, signal["drain_seconds"])])
+        text.metric("recipe_worker_utilization", "gauge", "In-flight messages over message slots.",
+                    [({}, signal["utilization"])])
+        text.metric("recipe_worker_slots", "gauge", "Messages a worker processes at once.",
+                    [({}, signal["worker_slots"])])
+        text.metric("recipe_service_time_seconds", "gauge", "Smoothed time to process one message.",
+                    [({}, signal["service_time_seconds"])])
+        text.metric("recipe_processed_per_second", "gauge", "Observed message completion rate.",
+                    [({}, signal["observed_rate_per_second"])])
+        if "RECIPE_WORKER_INDEX" not in os.environ:
+            # Single-process pod; with several workers the supervisor exports these
+            pod_autoscale_metrics(text, self.replica_advisor.combine([signal]))
+
+        memory = memory_accounting.snapshot()
+        text.metric("recipe_process_resident_bytes", "gauge", "Resident set size of the worker.",
+                    [({}, rss_bytes())])
+        text.metric("recipe_memory_held_bytes", "gauge",
+                    "Bytes of pages, recipe JSON and LLM responses held by in-flight workflows, per stage.",
+                    [({"stage": stage}, entry["held_bytes"]) for stage, entry in memory["stages"].items()])
+        text.metric("recipe_memory_peak_held_bytes", "gauge", "Largest value of recipe_memory_held_bytes seen.",
+                    [({"stage": stage}, entry["peak_bytes"]) for stage, entry in memory["stages"].items()])
+        text.metric("recipe_workflow_peak_memory_bytes", "gauge",
+                    "Largest bytes held by one recently finished workflow.",
+                    [({}, memory["finished_workflow_peak_bytes"]["max"])])
+
+        logs = logging_stats()
+        if logs:
+            text.metric("recipe_log_records_total", "counter", "Log records by outcome.",
+                        [({"outcome": outcome}, logs[outcome])
+                         for outcome in ("enqueued", "dropped", "rate_limited", "sampled_out")])
+            text.metric("recipe_log_caller_seconds_total", "counter",
+                        "Time log calls spent on the calling thread.", [({}, logs["caller_seconds"])])
+
+        statuses = Counter(instance.get("status") for instance in list(self._workflow_instances().values()))
+        text.metric("recipe_workflows", "gauge", "Workflow instances held by the orchestrator, per status.",
+                    [({"status": status}, count) for status, count in sorted(statuses.items(), key=str)])
+
+        coalescer = getattr(self.recipe_consumer, "coalescer", None)
+        if coalescer is not None:
+            text.metric("recipe_coalesced_total", "counter", "Workflow requests per coalescing role.",
+                        [({"role": role}, count) for role, count in sorted(coalescer.stats.items())])
+        return text.render()
+
@@ -1,36 +1,50 @@
 import os
-import requests
-from typing import Dict, Any
+from typing import Dict, Any, List
 import logging
-from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
 
 class PantryChefAPIClient:
     def __init__(self):
-        self.base_url = "http://pantry-chef-api.default.svc.cluster.local:8000"
-        self.token_path = "/var/run/secrets/kubernetes.io/serviceaccount/token"
+        self.base_url = os.environ.get(
+            "PANTRY_CHEF_API_URL", "http://pantry-chef-api.default.svc.cluster.local:8000"
+        )
+        self.token_path = os.environ.get(
+            "SERVICE_ACCOUNT_TOKEN_PATH",
+            "/var/run/secrets/kubernetes.io/serviceaccount/token",
+        )
 
     def _get_service_token(self) -> str:
         try:
             with open(self.token_path, "r") as f:
                 token = f.read().strip()
-                token_preview = f"{token[:20]}...{token[-20:]}"
-                logger.info(f"Service account token loaded from {self.token_path}")
-                logger.info(f"Token preview: {token_preview}")
-                logger.info(f"Token length: {len(token)}")
+                # Never log the token itself, not even a prefix
+                logger.debug("Service account token loaded from %s", self.token_path)
                 return token
         except Exception as e:
-            logger.error(
-                f"Failed to read service account token from {self.token_path}: {e}"
-            )
+            logger.error("Failed to read service account token from %s: %s", self.token_path, e)
             raise
 
-    def create_recipe(self, recipe_data: Dict[str, Any]) -> Dict[str, Any]:
+    def list_ingredients(self) -> List[Dict[str, Any]]:
+        """
+        List all ingredients using the internal API endpoint
+        """
+        import requests
+
+        token = self._get_service_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        url = f"{self.base_url}/api/v1/internal/ingredients"
+        response = requests.get(url, headers=headers, timeout=30)
+        response.raise_for_status()
+        return response.json()["data"]["ingredients"] or []
+
+    def create_recipe(self, recipe_data: Dict[str, Any], timeout: float = 30) -> Dict[str, Any]:
         """
         Create a new recipe using the internal API endpoint
         """
+        import requests
+
         try:
             token = self._get_service_token()
             headers = {
@@ -39,23 +53,25 @@ class PantryChefAPIClient:
             }
 
             url = f"{self.base_url}/api/v1/internal/recipes"
-            logger.info(f"Making request to: {url}")
-            logger.info(f"Authorization header: Bearer {token[:20]}...{token[-20:]}")
+            logger.debug("Making request to: %s", url)
 
-            response = requests.post(url, json=recipe_data, headers=headers)
+            response = requests.post(url, json=recipe_data, headers=headers, timeout=timeout)
 
             if response.status_code == 401:
-                logger.error("Authentication failed")
-                logger.error(f"Response headers: {dict(response.headers)}")
-                logger.error(f"Response body: {response.text}")
+                # Headers are not logged: they can carry cookies and tokens
+                logger.error("Authentication failed: %s", response.text)
 
             response.raise_for_status()
             return response.json()
 
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to create recipe: {e}")
-            if hasattr(e, "response") and e.response is not None:
-                logger.error(f"Response status: {e.response.status_code}")
-                logger.error(f"Response headers: {dict(e.response.headers)}")
-                logger.error(f"Response body: {e.response.text}")
+            if getattr(e, "response", None) is not None:
+                logger.error(
+                    "Failed to create recipe: %s (status %s): %s",
+                    e,
+                    e.response.status_code,
+                    e.response.text,
+                )
+            else:
+                logger.error("Failed to create recipe: %s", e)
             raise
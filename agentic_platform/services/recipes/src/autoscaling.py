@@ -0,0 +1,143 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+
+class ProcessingStats:
+    """
+    Per-worker message processing statistics: an exponentially weighted
+    service time (time spent handling one message, excluding time queued
+    for a lane slot) and the observed completion rate over a recent window.
+    """
+
+    def __init__(self, alpha: float = 0.1, window: Optional[float] = None):
+        self.alpha = alpha
+        self.window = window or float(os.environ.get("AUTOSCALE_RATE_WINDOW_SECONDS", 300))
+        self.service_time: Optional[float] = None
+        self.completed = 0
+        self._completions: deque = deque()
+        self._lock = threading.Lock()
+
+    def record(self, duration: float, now: Optional[float] = None):
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            if self.service_time is None:
+                self.service_time = duration
+            else:
+                self.service_time += self.alpha * (duration - self.service_time)
+            self.completed += 1
+            self._completions.append(now)
+            self._trim(now)
+
+    def _trim(self, now: float):
+        while self._completions and self._completions[0] < now - self.window:
+            self._completions.popleft()
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """Completed messages per second over the window."""
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            self._trim(now)
+            return len(self._completions) / self.window
+
+
+class ReplicaAdvisor:
+    """
+    Desired-replica signal from queue backlog instead of CPU.
+
+    A replica's capacity is its message slots (worker processes x lane
+    concurrency) divided by the observed service time (Little's law), so
+    workers that mostly wait on the network or the LLM still count as busy.
+    The desired replica count is the number of replicas that would drain
+    the current backlog within AUTOSCALE_TARGET_DRAIN_SECONDS:
+
+        ceil(backlog / (capacity_per_replica * target_drain_seconds))
+
+    clamped to [AUTOSCALE_MIN_REPLICAS, AUTOSCALE_MAX_REPLICAS]. Utilization
+    (in-flight / slots) is exported alongside so a scaler can also hold
+    enough replicas for the work already running.
+
+    compute() describes one worker; combine() turns the workers' signals
+    (from their heartbeats) into the pod-level one a scaler should use.
+    """
+
+    def __init__(
+        self,
+        consumer,
+        workers: Optional[int] = None,
+        target_drain_seconds: Optional[float] = None,
+        min_replicas: Optional[int] = None,
+        max_replicas: Optional[int] = None,
+    ):
+        self.consumer = consumer
+        if workers is None:
+            from supervisor import detect_worker_count
+
+            workers = detect_worker_count() if "RECIPE_WORKER_INDEX" in os.environ else 1
+        self.workers = workers
+        self.target_drain_seconds = target_drain_seconds or float(
+            os.environ.get("AUTOSCALE_TARGET_DRAIN_SECONDS", 120)
+        )
+        self.min_replicas = min_replicas if min_replicas is not None else int(
+            os.environ.get("AUTOSCALE_MIN_REPLICAS", 1)
+        )
+        self.max_replicas = max_replicas or int(os.environ.get("AUTOSCALE_MAX_REPLICAS", 10))
+        # Service time assumed until the first message completes
+        self.default_service_seconds = float(os.environ.get("AUTOSCALE_DEFAULT_SERVICE_SECONDS", 30))
+        # Lane slots assumed for lanes without a concurrency limit
+        self.unlimited_lane_slots = int(os.environ.get("AUTOSCALE_UNLIMITED_LANE_SLOTS", 16))
+
+    @property
+    def worker_slots(self) -> int:
+        return sum(lane.max_concurrency or self.unlimited_lane_slots for lane in self.consumer.lanes)
+
+    def compute(self, queue_depths: Dict[str, int]) -> Dict[str, Any]:
+        """The signal and its inputs, from the consumer's current state."""
+        lane_queues = {lane.queue_name for lane in self.consumer.lanes}
+        backlog = sum(depth for queue, depth in queue_depths.items() if queue in lane_queues)
+        stats: ProcessingStats = self.consumer.processing
+        service_time = stats.service_time or self.default_service_seconds
+        slots = self.worker_slots
+        capacity = self.workers * slots / max(service_time, 0.001)
+        return {
+            "backlog": backlog,
+            "in_flight": self.consumer.in_flight_count,
+            "worker_slots": slots,
+            "workers": self.workers,
+            "utilization": self.consumer.in_flight_count / slots,
+            "service_time_seconds": service_time,
+            "observed_rate_per_second": stats.rate(),
+            "capacity_per_second": capacity,
+            "drain_seconds": backlog / capacity,
+            "target_drain_seconds": self.target_drain_seconds,
+            "desired_replicas": self.desired_replicas(backlog, capacity),
+        }
+
+    def desired_replicas(self, backlog: int, capacity: float) -> int:
+        desired = math.ceil(backlog / (capacity * self.target_drain_seconds)) if backlog else 0
+        return min(self.max_replicas, max(self.min_replicas, desired))
+
+    def combine(self, signals: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Pod-level signal from each worker's compute() result. Every worker
+        sees the same queues, so the backlog is shared; slots, in-flight
+        work and capacity add up.
+        """
+        backlog = max((signal["backlog"] for signal in signals), default=0)
+        in_flight = sum(signal["in_flight"] for signal in signals)
+        slots = sum(signal["worker_slots"] for signal in signals)
+        capacity = sum(
+            signal["worker_slots"] / max(signal["service_time_seconds"], 0.001) for signal in signals
+        )
+        return {
+            "backlog": backlog,
+            "in_flight": in_flight,
+            "worker_slots": slots,
+            "workers": len(signals),
+            "utilization": in_flight / slots if slots else 0.0,
+            "capacity_per_second": capacity,
+            "desired_replicas": self.desired_replicas(backlog, capacity) if capacity else self.min_replicas,
+        }
@@ -0,0 +1,354 @@
+"""
+Bulk backfill: seeds the recipe corpus from a file of search queries and/or
+recipe URLs without going through RabbitMQ.
+
+Each input line is either a search query or a direct http(s) recipe URL
+(blank lines and lines starting with "#" are ignored). Work flows through
+three pipelined stages, each with its own concurrency limit:
+
+    search (queries -> URLs) -> scrape (fetch, parse, LLM) -> save (API)
+
+Progress is appended to a checkpoint file (JSON lines), so re-running the
+same command after a crash skips searched queries and finished URLs.
+
+Usage (from services/recipes/src):
+
+    python backfill.py queries.txt --checkpoint backfill.progress.jsonl \
+        --search-concurrency 2 --scrape-concurrency 16 --llm-concurrency 8 \
+        --save-concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+import aiohttp
+
+from api_client import PantryChefAPIClient
+from ingredient_index import IngredientIndex, canonicalize_ingredients, get_ingredient_index
+from profiling import stage_timings
+from recipe_scraper_step import RecipeScraperWorkflowStep
+
+_DONE = object()
+
+
+@dataclass
+class BackfillProgress:
+    """Counters behind the live throughput line."""
+
+    started_at: float = field(default_factory=time.time)
+    queries_searched: int = 0
+    urls_scraped: int = 0
+    scrape_failures: int = 0
+    saves: int = 0
+    save_failures: int = 0
+    skipped: int = 0
+
+    def line(self, llm_calls: int) -> str:
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        return (
+            f"[{elapsed:7.1f}s] queries={self.queries_searched} "
+            f"urls={self.urls_scraped} ({self.urls_scraped / elapsed:.2f}/s) "
+            f"llm={llm_calls} ({llm_calls / elapsed:.2f}/s) "
+            f"saves={self.saves} ({self.saves / elapsed:.2f}/s) "
+            f"failed={self.scrape_failures + self.save_failures} skipped={self.skipped}"
+        )
+
+
+class BackfillCheckpoint:
+    """
+    Append-only JSON-lines progress log.
+
+    `{"query": ..., "urls": [...]}` records a finished search and
+    `{"url": ..., "status": ...}` a URL that reached a final state
+    (saved, failed or save_failed).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.searched: Dict[str, List[str]] = {}
+        self.finished_urls: Set[str] = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line from a crash mid-write
+                        continue
+                    if "query" in entry:
+                        self.searched[entry["query"]] = entry["urls"]
+                    elif "url" in entry:
+                        self.finished_urls.add(entry["url"])
+        self._file = open(path, "a")
+
+    def record_search(self, query: str, urls: List[str]):
+        self.searched[query] = urls
+        self._append({"query": query, "urls": urls})
+
+    def record_url(self, url: str, status: str):
+        self.finished_urls.add(url)
+        self._append({"url": url, "status": status})
+
+    def _append(self, entry: dict):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_inputs(path: str) -> List[str]:
+    with open(path) as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+class BackfillJob:
+    """
+    Pipelined bulk ingestion reusing RecipeScraperWorkflowStep for scraping
+    and PantryChefAPIClient for saving. Stages are connected by bounded
+    queues, so a slow stage applies backpressure instead of buffering the
+    whole input in memory.
+    """
+
+    def __init__(
+        self,
+        checkpoint: BackfillCheckpoint,
+        scraper_step: Optional[RecipeScraperWorkflowStep] = None,
+        api_client: Optional[PantryChefAPIClient] = None,
+        search=None,
+        ingredient_index: Optional[IngredientIndex] = None,
+        excluded_domains: Optional[List[str]] = None,
+        urls_per_query: int = 10,
+        search_concurrency: int = 2,
+        scrape_concurrency: int = 16,
+        save_concurrency: int = 4,
+        queue_size: int = 256,
+        report_interval: float = 5.0,
+    ):
+        self.checkpoint = checkpoint
+        self.scraper_step = scraper_step or RecipeScraperWorkflowStep()
+        self.api_client = api_client or PantryChefAPIClient()
+        if search is None:
+            from search_agent import search_recipes as search
+        self.search = search
+        self.ingredient_index = ingredient_index
+        self.excluded_domains = excluded_domains or []
+        self.urls_per_query = urls_per_query
+        self.search_concurrency = search_concurrency
+        self.scrape_concurrency = scrape_concurrency
+        self.save_concurrency = save_concurrency
+        self.queue_size = queue_size
+        self.report_interval = report_interval
+        self.progress = BackfillProgress()
+        self._seen_urls: Set[str] = set()
+
+    def _llm_calls(self) -> int:
+        return stage_timings.snapshot().get("scraper.llm", {}).get("count", 0)
+
+    async def _enqueue_url(self, scrape_queue: asyncio.Queue, url: str, query: Optional[str]):
+        if url in self._seen_urls:
+            return
+        self._seen_urls.add(url)
+        if url in self.checkpoint.finished_urls:
+            self.progress.skipped += 1
+            return
+        await scrape_queue.put((url, query))
+
+    async def _search_worker(self, search_queue: asyncio.Queue, scrape_queue: asyncio.Queue):
+        while True:
+            query = await search_queue.get()
+            if query is _DONE:
+                return
+            try:
+                urls, _ = await asyncio.to_thread(
+                    self.search,
+                    search_query=query,
+                    excluded_domains=self.excluded_domains,
+                    num_urls=self.urls_per_query,
+                )
+            except Exception as e:
+                logging.error("Search failed for query %r: %s", query, e)
+                continue
+            self.checkpoint.record_search(query, urls)
+            self.progress.queries_searched += 1
+            for url in urls:
+                await self._enqueue_url(scrape_queue, url, query)
+
+    async def _scrape_worker(
+        self,
+        scrape_queue: asyncio.Queue,
+        save_queue: asyncio.Queue,
+        session: aiohttp.ClientSession,
+    ):
+        while True:
+            item = await scrape_queue.get()
+            if item is _DONE:
+                return
+            url, query = item
+            recipe, metrics = await self.scraper_step.scrape_recipe(url, session)
+            self.progress.urls_scraped += 1
+            if recipe is None:
+                self.progress.scrape_failures += 1
+                self.checkpoint.record_url(url, "failed")
+                continue
+            # The near-duplicate fingerprint is keyed by the URL that was scraped
+            scraped_url = metrics[0].metadata.get("url", url) if metrics else url
+            await save_queue.put((url, scraped_url, query, recipe))
+
+    def _prepare(self, recipe, query: Optional[str]) -> dict:
+        if self.ingredient_index is not None:
+            canonicalize_ingredients(recipe, self.ingredient_index)
+        recipe_dict = recipe.model_dump()
+        if query:
+            recipe_dict["created_from_query"] = query
+        return recipe_dict
+
+    async def _save_worker(self, save_queue: asyncio.Queue):
+        while True:
+            item = await save_queue.get()
+            if item is _DONE:
+                return
+            url, scraped_url, query, recipe = item
+            try:
+                recipe_dict = await asyncio.to_thread(self._prepare, recipe, query)
+                await asyncio.to_thread(self.api_client.create_recipe, recipe_dict)
+            except Exception as e:
+                self.scraper_step.release_near_duplicate(scraped_url)
+                logging.error("Failed to save recipe from %s: %s", url, e)
+                self.progress.save_failures += 1
+                self.checkpoint.record_url(url, "save_failed")
+                continue
+            # Saved, so later scrapes of copies of this recipe are recognized
+            self.scraper_step.confirm_near_duplicate(scraped_url)
+            self.progress.saves += 1
+            self.checkpoint.record_url(url, "saved")
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            print(self.progress.line(self._llm_calls()), file=sys.stderr, flush=True)
+
+    async def run(self, inputs: List[str]) -> BackfillProgress:
+        search_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        scrape_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        save_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        llm_calls_before = self._llm_calls()
+        reporter = asyncio.create_task(self._report())
+
+        async with aiohttp.ClientSession() as session:
+            searchers = [
+                asyncio.create_task(self._search_worker(search_queue, scrape_queue))
+                for _ in range(self.search_concurrency)
+            ]
+            scrapers = [
+                asyncio.create_task(self._scrape_worker(scrape_queue, save_queue, session))
+                for _ in range(self.scrape_concurrency)
+            ]
+            savers = [
+                asyncio.create_task(self._save_worker(save_queue))
+                for _ in range(self.save_concurrency)
+            ]
+            try:
+                for line in inputs:
+                    if line.startswith(("http://", "https://")):
+                        await self._enqueue_url(scrape_queue, line, None)
+                    elif line in self.checkpoint.searched:
+                        self.progress.queries_searched += 1
+                        for url in self.checkpoint.searched[line]:
+                            await self._enqueue_url(scrape_queue, url, line)
+                    else:
+                        await search_queue.put(line)
+
+                # Shut the stages down in pipeline order
+                for stage_queue, workers in (
+                    (search_queue, searchers),
+                    (scrape_queue, scrapers),
+                    (save_queue, savers),
+                ):
+                    for _ in workers:
+                        await stage_queue.put(_DONE)
+                    await asyncio.gather(*workers)
+            finally:
+                reporter.cancel()
+                for task in searchers + scrapers + savers:
+                    task.cancel()
+
+        print(
+            self.progress.line(self._llm_calls() - llm_calls_before),
+            file=sys.stderr,
+            flush=True,
+        )
+        return self.progress
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="File with one search query or recipe URL per line")
+    parser.add_argument(
+        "--checkpoint",
+        default="backfill.progress.jsonl",
+        help="Progress file used to resume after a crash",
+    )
+    parser.add_argument("--exclude-domain", action="append", default=[], dest="excluded_domains")
+    parser.add_argument("--urls-per-query", type=int, default=10)
+    parser.add_argument("--search-concurrency", type=int, default=2)
+    parser.add_argument("--scrape-concurrency", type=int, default=16)
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=8,
+        help="Maximum concurrent LLM calls",
+    )
+    parser.add_argument("--save-concurrency", type=int, default=4)
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=args.log_level, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    checkpoint = BackfillCheckpoint(args.checkpoint)
+    llm_executor = ThreadPoolExecutor(
+        max_workers=args.llm_concurrency, thread_name_prefix="backfill-llm"
+    )
+    job = BackfillJob(
+        checkpoint,
+        scraper_step=RecipeScraperWorkflowStep(llm_executor=llm_executor),
+        ingredient_index=get_ingredient_index(),
+        excluded_domains=args.excluded_domains,
+        urls_per_query=args.urls_per_query,
+        search_concurrency=args.search_concurrency,
+        scrape_concurrency=args.scrape_concurrency,
+        save_concurrency=args.save_concurrency,
+        report_interval=args.report_interval,
+    )
+
+    async def run():
+        # Searches and API saves block in the default executor; size it to their stages
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=args.save_concurrency + args.search_concurrency)
+        )
+        return await job.run(read_inputs(args.input))
+
+    try:
+        asyncio.run(run())
+    finally:
+        llm_executor.shutdown(wait=False, cancel_futures=True)
+        checkpoint.close()
+
+
+if __name__ == "__main__":
+    main()
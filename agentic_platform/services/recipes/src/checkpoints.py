@@ -0,0 +1,86 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from event_models import MetricsEvent
+from local_store import LocalStore
+from models import Recipe
+
+CHECKPOINT_NAMESPACE = "workflow_checkpoints"
+
+
+def workflow_checkpoint_key(
+    workflow_type: str, workflow_payload: Dict[str, Any], workflow_id: Optional[str] = None
+) -> str:
+    """
+    Stable key for a workflow message: the caller-provided workflow_id when
+    present, otherwise a hash of the type and payload, so a redelivered
+    message maps to the same checkpoint.
+    """
+    if workflow_id:
+        return str(workflow_id)
+    digest = hashlib.sha256(
+        json.dumps([workflow_type, workflow_payload], sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return digest[:32]
+
+
+class WorkflowCheckpointStore:
+    """
+    Persists partially completed recipe workflows (search results, finished
+    scrapes, already saved URLs) so an interrupted workflow can resume on
+    redelivery without repeating search and LLM calls.
+
+    Point RECIPE_STATE_DIR at a volume shared by the pod's containers (or a
+    node-local persistent volume) for checkpoints to survive pod restarts.
+    """
+
+    def __init__(self, store: Optional[LocalStore] = None):
+        self.store = store or LocalStore()
+        self.ttl = float(os.environ.get("WORKFLOW_CHECKPOINT_TTL_SECONDS", 24 * 3600))
+
+    def save(self, key: str, context_data: Dict[str, Any]):
+        checkpoint = {
+            "recipe_search_results": context_data.get("recipe_search_results"),
+            "scraped": [
+                {
+                    "url": url,
+                    "recipe": recipe.model_dump_json() if recipe is not None else None,
+                    "metrics": [metric.model_dump_json() for metric in metrics],
+                }
+                for url, (recipe, metrics) in context_data.get("scraped_by_url", {}).items()
+            ],
+            "saved_urls": sorted(context_data.get("saved_urls", [])),
+        }
+        self.store.set(CHECKPOINT_NAMESPACE, key, checkpoint, ttl=self.ttl)
+        logging.info(
+            "Checkpointed workflow %s: %s scraped, %s saved",
+            key,
+            len(checkpoint["scraped"]),
+            len(checkpoint["saved_urls"]),
+        )
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns context_data restored from a checkpoint, or None."""
+        checkpoint = self.store.get(CHECKPOINT_NAMESPACE, key)
+        if checkpoint is None:
+            return None
+
+        scraped_by_url: Dict[str, Tuple[Optional[Recipe], List[MetricsEvent]]] = {}
+        for entry in checkpoint.get("scraped", []):
+            recipe = (
+                Recipe.model_validate_json(entry["recipe"]) if entry["recipe"] else None
+            )
+            metrics = [MetricsEvent.model_validate_json(m) for m in entry["metrics"]]
+            scraped_by_url[entry["url"]] = (recipe, metrics)
+
+        return {
+            "recipe_search_results": checkpoint.get("recipe_search_results"),
+            "scraped_by_url": scraped_by_url,
+            "saved_urls": set(checkpoint.get("saved_urls", [])),
+        }
+
+    def delete(self, key: str):
+        self.store.delete(CHECKPOINT_NAMESPACE, key)
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import logging
+import os
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from local_store import LocalStore
+from query_normalizer import query_cache_key
+
+COALESCED_NAMESPACE = "coalesced_workflows"
+
+
+def workflow_coalescing_key(workflow_type: str, workflow_payload: Dict[str, Any]) -> str:
+    """
+    Normalized identity of a workflow request:
+    (workflow_type, search_query, excluded_domains, count), with the query
+    canonicalized and grouped with similar recent queries (see
+    query_normalizer).
+    """
+    search_query = query_cache_key(str(workflow_payload.get("search_query", "")))
+    excluded_domains = sorted(
+        {domain.strip().lower() for domain in workflow_payload.get("excluded_domains") or []}
+    )
+    count = (
+        workflow_payload.get("number_of_urls")
+        or workflow_payload.get("number_of_recipes")
+        or 10
+    )
+    return json.dumps([str(workflow_type), search_query, excluded_domains, count])
+
+
+class WorkflowCoalescer:
+    """
+    Single-flight execution of identical workflows.
+
+    The first request for a key runs the workflow ("leader"). Identical
+    requests arriving while it runs wait for the same result ("attached"),
+    and repeats within COALESCE_WINDOW_SECONDS after a successful run are
+    answered from the finished result ("cached"). Finished results are kept
+    in the shared LocalStore so repeats are also absorbed across worker
+    processes.
+    """
+
+    def __init__(self, store: Optional[LocalStore] = None):
+        self.window_seconds = float(os.environ.get("COALESCE_WINDOW_SECONDS", 60))
+        self.store = store or LocalStore()
+        self.stats: Counter = Counter()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def run(
+        self,
+        key: str,
+        execute: Callable[[], Awaitable[Dict[str, Any]]],
+        is_reusable: Callable[[Dict[str, Any]], bool] = lambda result: True,
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Runs `execute` unless an identical workflow is running or recently
+        finished. Returns (result, role) with role one of
+        "leader", "attached" or "cached".
+        """
+        if self.window_seconds > 0:
+            cached = self.store.get(COALESCED_NAMESPACE, key)
+            if cached is not None:
+                self.stats["cached"] += 1
+                return cached, "cached"
+
+        running = self._in_flight.get(key)
+        if running is not None:
+            self.stats["attached"] += 1
+            logging.info("Attaching duplicate workflow request to in-flight run: %s", key)
+            return await asyncio.shield(running), "attached"
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.stats["leader"] += 1
+        try:
+            result = await execute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved; the leader re-raises it directly
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if self.window_seconds > 0 and is_reusable(result):
+                self.store.set(COALESCED_NAMESPACE, key, result, ttl=self.window_seconds)
+            return result, "leader"
+        finally:
+            self._in_flight.pop(key, None)
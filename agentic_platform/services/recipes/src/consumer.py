@@ -1,20 +1,74 @@
 import asyncio
+import functools
 import os
 import logging
+import time
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional
 
 import aio_pika
 
+from autoscaling import ProcessingStats
+
+RETRY_ATTEMPTS_HEADER = "x-retry-attempts"
+ORIGINAL_QUEUE_HEADER = "x-original-queue"
+LAST_ERROR_HEADER = "x-last-error"
+
+
+def retry_queue_name(queue_name: str, delay_seconds: int) -> str:
+    return f"{queue_name}.retry.{delay_seconds}s"
+
+
+def dead_letter_queue_name(queue_name: str) -> str:
+    return f"{queue_name}.dlq"
+
+
+@dataclass
+class ConsumerLane:
+    """
+    One queue consumed on its own channel.
+
+    `prefetch_count` bounds unacked deliveries buffered from the broker
+    (0 = unlimited) and `max_concurrency` bounds messages processed at once
+    (0 = unlimited), so each lane gets a reserved share of the consumer.
+    """
+
+    name: str
+    queue_name: str
+    prefetch_count: int = 0
+    max_concurrency: int = 0
+
 
 class BaseConsumer(ABC):
-    def __init__(self, queue_name: str):
+    def __init__(self, queue_name: str, lanes: Optional[List[ConsumerLane]] = None):
         self.queue_name = queue_name
+        self.lanes = lanes or [
+            ConsumerLane(
+                name="default",
+                queue_name=queue_name,
+                prefetch_count=int(os.environ.get("CONSUMER_PREFETCH_COUNT", 0)),
+            )
+        ]
         self.rabbitmq_host = os.environ.get("RABBITMQ_HOST", "localhost")
         self.rabbitmq_port = int(os.environ.get("RABBITMQ_PORT", 5672))
         self.rabbitmq_user = os.environ.get("RABBITMQ_USER", "guest")
         self.rabbitmq_password = os.environ.get("RABBITMQ_PASSWORD", "guest")
         self.connection: aio_pika.Connection = None
         self.channel: aio_pika.Channel = None
+        self._consumers: Dict[str, tuple] = {}  # lane name -> (queue, consumer_tag)
+        self._lane_limits: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: set[asyncio.Task] = set()
+        self._in_flight_by_lane: Dict[str, int] = {lane.name: 0 for lane in self.lanes}
+        self.processing = ProcessingStats()
+        # Delayed retry tiers: failed attempt N waits retry_delays[N - 1] seconds
+        self.retry_delays: List[int] = [
+            int(delay)
+            for delay in os.environ.get("CONSUMER_RETRY_DELAYS_SECONDS", "5,30,120,600").split(",")
+        ]
+        self.max_attempts = int(
+            os.environ.get("CONSUMER_MAX_ATTEMPTS", len(self.retry_delays) + 1)
+        )
 
     async def connect_to_rabbitmq(self):
         try:
@@ -27,31 +81,126 @@ class BaseConsumer(ABC):
                 password=password,
             )
             self.channel = await self.connection.channel()
-            # Ensure queue arguments match existing queue configuration
+            for lane in self.lanes:
+                await self._declare_queue(lane.queue_name)
+                await self._declare_retry_queues(lane.queue_name)
+            logging.info("Connected to RabbitMQ queue: %s", self.queue_name)
+        except Exception as e:
+            logging.error("Error connecting to RabbitMQ: %s", e)
+            raise
+
+    async def _declare_queue(self, queue_name: str):
+        # Ensure queue arguments match existing queue configuration
+        try:
+            await self.channel.declare_queue(
+                queue_name,
+                durable=True,
+                arguments={
+                    "x-queue-type": "quorum",
+                    "x-max-length": 10000,
+                    "x-max-length-bytes": 104857600,
+                    "x-overflow": "reject-publish",
+                },
+            )
+            logging.info("Queue %s declared successfully.", queue_name)
+        except aio_pika.exceptions.ChannelPreconditionFailed as e:
+            logging.warning(
+                "Queue %s already declared with incompatible arguments, skipping declaration. Warning: %s",
+                queue_name,
+                e,
+            )
+            # A failed declaration closes the channel
+            self.channel = await self.connection.channel()
+        except Exception as e:
+            logging.warning(
+                "Error declaring queue %s, might already be declared. Error: %s",
+                queue_name,
+                e,
+            )
+
+    async def _declare_retry_queues(self, queue_name: str):
+        """
+        Declares the retry tiers and dead-letter queue of `queue_name`. A
+        retry tier holds messages for its TTL, then dead-letters them back
+        to the original queue through the default exchange.
+        """
+        for delay in sorted(set(self.retry_delays)):
             try:
                 await self.channel.declare_queue(
-                    self.queue_name,
+                    retry_queue_name(queue_name, delay),
                     durable=True,
                     arguments={
-                        "x-queue-type": "quorum",
-                        "x-max-length": 10000,
-                        "x-max-length-bytes": 104857600,
-                        "x-overflow": "reject-publish",
+                        "x-message-ttl": delay * 1000,
+                        "x-dead-letter-exchange": "",
+                        "x-dead-letter-routing-key": queue_name,
                     },
                 )
-                logging.info(f"Queue {self.queue_name} declared successfully.")
             except aio_pika.exceptions.ChannelPreconditionFailed as e:
                 logging.warning(
-                    f"Queue {self.queue_name} already declared with incompatible arguments, skipping declaration. Warning: {e}"
-                )
-            except Exception as e:
-                logging.warning(
-                    f"Error declaring queue {self.queue_name}, might already be declared. Error: {e}"
+                    "Retry queue for %s (%ss) already declared differently: %s",
+                    queue_name,
+                    delay,
+                    e,
                 )
-            logging.info(f"Connected to RabbitMQ queue: {self.queue_name}")
+                self.channel = await self.connection.channel()
+        try:
+            await self.channel.declare_queue(dead_letter_queue_name(queue_name), durable=True)
+        except aio_pika.exceptions.ChannelPreconditionFailed as e:
+            logging.warning(
+                "Dead-letter queue for %s already declared differently: %s",
+                queue_name,
+                e,
+            )
+            self.channel = await self.connection.channel()
+
+    async def retry_later(
+        self, message: aio_pika.abc.AbstractIncomingMessage, error: Exception
+    ):
+        """
+        Schedules a failed message for a delayed retry instead of an
+        immediate requeue. The attempt count travels in the message headers;
+        after max_attempts the message is moved to the dead-letter queue.
+        """
+        headers = dict(message.headers or {})
+        attempts = int(headers.get(RETRY_ATTEMPTS_HEADER, 0)) + 1
+        original_queue = headers.get(ORIGINAL_QUEUE_HEADER) or message.routing_key or self.queue_name
+        headers.update(
+            {
+                RETRY_ATTEMPTS_HEADER: attempts,
+                ORIGINAL_QUEUE_HEADER: original_queue,
+                LAST_ERROR_HEADER: f"{type(error).__name__}: {error}"[:1000],
+            }
+        )
+        if attempts >= self.max_attempts or not self.retry_delays:
+            target = dead_letter_queue_name(original_queue)
+        else:
+            delay = self.retry_delays[min(attempts, len(self.retry_delays)) - 1]
+            target = retry_queue_name(original_queue, delay)
+
+        try:
+            await self.channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=message.body,
+                    headers=headers,
+                    content_type=message.content_type,
+                    correlation_id=message.correlation_id,
+                    message_id=message.message_id,
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                ),
+                routing_key=target,
+            )
         except Exception as e:
-            logging.error(f"Error connecting to RabbitMQ: {e}")
-            raise
+            logging.error("Could not schedule retry for message %s: %s", message.delivery_tag, e)
+            await message.nack(requeue=True)
+            return
+        await message.ack()
+        logging.warning(
+            "Message %s failed (attempt %s/%s), moved to %s",
+            message.delivery_tag,
+            attempts,
+            self.max_attempts,
+            target,
+        )
 
     @abstractmethod
     async def process_message(
@@ -61,22 +210,131 @@ class BaseConsumer(ABC):
         pass
 
     async def start_consuming(self):
-        try:
+        for lane in self.lanes:
             try:
-                queue = await self.channel.get_queue(self.queue_name)
-            except aio_pika.exceptions.QueueEmpty as e:
-                logging.warning(
-                    f"Queue {self.queue_name} is empty or not yet ready.  Please ensure it is declared. Error: {e}"
+                # Each lane gets its own channel so prefetch is enforced per lane
+                channel = await self.connection.channel()
+                if lane.prefetch_count:
+                    await channel.set_qos(prefetch_count=lane.prefetch_count)
+                try:
+                    queue = await channel.get_queue(lane.queue_name)
+                except aio_pika.exceptions.QueueEmpty as e:
+                    logging.warning(
+                        "Queue %s is empty or not yet ready.  Please ensure it is declared. Error: %s",
+                        lane.queue_name,
+                        e,
+                    )
+                    continue
+                except Exception as e:
+                    logging.error("Error getting queue %s: %s", lane.queue_name, e)
+                    raise  # Re-raise the exception to be caught in the main loop if necessary
+
+                if lane.max_concurrency:
+                    self._lane_limits[lane.name] = asyncio.Semaphore(lane.max_concurrency)
+                consumer_tag = await queue.consume(functools.partial(self._dispatch, lane))
+                self._consumers[lane.name] = (queue, consumer_tag)
+                logging.info(
+                    "Start consuming from queue: %s (lane=%s, prefetch=%s, concurrency=%s)",
+                    lane.queue_name,
+                    lane.name,
+                    lane.prefetch_count,
+                    lane.max_concurrency,
                 )
-                return  # Or consider raising the exception again if you want to stop consuming on this error
             except Exception as e:
-                logging.error(f"Error getting queue {self.queue_name}: {e}")
-                raise  # Re-raise the exception to be caught in the main loop if necessary
+                logging.error("Error consuming from queue %s: %s", lane.queue_name, e)
 
-            await queue.consume(self.process_message)
-            logging.info(f"Start consuming from queue: {self.queue_name}")
-        except Exception as e:
-            logging.error(f"Error consuming from queue: {e}")
+    async def _dispatch(
+        self, lane: ConsumerLane, message: aio_pika.abc.AbstractIncomingMessage
+    ):
+        """Runs process_message under the lane's concurrency limit, tracked for draining."""
+        task = asyncio.current_task()
+        self._in_flight.add(task)
+        self._in_flight_by_lane[lane.name] += 1
+        try:
+            limit = self._lane_limits.get(lane.name)
+            if limit is None:
+                await self._process_timed(message)
+            else:
+                async with limit:
+                    await self._process_timed(message)
+        finally:
+            self._in_flight.discard(task)
+            self._in_flight_by_lane[lane.name] -= 1
+
+    async def _process_timed(self, message: aio_pika.abc.AbstractIncomingMessage):
+        started = time.monotonic()
+        try:
+            await self.process_message(message)
+        finally:
+            self.processing.record(time.monotonic() - started)
+
+    @property
+    def in_flight_count(self) -> int:
+        return len(self._in_flight)
+
+    @property
+    def in_flight_by_lane(self) -> Dict[str, int]:
+        return dict(self._in_flight_by_lane)
+
+    async def queue_depths(self) -> Dict[str, int]:
+        """
+        Ready messages per lane queue (passive declares on a side channel,
+        so a missing queue never closes the consuming channels).
+        """
+        depths: Dict[str, int] = {}
+        if not self.connection or self.connection.is_closed:
+            return depths
+        channel = await self.connection.channel()
+        try:
+            for lane in self.lanes:
+                try:
+                    queue = await channel.declare_queue(lane.queue_name, passive=True)
+                except Exception as e:
+                    logging.debug("Could not read depth of %s: %s", lane.queue_name, e)
+                    channel = await self.connection.channel()
+                    continue
+                depths[lane.queue_name] = queue.declaration_result.message_count
+        finally:
+            if not channel.is_closed:
+                await channel.close()
+        return depths
+
+    async def stop_consuming(self):
+        """Stops new deliveries; messages already being processed continue."""
+        for lane_name, (queue, consumer_tag) in list(self._consumers.items()):
+            try:
+                await queue.cancel(consumer_tag)
+                logging.info("Stopped consuming from queue: %s", queue.name)
+            except Exception as e:
+                logging.warning("Error cancelling consumer on %s: %s", queue.name, e)
+            del self._consumers[lane_name]
+
+    async def drain(self, timeout: float) -> int:
+        """
+        Waits up to `timeout` seconds for in-flight messages to finish, then
+        cancels the rest. Cancelled handlers are expected to checkpoint their
+        work and nack for redelivery. Returns the number of cancelled messages.
+        """
+        pending = set(self._in_flight)
+        if not pending:
+            return 0
+        logging.info(
+            "Draining %s in-flight messages from %s (timeout=%ss)",
+            len(pending),
+            self.queue_name,
+            timeout,
+        )
+        _, still_running = await asyncio.wait(pending, timeout=timeout)
+        for task in still_running:
+            task.cancel()
+        if still_running:
+            await asyncio.gather(*still_running, return_exceptions=True)
+            logging.warning(
+                "Cancelled %s unfinished messages from %s",
+                len(still_running),
+                self.queue_name,
+            )
+        return len(still_running)
 
     async def close(self):
         if self.channel:
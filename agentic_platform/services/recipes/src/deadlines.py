@@ -0,0 +1,57 @@
+import asyncio
+import contextlib
+import os
+import time
+from typing import Dict, Optional
+
+# Share of the workflow budget each step may use. A step that finishes early
+# leaves its unused time to the steps after it.
+STEP_SHARES: Dict[str, float] = {"search": 0.15, "scrape": 0.6, "save": 0.25}
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, step: str, budget: float):
+        super().__init__(f"Step '{step}' exceeded its {budget:.1f}s deadline budget")
+        self.step = step
+        self.budget = budget
+
+
+class WorkflowDeadline:
+    """
+    Time budget for one workflow delivery, split across its steps.
+
+    The budget restarts on each delivery; it is kept in the workflow
+    instance, not in the checkpointed context, so a resumed workflow is not
+    born expired.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, shares: Optional[Dict[str, float]] = None):
+        self.seconds = float(seconds or os.environ.get("WORKFLOW_DEADLINE_SECONDS", 300))
+        self.shares = shares or STEP_SHARES
+        self.started = time.monotonic()
+        self.expires_at = self.started + self.seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def step_budget(self, step: str) -> float:
+        """The step's share of the time left, among itself and the steps after it."""
+        steps = list(self.shares)
+        later = steps[steps.index(step):]
+        return self.remaining() * self.shares[step] / sum(self.shares[name] for name in later)
+
+    @contextlib.asynccontextmanager
+    async def step(self, step: str):
+        """Cancels the enclosed block when the step's budget runs out, raising DeadlineExceeded."""
+        budget = self.step_budget(step)
+        timeout = asyncio.timeout(budget)
+        try:
+            async with timeout:
+                yield budget
+        except TimeoutError:
+            if timeout.expired():
+                raise DeadlineExceeded(step, budget) from None
+            raise
@@ -0,0 +1,158 @@
+"""
+Inspect and re-drive the dead-letter queue of a consumer queue.
+
+Messages land in `<queue>.dlq` after exhausting their delayed retries
+(see BaseConsumer.retry_later). `list` peeks at them without removing
+anything; `redrive` publishes them back to the queue they failed on with
+a fresh attempt count.
+
+Usage (from services/recipes/src):
+
+    python dlq.py list workflow_messages [--limit 20] [--body]
+    python dlq.py redrive workflow_messages [--limit 100] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import aio_pika
+
+from consumer import (
+    LAST_ERROR_HEADER,
+    ORIGINAL_QUEUE_HEADER,
+    RETRY_ATTEMPTS_HEADER,
+    dead_letter_queue_name,
+)
+
+
+async def connect() -> aio_pika.abc.AbstractRobustConnection:
+    return await aio_pika.connect_robust(
+        host=os.environ.get("RABBITMQ_HOST", "localhost"),
+        port=int(os.environ.get("RABBITMQ_PORT", 5672)),
+        login=os.environ.get("RABBITMQ_USER", "guest"),
+        password=os.environ.get("RABBITMQ_PASSWORD", "guest"),
+    )
+
+
+def describe(message: aio_pika.abc.AbstractIncomingMessage, with_body: bool = False) -> Dict[str, Any]:
+    headers = message.headers or {}
+    entry = {
+        "message_id": message.message_id,
+        "correlation_id": message.correlation_id,
+        "original_queue": headers.get(ORIGINAL_QUEUE_HEADER),
+        "attempts": headers.get(RETRY_ATTEMPTS_HEADER),
+        "last_error": headers.get(LAST_ERROR_HEADER),
+        "size": len(message.body),
+    }
+    if with_body:
+        entry["body"] = message.body.decode("utf-8", errors="replace")
+    return entry
+
+
+async def list_messages(
+    channel: aio_pika.abc.AbstractChannel, queue_name: str, limit: int, with_body: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Peeks at up to `limit` dead-lettered messages. Messages stay unacked
+    while listing so each is fetched once, then all are returned to the
+    queue.
+    """
+    queue = await channel.get_queue(dead_letter_queue_name(queue_name), ensure=True)
+    fetched = []
+    try:
+        while len(fetched) < limit:
+            message = await queue.get(no_ack=False, fail=False)
+            if message is None:
+                break
+            fetched.append(message)
+        return [describe(message, with_body) for message in fetched]
+    finally:
+        for message in fetched:
+            await message.nack(requeue=True)
+
+
+async def redrive(
+    channel: aio_pika.abc.AbstractChannel,
+    queue_name: str,
+    limit: int,
+    dry_run: bool = False,
+) -> int:
+    """Publishes up to `limit` dead-lettered messages back to their original queue."""
+    if dry_run:
+        return len(await list_messages(channel, queue_name, limit))
+
+    queue = await channel.get_queue(dead_letter_queue_name(queue_name), ensure=True)
+    redriven = 0
+    while redriven < limit:
+        message = await queue.get(no_ack=False, fail=False)
+        if message is None:
+            break
+        headers = dict(message.headers or {})
+        target = headers.get(ORIGINAL_QUEUE_HEADER) or queue_name
+        headers[RETRY_ATTEMPTS_HEADER] = 0
+        headers.pop(LAST_ERROR_HEADER, None)
+        await channel.default_exchange.publish(
+            aio_pika.Message(
+                body=message.body,
+                headers=headers,
+                content_type=message.content_type,
+                correlation_id=message.correlation_id,
+                message_id=message.message_id,
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            ),
+            routing_key=target,
+        )
+        await message.ack()
+        redriven += 1
+    return redriven
+
+
+async def run(args: argparse.Namespace):
+    connection = await connect()
+    try:
+        channel = await connection.channel()
+        if args.command == "list":
+            entries = await list_messages(channel, args.queue, args.limit, args.body)
+            for entry in entries:
+                print(json.dumps(entry))
+            print(f"{len(entries)} message(s) in {dead_letter_queue_name(args.queue)}")
+        elif args.command == "redrive":
+            count = await redrive(channel, args.queue, args.limit, args.dry_run)
+            verb = "Would redrive" if args.dry_run else "Redrove"
+            print(f"{verb} {count} message(s) from {dead_letter_queue_name(args.queue)}")
+    finally:
+        await connection.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="Show dead-lettered messages")
+    list_parser.add_argument("queue", help="Consumer queue whose DLQ to read, e.g. workflow_messages")
+    list_parser.add_argument("--limit", type=int, default=20)
+    list_parser.add_argument("--body", action="store_true", help="Include message bodies")
+
+    redrive_parser = subparsers.add_parser("redrive", help="Republish dead-lettered messages")
+    redrive_parser.add_argument("queue", help="Consumer queue whose DLQ to re-drive")
+    redrive_parser.add_argument("--limit", type=int, default=100)
+    redrive_parser.add_argument("--dry-run", action="store_true")
+
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=args.log_level, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
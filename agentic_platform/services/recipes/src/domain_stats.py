@@ -0,0 +1,191 @@
+import logging
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from event_models import MetricsEvent
+from local_store import state_dir
+from models import RecipeMetricsEventType
+
+# Scrape outcomes that say something about the domain; duplicates depend on
+# what was ingested before, not on the site.
+_SUCCESS = RecipeMetricsEventType.success.value
+_FAILURES = {
+    RecipeMetricsEventType.failure.value,
+    RecipeMetricsEventType.validation_errors.value,
+}
+
+
+def url_domain(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class DomainStatsStore:
+    """
+    Persistent per-domain scrape outcomes, fed by the scraper step's
+    success/failure MetricsEvents.
+
+    Only outcomes from the last `window_seconds` count, so an excluded domain
+    (which stops getting fetched) ages out of the exclusion list and gets
+    another chance. Outcomes live in SQLite next to the other node-local
+    state, shared by the node's worker processes.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        window_seconds: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        exclude_below: Optional[float] = None,
+        default_latency: float = 5.0,
+    ):
+        self.path = path or os.path.join(state_dir(), "domain_stats.db")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.window_seconds = window_seconds or float(
+            os.environ.get("DOMAIN_STATS_WINDOW_SECONDS", 6 * 3600)
+        )
+        self.min_samples = min_samples or int(os.environ.get("DOMAIN_STATS_MIN_SAMPLES", 10))
+        self.exclude_below = (
+            exclude_below
+            if exclude_below is not None
+            else float(os.environ.get("DOMAIN_EXCLUDE_SUCCESS_RATE", 0.2))
+        )
+        self.default_latency = default_latency
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS outcomes (
+                domain TEXT NOT NULL,
+                recorded_at REAL NOT NULL,
+                ok INTEGER NOT NULL,
+                latency REAL,
+                failure_type TEXT
+            );
+            CREATE INDEX IF NOT EXISTS outcomes_domain ON outcomes (domain, recorded_at);
+            """
+        )
+        self._conn.commit()
+        self._recorded = 0
+
+    def record(self, url: str, ok: bool, latency: Optional[float] = None, failure_type: Optional[str] = None):
+        domain = url_domain(url)
+        if not domain:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO outcomes (domain, recorded_at, ok, latency, failure_type) VALUES (?, ?, ?, ?, ?)",
+                (domain, now, int(ok), latency, failure_type),
+            )
+            self._recorded += 1
+            if self._recorded % 500 == 0:
+                self._conn.execute(
+                    "DELETE FROM outcomes WHERE recorded_at < ?", (now - self.window_seconds,)
+                )
+            self._conn.commit()
+
+    def record_events(self, events: Iterable[MetricsEvent]):
+        """Records the scrape outcome carried by a scrape_recipe() metrics list."""
+        for event in events:
+            url = event.metadata.get("url")
+            if not url:
+                continue
+            if event.event_type == _SUCCESS:
+                self.record(url, True, event.duration)
+            elif event.event_type in _FAILURES:
+                if event.event_type == RecipeMetricsEventType.validation_errors.value:
+                    failure_type = "validation"
+                else:
+                    failure_type = event.metadata.get("failed_stage") or event.metadata.get(
+                        "error_type", "error"
+                    )
+                self.record(url, False, event.duration, failure_type)
+
+    def stats(self, domains: Iterable[str]) -> Dict[str, Dict]:
+        """Success rate, median latency and failure counts per domain in the window."""
+        domains = sorted(set(domains))
+        if not domains:
+            return {}
+        placeholders = ",".join("?" for _ in domains)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT domain, ok, latency, failure_type FROM outcomes "
+                f"WHERE recorded_at >= ? AND domain IN ({placeholders})",
+                (time.time() - self.window_seconds, *domains),
+            ).fetchall()
+
+        grouped: Dict[str, Dict] = {}
+        for domain, ok, latency, failure_type in rows:
+            entry = grouped.setdefault(
+                domain, {"attempts": 0, "successes": 0, "latencies": [], "failures": {}}
+            )
+            entry["attempts"] += 1
+            entry["successes"] += ok
+            if latency is not None:
+                entry["latencies"].append(latency)
+            if not ok:
+                key = failure_type or "error"
+                entry["failures"][key] = entry["failures"].get(key, 0) + 1
+
+        stats = {}
+        for domain, entry in grouped.items():
+            latencies = entry.pop("latencies")
+            entry["success_rate"] = entry["successes"] / entry["attempts"]
+            entry["median_latency"] = statistics.median(latencies) if latencies else None
+            stats[domain] = entry
+        return stats
+
+    def expected_yield_per_second(self, stats: Optional[Dict]) -> float:
+        # Beta(1, 1) prior: unseen domains rank as a coin flip at the default latency
+        attempts = stats["attempts"] if stats else 0
+        successes = stats["successes"] if stats else 0
+        latency = (stats or {}).get("median_latency") or self.default_latency
+        return ((successes + 1) / (attempts + 2)) / max(latency, 0.05)
+
+    def rank_urls(self, urls: List[str]) -> List[str]:
+        """Orders candidate URLs by their domain's expected recipes per second of fetching."""
+        stats = self.stats(url_domain(url) for url in urls)
+        scores = {
+            url: self.expected_yield_per_second(stats.get(url_domain(url))) for url in urls
+        }
+        # sorted() is stable, so equally scored URLs keep the search engine's order
+        return sorted(urls, key=lambda url: -scores[url])
+
+    def excluded_domains(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Domains with at least min_samples recent attempts and a success rate
+        below the threshold, worst first.
+        """
+        limit = limit or int(os.environ.get("DOMAIN_EXCLUSION_MAX", 10))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT domain, AVG(ok) AS rate FROM outcomes WHERE recorded_at >= ? "
+                "GROUP BY domain HAVING COUNT(*) >= ? AND rate < ? ORDER BY rate, COUNT(*) DESC LIMIT ?",
+                (time.time() - self.window_seconds, self.min_samples, self.exclude_below, limit),
+            ).fetchall()
+        return [domain for domain, _ in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache(maxsize=1)
+def get_domain_stats() -> Optional[DomainStatsStore]:
+    """The node's domain stats store, or None when DOMAIN_STATS_ENABLED is false."""
+    if os.environ.get("DOMAIN_STATS_ENABLED", "true").lower() != "true":
+        return None
+    try:
+        return DomainStatsStore()
+    except Exception as e:
+        logging.warning(f"Domain stats disabled, could not open store: {e}")
+        return None
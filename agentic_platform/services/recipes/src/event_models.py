@@ -16,6 +16,11 @@ class WorkflowType(Enum):
     recipe_workflow_full = "recipe_workflow_full"
 
 
+class WorkflowPriority(Enum):
+    interactive = "interactive"
+    batch = "batch"
+
+
 class WorkflowPayload(BaseModel):
     search_query: str = Field(
         ...,
@@ -38,6 +43,15 @@ class WorkflowInitiateMessage(BaseModel):
     workflow_payload: WorkflowPayload = Field(
         ..., description="Payload data specific to the workflow type."
     )
+    priority: Optional[WorkflowPriority] = Field(
+        None,
+        description="Scheduling lane: 'interactive' (default, user-facing) or 'batch' (backfills).",
+    )
+    deadline_seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Time budget for the whole workflow in seconds (optional, default is set by the service).",
+    )
 
 
 class EventType(Enum):
@@ -0,0 +1,100 @@
+import bisect
+import os
+import threading
+from typing import Dict, List, Optional
+
+
+def _bucket_bounds(smallest: float = 0.05, largest: float = 120.0, factor: float = 1.25) -> List[float]:
+    bounds = [smallest]
+    while bounds[-1] < largest:
+        bounds.append(bounds[-1] * factor)
+    return bounds
+
+
+BUCKET_BOUNDS = _bucket_bounds()
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram (upper bounds from 50 ms to 2 min, 25%
+    apart). Once `window` samples are held all counts are halved, so the
+    percentiles follow recent behaviour without storing samples.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.total = 0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.total += 1
+        if self.total >= self.window:
+            self.counts = [count // 2 for count in self.counts]
+            self.total = sum(self.counts)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of samples."""
+        if not self.total:
+            return None
+        rank = fraction * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKET_BOUNDS[min(index, len(BUCKET_BOUNDS) - 1)]
+        return BUCKET_BOUNDS[-1]
+
+
+class FetchLatencyTracker:
+    """
+    Per-domain page fetch latencies, used to pick how long a fetch may run
+    before a hedged duplicate request is sent: the domain's p95, clamped to
+    [min_delay, max_delay], or `default_delay` until `min_samples` fetches
+    have been seen.
+    """
+
+    def __init__(
+        self,
+        min_samples: int = 10,
+        default_delay: Optional[float] = None,
+        min_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+    ):
+        self.min_samples = min_samples
+        self.default_delay = default_delay or float(os.environ.get("FETCH_HEDGE_DEFAULT_SECONDS", 3.0))
+        self.min_delay = min_delay or float(os.environ.get("FETCH_HEDGE_MIN_SECONDS", 0.25))
+        self.max_delay = max_delay or float(os.environ.get("FETCH_HEDGE_MAX_SECONDS", 8.0))
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def record(self, domain: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(domain)
+            if histogram is None:
+                histogram = self._histograms[domain] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def hedge_delay(self, domain: str) -> float:
+        with self._lock:
+            histogram = self._histograms.get(domain)
+            if histogram is None or histogram.total < self.min_samples:
+                return self.default_delay
+            p95 = histogram.percentile(0.95)
+        return min(self.max_delay, max(self.min_delay, p95))
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """p50/p95/p99 and sample count per domain."""
+        with self._lock:
+            return {
+                domain: {
+                    "samples": histogram.total,
+                    "p50": histogram.percentile(0.50),
+                    "p95": histogram.percentile(0.95),
+                    "p99": histogram.percentile(0.99),
+                }
+                for domain, histogram in self._histograms.items()
+            }
+
+
+fetch_latencies = FetchLatencyTracker()
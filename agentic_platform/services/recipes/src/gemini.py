@@ -1,24 +1,21 @@
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
-import requests
-from recipe_scrapers import scrape_html
 import json
+import logging
 import time
 
-load_dotenv()
+from llm import get_model
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
-model = genai.GenerativeModel("gemini-2.0-flash", generation_config={"temperature": 0})
+logger = logging.getLogger(__name__)
 
 
 def scrape_recipe_from_url(url: str):
     """
     Scrape and parse a recipe from a URL using recipe-scrapers and Gemini.
     """
+    import requests
+    from recipe_scrapers import scrape_html
+
     try:
-        print(f"Fetching URL: {url}")
+        logger.info("Fetching URL: %s", url)
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
@@ -27,7 +24,7 @@ def scrape_recipe_from_url(url: str):
 
         scraper = scrape_html(html=html, org_url=url, wild_mode=True)
         recipe_json = scraper.to_json()
-        print(f"Raw Recipe JSON: {recipe_json}")
+        logger.debug("Raw recipe JSON (%d chars): %s", len(recipe_json), recipe_json)
 
         prompt = f"""
         Parse this recipe JSON into our required format. Return ONLY a JSON with two keys: 'recipe' and 'ingredients'.
@@ -63,14 +60,14 @@ def scrape_recipe_from_url(url: str):
         Use None (not null) for any missing fields.
         """
 
-        response = model.generate_content(prompt)
+        response = get_model().generate_content(prompt)
         # Extract just the JSON content from markdown response
         json_str = response.text.replace("```json\n", "").replace("\n```", "")
         parsed_data = json.loads(json_str)
         return parsed_data
 
     except Exception as e:
-        print(f"Error scraping recipe: {str(e)}")
+        logger.error("Error scraping recipe: %s", e)
         return None
 
 
@@ -78,6 +75,7 @@ if __name__ == "__main__":
     import warnings
 
     warnings.filterwarnings("ignore")  # Suppress gRPC warnings
+    logging.basicConfig(level=logging.INFO)
     start_time = time.time()
 
     test_url = "https://www.indianhealthyrecipes.com/carrot-fry-carrot-curry-recipe/"
@@ -0,0 +1,286 @@
+"""
+Generates structs.py: lightweight __slots__ transport structs for the
+service's message schemas.
+
+Sources are schema.json (WorkflowInitiateMessage), metrics_schema.json
+(MetricsEvent) and the JSON schema of models.Recipe. Each generated class
+has to_dict/from_dict, encode/decode (compact JSON bytes) and a cheap
+validate() that checks required fields, types and enums. Decoding does
+not validate; pydantic models stay the validation layer at the system
+boundaries (messages from the API, LLM output).
+
+Usage (from services/recipes/src):
+
+    python gen_structs.py [--output structs.py]
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, List, Tuple
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PREAMBLE = '''\
+# generated by gen_structs.py:
+#   sources: schema.json, metrics_schema.json, models.Recipe
+#   regenerate with `make structs`; do not edit by hand.
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+# Reused encoder: json.dumps builds a new JSONEncoder per call for non-default options
+_encode_json = json.JSONEncoder(separators=(",", ":"), default=_json_default).encode
+
+
+def _check(value: Any, field: str, types: tuple, required: bool, enum: tuple = ()):
+    if value is None:
+        if required:
+            raise ValueError(f"{field}: field required")
+        return
+    if isinstance(value, bool) and bool not in types:
+        raise ValueError(f"{field}: expected {'/'.join(t.__name__ for t in types)}")
+    if not isinstance(value, types):
+        raise ValueError(f"{field}: expected {'/'.join(t.__name__ for t in types)}")
+    if enum and value not in enum:
+        raise ValueError(f"{field}: must be one of {', '.join(map(str, enum))}")
+'''
+
+SCALAR_TYPES = {
+    "string": "str",
+    "integer": "int",
+    "number": "float",
+    "boolean": "bool",
+}
+
+CHECK_TYPES = {
+    "string": "(str,)",
+    "integer": "(int,)",
+    "number": "(int, float)",
+    "boolean": "(bool,)",
+    "object": "(dict,)",
+    "array": "(list,)",
+}
+
+FORMAT_CHECK_TYPES = {
+    "date-time": "(str, datetime)",
+    "uuid": "(str, UUID)",
+}
+
+
+class StructGenerator:
+    def __init__(self):
+        self.classes: Dict[str, List[Tuple[str, dict, bool]]] = {}
+        self.docs: Dict[str, str] = {}
+        self.definitions: Dict[str, dict] = {}
+
+    def add_schema(self, schema: dict, name: str = None):
+        self.definitions.update(schema.get("$defs", {}))
+        self._add_object(name or schema["title"], schema)
+
+    def _resolve(self, prop: dict) -> dict:
+        # pydantic renders Optional[X] as anyOf [X, null]
+        if "anyOf" in prop:
+            options = [option for option in prop["anyOf"] if option.get("type") != "null"]
+            if len(options) == 1:
+                prop = {**options[0], **{k: v for k, v in prop.items() if k != "anyOf"}}
+        if "$ref" in prop:
+            ref_name = prop["$ref"].rsplit("/", 1)[-1]
+            definition = self.definitions[ref_name]
+            if ref_name not in self.classes:
+                self._add_object(ref_name, definition)
+            return {**prop, "type": "object", "struct": ref_name}
+        return prop
+
+    def _add_object(self, name: str, schema: dict):
+        self.classes[name] = []
+        self.docs[name] = schema.get("description", name)
+        required = set(schema.get("required", []))
+        fields = []
+        for field, prop in schema.get("properties", {}).items():
+            prop = self._resolve(prop)
+            if prop.get("type") == "object" and "properties" in prop and "struct" not in prop:
+                nested_name = "".join(part.title() for part in field.split("_"))
+                self._add_object(nested_name, prop)
+                prop = {**prop, "struct": nested_name}
+            if prop.get("type") == "array":
+                prop = {**prop, "items": self._resolve(prop.get("items", {}))}
+            fields.append((field, prop, field in required))
+        # Required fields first so they can be positional arguments
+        fields.sort(key=lambda item: not item[2])
+        self.classes[name] = fields
+
+    def _annotation(self, prop: dict) -> str:
+        if "struct" in prop:
+            return prop["struct"]
+        if prop.get("type") == "array":
+            return f"List[{self._annotation(prop['items'])}]"
+        if prop.get("type") == "object":
+            return "Dict[str, Any]"
+        if prop.get("format") == "date-time":
+            return "str | datetime"
+        return SCALAR_TYPES.get(prop.get("type"), "Any")
+
+    def _to_dict_expr(self, field: str, prop: dict) -> str:
+        value = f"self.{field}"
+        if "struct" in prop:
+            return f"{value}.to_dict() if {value} is not None else None"
+        items = prop.get("items", {})
+        if prop.get("type") == "array" and "struct" in items:
+            return f"[item.to_dict() for item in {value}] if {value} is not None else None"
+        return value
+
+    def _from_dict_expr(self, field: str, prop: dict, required: bool) -> str:
+        value = f'data["{field}"]' if required else f'data.get("{field}")'
+        if "struct" in prop:
+            expr = f"{prop['struct']}.from_dict({value})"
+        elif prop.get("type") == "array" and "struct" in prop.get("items", {}):
+            expr = f"[{prop['items']['struct']}.from_dict(item) for item in {value}]"
+        else:
+            return value
+        if required:
+            return expr
+        return f'{expr} if data.get("{field}") is not None else None'
+
+    def _validate_lines(self, field: str, prop: dict, required: bool) -> List[str]:
+        value = f"self.{field}"
+        if "struct" in prop:
+            types = f"({prop['struct']},)"
+        else:
+            types = FORMAT_CHECK_TYPES.get(prop.get("format"), CHECK_TYPES.get(prop.get("type"), "(object,)"))
+        enum = prop.get("enum")
+        enum_arg = f", {tuple(enum)!r}" if enum else ""
+        lines = [f'_check({value}, "{field}", {types}, {required}{enum_arg})']
+        if "struct" in prop:
+            lines.append(f"if {value} is not None:")
+            lines.append(f"    {value}.validate()")
+        elif prop.get("type") == "array":
+            items = prop.get("items", {})
+            if "struct" in items:
+                item_types = f"({items['struct']},)"
+            else:
+                item_types = CHECK_TYPES.get(items.get("type"), "(object,)")
+            lines.append(f"for item in {value} or ():")
+            lines.append(f'    _check(item, "{field}[]", {item_types}, True)')
+            if "struct" in items:
+                lines.append("    item.validate()")
+        return lines
+
+    def render_class(self, name: str) -> str:
+        fields = self.classes[name]
+        params = []
+        for field, prop, required in fields:
+            annotation = self._annotation(prop)
+            if required:
+                params.append(f"{field}: {annotation}")
+            else:
+                params.append(f"{field}: Optional[{annotation}] = None")
+
+        out = [f"class {name}:", f'    """{self.docs[name]}"""', ""]
+        slots = ", ".join(f'"{field}"' for field, _, _ in fields)
+        out.append(f"    __slots__ = ({slots}{',' if len(fields) == 1 else ''})")
+        out.append("")
+        out.append("    def __init__(")
+        out.append("        self,")
+        for param in params:
+            out.append(f"        {param},")
+        out.append("    ):")
+        for field, _, _ in fields:
+            out.append(f"        self.{field} = {field}")
+        out.append("")
+        out.append("    def __repr__(self) -> str:")
+        reprs = ", ".join(f"{field}={{self.{field}!r}}" for field, _, _ in fields)
+        out.append(f'        return f"{name}({reprs})"')
+        out.append("")
+        out.append("    def __eq__(self, other: Any) -> bool:")
+        out.append(f"        if not isinstance(other, {name}):")
+        out.append("            return NotImplemented")
+        out.append("        return self.to_dict() == other.to_dict()")
+        out.append("")
+        out.append("    def to_dict(self) -> Dict[str, Any]:")
+        out.append("        return {")
+        for field, prop, _ in fields:
+            out.append(f'            "{field}": {self._to_dict_expr(field, prop)},')
+        out.append("        }")
+        out.append("")
+        out.append("    @classmethod")
+        out.append(f"    def from_dict(cls, data: Dict[str, Any]) -> {name}:")
+        out.append("        return cls(")
+        for field, prop, required in fields:
+            out.append(f"            {field}={self._from_dict_expr(field, prop, required)},")
+        out.append("        )")
+        out.append("")
+        out.append("    def encode(self) -> bytes:")
+        out.append(
+            "        return _encode_json(self.to_dict()).encode()"
+        )
+        out.append("")
+        out.append("    @classmethod")
+        out.append(f"    def decode(cls, raw: bytes | str) -> {name}:")
+        out.append("        return cls.from_dict(json.loads(raw))")
+        out.append("")
+        out.append(f"    def validate(self) -> {name}:")
+        out.append('        """Checks required fields, types and enums; raises ValueError."""')
+        for field, prop, required in fields:
+            for line in self._validate_lines(field, prop, required):
+                out.append(f"        {line}")
+        out.append("        return self")
+        return "\n".join(out)
+
+    def render(self) -> str:
+        # Nested structs are registered before their parents finish, but
+        # render dependencies first so annotations read top-down.
+        return PREAMBLE + "".join(
+            f"\n\n{self.render_class(name)}\n" for name in self._ordered_names()
+        )
+
+    def _ordered_names(self) -> List[str]:
+        ordered: List[str] = []
+
+        def visit(name: str):
+            if name in ordered:
+                return
+            for _, prop, _ in self.classes[name]:
+                dependency = prop.get("struct") or prop.get("items", {}).get("struct")
+                if dependency:
+                    visit(dependency)
+            ordered.append(name)
+
+        for name in self.classes:
+            visit(name)
+        return ordered
+
+
+def generate() -> str:
+    from models import Recipe
+
+    generator = StructGenerator()
+    for filename in ("schema.json", "metrics_schema.json"):
+        with open(os.path.join(SRC_DIR, filename)) as f:
+            generator.add_schema(json.load(f))
+    generator.add_schema(Recipe.model_json_schema(), name="Recipe")
+    return generator.render()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate structs.py from the JSON schemas")
+    parser.add_argument("--output", default=os.path.join(SRC_DIR, "structs.py"))
+    args = parser.parse_args()
+    with open(args.output, "w") as f:
+        f.write(generate())
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import functools
+import logging
+import mmap
+import os
+import re
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional
+
+from local_store import state_dir
+
+# Preparation and size words that do not change which ingredient is meant
+DESCRIPTOR_WORDS = frozenset(
+    {
+        "and", "chopped", "diced", "finely", "for", "fresh", "freshly", "grated",
+        "ground", "large", "medium", "minced", "of", "or", "peeled", "roughly",
+        "sliced", "small", "taste", "thinly", "to",
+    }
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _singular(token: str) -> str:
+    if len(token) <= 3 or token.endswith("ss"):
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith(("oes", "ches", "shes", "xes")):
+        return token[:-2]
+    if token.endswith("s"):
+        return token[:-1]
+    return token
+
+
+def ingredient_tokens(name: str) -> List[str]:
+    """Sorted, de-duplicated, singularized tokens of an ingredient name."""
+    tokens = {
+        _singular(token)
+        for token in _TOKEN_PATTERN.findall(name.lower())
+        if token not in DESCRIPTOR_WORDS
+    }
+    return sorted(tokens)
+
+
+class IngredientIndex:
+    """
+    Canonical ingredient names known to the Pantry Chef API.
+
+    Names live in an append-only lexicon file (one name per line) that is
+    memory-mapped, so worker processes on a node share one page-cached copy.
+    In memory the index keeps only line offsets, a normalized-key map for
+    exact matches, and a token -> entry posting map for fuzzy matching
+    (token-set Jaccard similarity against entries sharing a token).
+
+    The lexicon is refreshed incrementally: names fetched from the API and
+    names created locally are appended, and only bytes past the indexed end
+    of the file are scanned.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        api_client=None,
+        refresh_seconds: Optional[float] = None,
+        match_threshold: Optional[float] = None,
+    ):
+        self.path = path or os.path.join(state_dir(), "ingredient_lexicon.txt")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.api_client = api_client
+        self.refresh_seconds = (
+            refresh_seconds
+            if refresh_seconds is not None
+            else float(os.environ.get("INGREDIENT_INDEX_REFRESH_SECONDS", 600))
+        )
+        self.match_threshold = (
+            match_threshold
+            if match_threshold is not None
+            else float(os.environ.get("INGREDIENT_MATCH_THRESHOLD", 0.7))
+        )
+        self._lock = threading.RLock()
+        self._mmap: Optional[mmap.mmap] = None
+        self._indexed_bytes = 0
+        self._offsets = array("Q")  # start offset of each entry; end is the next "\n"
+        self._token_counts = array("H")
+        self._by_key: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._last_refresh = 0.0
+        self._load_new_entries()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def name(self, entry: int) -> str:
+        start = self._offsets[entry]
+        end = self._mmap.find(b"\n", start)
+        return self._mmap[start:end].decode("utf-8")
+
+    def _load_new_entries(self):
+        """Indexes complete lines appended to the lexicon since the last load."""
+        with self._lock:
+            if not os.path.exists(self.path):
+                return
+            size = os.path.getsize(self.path)
+            if size <= self._indexed_bytes:
+                return
+            with open(self.path, "rb") as f:
+                new_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._mmap is not None:
+                self._mmap.close()
+            self._mmap = new_map
+
+            position = self._indexed_bytes
+            while True:
+                end = new_map.find(b"\n", position)
+                if end < 0:
+                    break  # partial line still being written
+                name = new_map[position:end].decode("utf-8", errors="replace")
+                self._index_entry(name, position)
+                position = end + 1
+            self._indexed_bytes = position
+
+    def _index_entry(self, name: str, offset: int):
+        tokens = ingredient_tokens(name)
+        if not tokens:
+            return
+        key = " ".join(tokens)
+        if key in self._by_key:
+            return
+        entry = len(self._offsets)
+        self._offsets.append(offset)
+        self._token_counts.append(min(len(tokens), 0xFFFF))
+        self._by_key[key] = entry
+        for token in tokens:
+            self._postings.setdefault(token, array("I")).append(entry)
+
+    def add(self, names: List[str]):
+        """Appends names that are not already in the lexicon."""
+        with self._lock:
+            new_names = {}
+            for name in names:
+                key = " ".join(ingredient_tokens(name))
+                if key and key not in self._by_key and key not in new_names:
+                    new_names[key] = " ".join(name.split())
+            new_names = list(new_names.values())
+            if new_names:
+                with open(self.path, "ab") as f:
+                    f.write("".join(f"{name}\n" for name in new_names).encode("utf-8"))
+            self._load_new_entries()
+
+    def refresh(self, force: bool = False):
+        """Pulls the API's ingredient list into the lexicon when it is stale."""
+        if self.api_client is None:
+            return
+        if not force and time.time() - self._last_refresh < self.refresh_seconds:
+            self._load_new_entries()  # pick up names other workers appended
+            return
+        self._last_refresh = time.time()
+        try:
+            names = [ingredient["name"] for ingredient in self.api_client.list_ingredients()]
+        except Exception as e:
+            logging.warning("Could not refresh ingredient index from API: %s", e)
+            self._load_new_entries()
+            return
+        self.add(names)
+        logging.info("Ingredient index refreshed: %s canonical names", len(self))
+
+    def lookup(self, name: str) -> Optional[str]:
+        """The canonical name matching `name`, or None."""
+        tokens = ingredient_tokens(name)
+        if not tokens:
+            return None
+        with self._lock:
+            entry = self._by_key.get(" ".join(tokens))
+            if entry is not None:
+                return self.name(entry)
+
+            overlaps: Counter = Counter()
+            for token in tokens:
+                overlaps.update(self._postings.get(token, ()))
+            best_entry, best_score = None, 0.0
+            for candidate, overlap in overlaps.items():
+                union = len(tokens) + self._token_counts[candidate] - overlap
+                score = overlap / union
+                # Ties go to the older (lower numbered) entry
+                if score > best_score or (score == best_score and candidate < best_entry):
+                    best_entry, best_score = candidate, score
+            if best_entry is not None and best_score >= self.match_threshold:
+                return self.name(best_entry)
+            return None
+
+    def canonicalize(self, name: str) -> str:
+        """
+        Maps a name to its canonical form. Unknown names become canonical
+        themselves, so later variants of them converge on one spelling.
+        """
+        canonical = self.lookup(name)
+        if canonical is not None:
+            return canonical
+        cleaned = " ".join(name.split())
+        self.add([cleaned])
+        return cleaned
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+
+
+@functools.lru_cache(maxsize=None)
+def get_ingredient_index() -> IngredientIndex:
+    """Returns the process-wide ingredient index backed by the Pantry Chef API."""
+    from api_client import PantryChefAPIClient
+
+    return IngredientIndex(api_client=PantryChefAPIClient())
+
+
+def canonicalize_ingredients(recipe, index: Optional[IngredientIndex] = None):
+    """Rewrites each RecipeIngredient.name of `recipe` to its canonical form."""
+    if os.environ.get("INGREDIENT_CANONICALIZATION_ENABLED", "true").lower() != "true":
+        return recipe
+    index = index or get_ingredient_index()
+    index.refresh()
+    for ingredient in recipe.ingredients:
+        ingredient.name = index.canonicalize(ingredient.name)
+    return recipe
@@ -0,0 +1,232 @@
+import functools
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Canonical units are the API's measurement_unit enum. Each maps to its
+# dimension and its size in the dimension's base unit (g or ml).
+UNIT_TABLE: Dict[str, Tuple[str, float]] = {
+    "g": ("mass", 1.0),
+    "kg": ("mass", 1000.0),
+    "oz": ("mass", 28.349523125),
+    "lb": ("mass", 453.59237),
+    "ml": ("volume", 1.0),
+    "l": ("volume", 1000.0),
+    "tsp": ("volume", 4.92892159375),
+    "tbsp": ("volume", 14.78676478125),
+    "fl_oz": ("volume", 29.5735295625),
+    "cup": ("volume", 236.5882365),
+    "pint": ("volume", 473.176473),
+    "qt": ("volume", 946.352946),
+    "gal": ("volume", 3785.411784),
+    "piece": ("count", 1.0),
+    "pinch": ("count", 1.0),
+    "handful": ("count", 1.0),
+    "whole": ("count", 1.0),
+    "to_taste": ("count", 1.0),
+}
+
+UNIT_ALIASES: Dict[str, str] = {
+    "gram": "g", "gr": "g", "grm": "g",
+    "kilogram": "kg", "kilo": "kg", "kgs": "kg",
+    "ounce": "oz",
+    "pound": "lb", "lbs": "lb",
+    "milliliter": "ml", "millilitre": "ml", "mls": "ml",
+    "liter": "l", "litre": "l", "ltr": "l",
+    "teaspoon": "tsp", "tspn": "tsp",
+    "tablespoon": "tbsp", "tbs": "tbsp", "tbl": "tbsp", "tbsps": "tbsp", "tb": "tbsp",
+    "fluid ounce": "fl_oz", "fl oz": "fl_oz", "floz": "fl_oz",
+    "c": "cup",
+    "pt": "pint",
+    "quart": "qt",
+    "gallon": "gal",
+    "pc": "piece", "pcs": "piece",
+    "to taste": "to_taste",
+}
+
+# Single letters whose case is the unit: "T" is a tablespoon, "t" a teaspoon
+CASE_SENSITIVE_ALIASES: Dict[str, str] = {"T": "tbsp", "t": "tsp"}
+
+# Units kept as-is when converting to metric: spoon measures are the metric
+# kitchen standard for small amounts, and counts have no metric form.
+KEEP_UNITS = frozenset({"tsp", "tbsp", "piece", "pinch", "handful", "whole", "to_taste"})
+
+_VULGAR_FRACTIONS = {
+    "½": 0.5, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 0.25, "¾": 0.75, "⅕": 0.2,
+    "⅖": 0.4, "⅗": 0.6, "⅘": 0.8, "⅙": 1 / 6, "⅚": 5 / 6, "⅛": 0.125,
+    "⅜": 0.375, "⅝": 0.625, "⅞": 0.875,
+}
+_VULGAR = "".join(_VULGAR_FRACTIONS)
+
+# One amount: "1", "1.5", "1,5", "1,000", "1/2", "1 1/2", "1½", "½"
+_NUMBER = r"(?:\d{1,3}(?:,\d{3})+(?:\.\d+)?(?!\d)|\d+(?:[.,]\d+)?)"
+_THOUSANDS_SEPARATOR = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")
+_AMOUNT = rf"(?:{_NUMBER}(?:\s+\d+/\d+|\s*[{_VULGAR}])?|\d+/\d+|[{_VULGAR}])"
+_QUANTITY_PATTERN = re.compile(
+    rf"^\s*(?P<low>{_AMOUNT})(?:\s*(?:-|–|to)\s*(?P<high>{_AMOUNT}))?\s*"
+)
+_UNIT_WORD_PATTERN = re.compile(r"^(?P<unit>fl\.?\s?oz|[a-zA-Z]+)\.?(?:\s+|$)")
+_TO_TASTE_PATTERN = re.compile(r"\bto taste\b", re.IGNORECASE)
+
+_UNIT_NAMES: List[str] = list(UNIT_TABLE)
+_UNIT_CODES: Dict[str, int] = {unit: code for code, unit in enumerate(_UNIT_NAMES, start=1)}
+_NO_UNIT = 0
+_NAN = float("nan")
+
+
+def _metric_target(unit: str) -> str:
+    if unit in KEEP_UNITS:
+        return unit
+    return "g" if UNIT_TABLE[unit][0] == "mass" else "ml"
+
+
+# Lookup arrays indexed by unit code (0 = no unit): factor into the target
+# unit and the target unit's code.
+_TO_METRIC_FACTOR = np.ones(len(_UNIT_NAMES) + 1)
+_TO_METRIC_CODE = np.zeros(len(_UNIT_NAMES) + 1, dtype=np.int64)
+for _unit, _code in _UNIT_CODES.items():
+    _target = _metric_target(_unit)
+    _TO_METRIC_FACTOR[_code] = UNIT_TABLE[_unit][1] / UNIT_TABLE[_target][1]
+    _TO_METRIC_CODE[_code] = _UNIT_CODES[_target]
+
+
+# Free-form units and amounts repeat heavily across recipes, so parses are memoized
+@functools.lru_cache(maxsize=4096)
+def canonical_unit(unit: Optional[str]) -> Optional[str]:
+    """Maps a free-form unit ("Tbs.", "grams") to the canonical table, or None."""
+    if not unit:
+        return None
+    key = unit.strip().rstrip(".")
+    if key in CASE_SENSITIVE_ALIASES:
+        return CASE_SENSITIVE_ALIASES[key]
+    key = key.lower()
+    if key in _UNIT_CODES:
+        return key
+    if key in UNIT_ALIASES:
+        return UNIT_ALIASES[key]
+    if key.endswith("es") and key[:-2] in UNIT_ALIASES:
+        return UNIT_ALIASES[key[:-2]]
+    if key.endswith("s"):
+        singular = key[:-1]
+        if singular in _UNIT_CODES:
+            return singular
+        return UNIT_ALIASES.get(singular)
+    return None
+
+
+def _amount(text: str) -> float:
+    # "1,000" is a thousand; any other comma is a decimal comma ("1,5")
+    text = _THOUSANDS_SEPARATOR.sub("", text.strip()).replace(",", ".")
+    value = 0.0
+    if text and text[-1] in _VULGAR_FRACTIONS:
+        value = _VULGAR_FRACTIONS[text[-1]]
+        text = text[:-1].strip()
+    for part in text.split():
+        if "/" in part:
+            numerator, denominator = part.split("/")
+            value += float(numerator) / float(denominator)
+        else:
+            value += float(part)
+    return value
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_quantity(text: str) -> Tuple[Optional[float], str]:
+    """
+    Parses a leading amount ("1 1/2", "½", "2-3", "1 to 2") from text.
+    Ranges resolve to their midpoint. Returns (quantity, remaining text).
+    """
+    match = _QUANTITY_PATTERN.match(text)
+    if not match:
+        return None, text
+    low = _amount(match.group("low"))
+    high = match.group("high")
+    quantity = (low + _amount(high)) / 2 if high else low
+    return quantity, text[match.end():]
+
+
+def parse_ingredient_line(text: str) -> Tuple[Optional[float], Optional[str], str]:
+    """Splits "1 1/2 Tbs. olive oil" into (1.5, "tbsp", "olive oil")."""
+    quantity, rest = parse_quantity(text)
+    if quantity is None:
+        return None, None, text
+    match = _UNIT_WORD_PATTERN.match(rest)
+    if match:
+        unit = canonical_unit(match.group("unit").replace(".", ""))
+        if unit is not None:
+            return quantity, unit, rest[match.end():]
+    return quantity, None, rest
+
+
+def normalize_ingredients(
+    ingredients: List[Dict], to_metric: Optional[bool] = None
+) -> List[Dict]:
+    """
+    Normalizes a recipe's ingredient dicts in place and returns them.
+
+    Per line: string quantities are parsed (fractions, ranges), missing
+    quantities are recovered from a leading amount in the name, units are
+    mapped to the canonical table (unknown units move to notes) and
+    "to taste" items get the to_taste unit. Then the whole recipe's
+    quantities are converted to metric (g, ml) in one vectorized step.
+    """
+    if to_metric is None:
+        to_metric = os.environ.get("INGREDIENT_METRIC_UNITS", "true").lower() == "true"
+
+    quantities: List[float] = []
+    codes: List[int] = []
+    for ingredient in ingredients:
+        quantity = ingredient.get("quantity")
+        raw_unit = ingredient.get("unit")
+
+        if isinstance(quantity, str):
+            parsed, rest = parse_quantity(quantity)
+            quantity = parsed
+            if raw_unit is None and rest.strip():
+                raw_unit = rest
+        elif quantity is None and ingredient.get("name"):
+            parsed, unit, rest = parse_ingredient_line(ingredient["name"])
+            if parsed is not None and rest.strip():
+                quantity = parsed
+                raw_unit = raw_unit or unit
+                ingredient["name"] = rest.strip()
+
+        code = _NO_UNIT
+        if raw_unit:
+            unit = canonical_unit(raw_unit)
+            if unit is None:
+                # Keep what the unit said ("cloves", "cans") next to the count
+                unit = "piece"
+                notes = ingredient.get("notes")
+                ingredient["notes"] = f"{raw_unit}, {notes}" if notes else str(raw_unit)
+            code = _UNIT_CODES[unit]
+        if not code and quantity is None:
+            text = f"{ingredient.get('name') or ''} {ingredient.get('notes') or ''}"
+            if _TO_TASTE_PATTERN.search(text):
+                code = _UNIT_CODES["to_taste"]
+
+        quantities.append(_NAN if quantity is None else quantity)
+        codes.append(code)
+
+    quantity_array = np.array(quantities, dtype=np.float64)
+    code_array = np.array(codes, dtype=np.int64)
+    if to_metric:
+        converted = np.round(quantity_array * _TO_METRIC_FACTOR[code_array], 2)
+        target_codes = _TO_METRIC_CODE[code_array]
+    else:
+        converted, target_codes = np.round(quantity_array, 3), code_array
+
+    for ingredient, quantity, code, original_quantity, original_code in zip(
+        ingredients, converted.tolist(), target_codes.tolist(), quantities, codes
+    ):
+        is_missing = quantity != quantity  # NaN
+        if code != original_code and not is_missing:
+            # Keep the recipe's original measure readable next to the metric one
+            original = f"{original_quantity:g} {_UNIT_NAMES[original_code - 1]}"
+            notes = ingredient.get("notes")
+            ingredient["notes"] = f"{original}, {notes}" if notes else original
+        ingredient["quantity"] = None if is_missing else quantity
+        ingredient["unit"] = _UNIT_NAMES[code - 1] if code else None
+    return ingredients
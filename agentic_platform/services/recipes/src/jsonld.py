@@ -0,0 +1,158 @@
+import json
+import logging
+import re
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+# Complete <script type="application/ld+json"> blocks, on raw bytes (streaming)
+# and on decoded text (extraction).
+_SCRIPT_PATTERN = re.compile(
+    rb"<script[^>]*type=[\"']?application/ld\+json[\"']?[^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_SCRIPT_TEXT_PATTERN = re.compile(
+    r"<script[^>]*type=[\"']?application/ld\+json[\"']?[^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_RECIPE_TYPE_PATTERN = re.compile(rb"\"@type\"\s*:\s*(?:\[[^\]]*)?\"Recipe\"")
+_DURATION_PATTERN = re.compile(
+    r"^P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:\d+S)?)?$"
+)
+_SERVINGS_PATTERN = re.compile(r"^\s*(\d+)\s*$")
+_HTML_LANG_PATTERN = re.compile(r"<html[^>]*\blang=[\"']?([A-Za-z-]+)", re.IGNORECASE)
+
+
+class JsonLdScanner:
+    """
+    Incremental detector for a complete schema.org Recipe JSON-LD block in a
+    streamed HTML body. Each feed() only rescans from the last unfinished
+    <script> tag, so scanning stays linear in the page size.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self._scan_from = 0
+
+    def feed(self, chunk: bytes) -> bool:
+        """Adds a chunk; True once the buffer holds a complete Recipe block."""
+        self.buffer += chunk
+        while True:
+            match = _SCRIPT_PATTERN.search(self.buffer, self._scan_from)
+            if match is None:
+                break
+            self._scan_from = match.end()
+            if _RECIPE_TYPE_PATTERN.search(match.group(1)):
+                return True
+        # Resume at a <script tag that may still be open, or just before the
+        # end of the buffer in case the tag itself is split across chunks
+        open_at = max(
+            self.buffer.rfind(b"<script", self._scan_from),
+            self.buffer.rfind(b"<SCRIPT", self._scan_from),
+        )
+        self._scan_from = open_at if open_at != -1 else max(self._scan_from, len(self.buffer) - 16)
+        return False
+
+
+def _iter_nodes(data: Any) -> Iterator[Dict[str, Any]]:
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        if "@graph" in data:
+            yield from _iter_nodes(data["@graph"])
+
+
+def _is_recipe(node: Dict[str, Any]) -> bool:
+    node_type = node.get("@type")
+    if isinstance(node_type, list):
+        return "Recipe" in node_type
+    return node_type == "Recipe"
+
+
+def _minutes(duration: Any) -> Optional[int]:
+    if not isinstance(duration, str):
+        return None
+    match = _DURATION_PATTERN.match(duration.strip())
+    if not match or not any(match.groupdict().values()):
+        return None
+    parts = {key: int(value or 0) for key, value in match.groupdict().items()}
+    return parts["days"] * 1440 + parts["hours"] * 60 + parts["minutes"]
+
+
+def _first(value: Any) -> Any:
+    return value[0] if isinstance(value, list) and value else value
+
+
+def _name(value: Any) -> Optional[str]:
+    value = _first(value)
+    if isinstance(value, dict):
+        return value.get("name") or value.get("url")
+    return value
+
+
+def _instructions(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [line.strip() for line in value.splitlines() if line.strip()]
+    if isinstance(value, list):
+        return [step for item in value for step in _instructions(item)]
+    if isinstance(value, dict):
+        if "itemListElement" in value:  # HowToSection
+            return _instructions(value["itemListElement"])
+        text = value.get("text") or value.get("name")
+        return [text.strip()] if isinstance(text, str) and text.strip() else []
+    return []
+
+
+def _yields(value: Any) -> Optional[str]:
+    value = _first(value)
+    if value is None:
+        return None
+    match = _SERVINGS_PATTERN.match(str(value))
+    return f"{match.group(1)} servings" if match else str(value)
+
+
+def recipe_from_node(node: Dict[str, Any], url: str) -> Dict[str, Any]:
+    """Maps a schema.org Recipe node to the shape of recipe_scrapers' to_json()."""
+    ingredients = [str(line).strip() for line in node.get("recipeIngredient") or [] if line]
+    instructions = _instructions(node.get("recipeInstructions"))
+    nutrients = node.get("nutrition") if isinstance(node.get("nutrition"), dict) else {}
+    return {
+        "author": _name(node.get("author")),
+        "canonical_url": url,
+        "category": _first(node.get("recipeCategory")),
+        "cook_time": _minutes(node.get("cookTime")),
+        "cuisine": _first(node.get("recipeCuisine")),
+        "description": node.get("description"),
+        "host": urlparse(url).hostname,
+        "image": _name(node.get("image")),
+        "ingredient_groups": [{"ingredients": ingredients, "purpose": None}],
+        "ingredients": ingredients,
+        "instructions": "\n".join(instructions),
+        "instructions_list": instructions,
+        "nutrients": {key: value for key, value in nutrients.items() if not key.startswith("@")},
+        "prep_time": _minutes(node.get("prepTime")),
+        "title": node.get("name"),
+        "total_time": _minutes(node.get("totalTime")),
+        "yields": _yields(node.get("recipeYield")),
+    }
+
+
+def extract_recipe(html: str, url: str) -> Optional[Dict[str, Any]]:
+    """
+    Fast path: the page's JSON-LD Recipe as a recipe_scrapers-style dict, or
+    None when there is no usable block (the caller falls back to a full parse).
+    """
+    for match in _SCRIPT_TEXT_PATTERN.finditer(html):
+        try:
+            data = json.loads(match.group(1), strict=False)
+        except ValueError as e:
+            logging.debug(f"Skipping malformed JSON-LD block on {url}: {e}")
+            continue
+        for node in _iter_nodes(data):
+            if _is_recipe(node) and node.get("name") and node.get("recipeIngredient"):
+                recipe = recipe_from_node(node, url)
+                language = _HTML_LANG_PATTERN.search(html)
+                recipe["language"] = language.group(1) if language else node.get("inLanguage")
+                return recipe
+    return None
@@ -0,0 +1,21 @@
+import functools
+import logging
+import os
+
+
+@functools.lru_cache(maxsize=None)
+def get_model():
+    """
+    Returns the shared Gemini model, configuring the client on first use.
+
+    google.generativeai pulls in grpc and protobuf stubs, which dominate the
+    service's import time, so it is only imported when a model is needed.
+    """
+    import google.generativeai as genai
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    model_name = os.environ.get("GEMINI_MODEL", "gemini-2.0-flash")
+    logging.info(f"Initialized LLM client: model={model_name}")
+    return genai.GenerativeModel(model_name, generation_config={"temperature": 0})
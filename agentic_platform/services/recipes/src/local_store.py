@@ -0,0 +1,98 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Iterator, Optional, Tuple
+
+def state_dir() -> str:
+    """RECIPE_STATE_DIR, read when a store is opened rather than at import."""
+    return os.environ.get("RECIPE_STATE_DIR", "/tmp/recipe-state")
+
+
+class LocalStore:
+    """
+    Small file-backed key/value store (SQLite in WAL mode) with namespaces
+    and per-entry TTLs.
+
+    Safe to share between threads and between processes on the same node,
+    which makes it the place for caches and checkpoints that should survive
+    a worker restart.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(state_dir(), "recipe_state.db")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS kv (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            self.delete(namespace, key)
+            return None
+        return json.loads(value)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), expires_at),
+            )
+            self._conn.commit()
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+            self._conn.commit()
+
+    def items(self, namespace: str) -> Iterator[Tuple[str, Any]]:
+        """Yields the unexpired (key, value) pairs of a namespace."""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM kv WHERE namespace = ? AND (expires_at IS NULL OR expires_at >= ?)",
+                (namespace, now),
+            ).fetchall()
+        for key, value in rows:
+            yield key, json.loads(value)
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (time.time(),),
+            )
+            self._conn.commit()
+        if cursor.rowcount:
+            logging.info("Purged %s expired entries from %s", cursor.rowcount, self.path)
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
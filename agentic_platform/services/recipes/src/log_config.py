@@ -0,0 +1,275 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from memory import current_workflow
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed with `extra=`
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None))
+) | {"message", "asctime", "workflow_id", "suppressed"}
+
+# Credentials that must never reach the log stream, whatever logged them
+_SECRET_PATTERNS = [
+    (
+        re.compile(
+            r"""(?i)(["']?(?:token|api[_-]?key|password|secret|authorization)["']?\s*[:=]\s*["']?)"""
+            r"""(?:(?:bearer|basic)\s+)?[^"',\s}]+"""
+        ),
+        r"\1[REDACTED]",
+    ),
+    (re.compile(r"(?i)\b(bearer|basic)\s+[A-Za-z0-9._~+/=-]{8,}"), r"\1 [REDACTED]"),
+    (re.compile(r"\beyJ[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]*"), "[REDACTED_JWT]"),
+    (re.compile(r"\bAIza[0-9A-Za-z_-]{30,}"), "[REDACTED_API_KEY]"),
+]
+
+
+def redact(text: str) -> str:
+    for pattern, replacement in _SECRET_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: timestamp, level, logger, message, the
+    workflow the record was logged under, worker index, `extra=` fields
+    and the formatted exception. Every string is passed through redact().
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.worker = os.environ.get("RECIPE_WORKER_INDEX")
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": redact(record.getMessage()),
+        }
+        workflow_id = getattr(record, "workflow_id", None)
+        if workflow_id:
+            entry["workflow_id"] = workflow_id
+        if self.worker is not None:
+            entry["worker"] = self.worker
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = redact(value) if isinstance(value, str) else value
+        if record.exc_info:
+            entry["exc_info"] = redact(self.formatException(record.exc_info))
+        return json.dumps(entry, default=str)
+
+
+class RedactingFormatter(logging.Formatter):
+    """The plain text format, with secrets redacted."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = redact(super().format(record))
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{text} ({suppressed} similar lines suppressed)" if suppressed else text
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Drops repetitive lines before they are formatted.
+
+    - Rate limit: each call site (logger, level and unformatted message
+      template) may emit `burst` lines per `interval` seconds; the first
+      line after a suppressed stretch carries the number dropped. This is
+      why log calls pass arguments lazily instead of as f-strings: every
+      f-string is its own template.
+    - Sampling: LOG_SAMPLE_RATES ("metrics_consumer=0.1,...") keeps that
+      fraction of a logger's records (deterministically, 1 in round(1/rate)).
+
+    Records above `max_level` (errors by default) always pass.
+    """
+
+    def __init__(
+        self,
+        burst: int = 20,
+        interval: float = 10.0,
+        sample_rates: Optional[Dict[str, float]] = None,
+        max_level: int = logging.WARNING,
+    ):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.sample_rates = sample_rates or {}
+        self.max_level = max_level
+        self.stats = {"passed": 0, "rate_limited": 0, "sampled_out": 0}
+        self._windows: Dict[Tuple[str, int, Any], list] = {}
+        self._sample_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            self.stats["passed"] += 1
+            return True
+        with self._lock:
+            rate = self.sample_rates.get(record.name)
+            if rate is not None and rate < 1.0:
+                count = self._sample_counts.get(record.name, 0)
+                self._sample_counts[record.name] = count + 1
+                if rate <= 0 or count % max(1, round(1 / rate)):
+                    self.stats["sampled_out"] += 1
+                    return False
+
+            key = (record.name, record.levelno, record.msg)
+            window = self._windows.get(key)
+            if window is None or record.created - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                if len(self._windows) >= 10000:
+                    # Call sites with unbounded templates; start over rather than grow
+                    self._windows.clear()
+                self._windows[key] = [record.created, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                self.stats["passed"] += 1
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                self.stats["passed"] += 1
+                return True
+            window[2] += 1
+            self.stats["rate_limited"] += 1
+            return False
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the listener thread, which formats and writes them, so
+    the event loop never waits on a stream. The caller only merges the
+    message arguments and notes the current workflow. When the bounded
+    queue is full, records are dropped and counted rather than blocking.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.enqueued = 0
+        self.caller_seconds = 0.0
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        started = time.perf_counter()
+        try:
+            return super().handle(record)
+        finally:
+            self.caller_seconds += time.perf_counter() - started
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Copy so other handlers still see the original; arguments are merged
+        # now because they may be mutated before the listener formats them
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        record.workflow_id = current_workflow.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class LoggingState:
+    def __init__(self, handler: AsyncQueueHandler, listener: logging.handlers.QueueListener,
+                 sampling: SamplingFilter):
+        self.pid = os.getpid()
+        self.handler = handler
+        self.listener = listener
+        self.sampling = sampling
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enqueued": self.handler.enqueued,
+            "dropped": self.handler.dropped,
+            "queued": self.handler.queue.qsize(),
+            "caller_seconds": self.handler.caller_seconds,
+            **self.sampling.stats,
+        }
+
+
+_state: Optional[LoggingState] = None
+
+
+def _parse_sample_rates(value: str) -> Dict[str, float]:
+    rates = {}
+    for pair in value.split(","):
+        name, _, rate = pair.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def configure_logging(stream=None) -> LoggingState:
+    """
+    Routes the root logger through a bounded queue to a listener thread.
+
+    - LOG_LEVEL (INFO) and LOG_FORMAT: "json" (default) or "text"
+    - LOG_QUEUE_SIZE (10000): records buffered before dropping
+    - LOG_RATE_LIMIT_BURST (20) / LOG_RATE_LIMIT_INTERVAL_SECONDS (10)
+    - LOG_SAMPLE_RATES: per-logger fractions, e.g. "metrics_consumer=0.1"
+
+    Idempotent within a process; a forked worker gets its own listener.
+    """
+    global _state
+    if _state is not None and _state.pid == os.getpid():
+        return _state
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    if os.environ.get("LOG_FORMAT", "json").lower() == "text":
+        output.setFormatter(RedactingFormatter(TEXT_FORMAT))
+    else:
+        output.setFormatter(JsonFormatter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=int(os.environ.get("LOG_QUEUE_SIZE", 10000)))
+    handler = AsyncQueueHandler(log_queue)
+    sampling = SamplingFilter(
+        burst=int(os.environ.get("LOG_RATE_LIMIT_BURST", 20)),
+        interval=float(os.environ.get("LOG_RATE_LIMIT_INTERVAL_SECONDS", 10)),
+        sample_rates=_parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES", "")),
+    )
+    handler.addFilter(sampling)
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        # Includes the handler a parent process installed before forking
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+
+    listener.start()
+    _state = LoggingState(handler, listener, sampling)
+    atexit.register(shutdown_logging)
+    return _state
+
+
+def shutdown_logging():
+    """Flushes queued records and stops the listener thread."""
+    global _state
+    if _state is not None and _state.pid == os.getpid():
+        logging.getLogger().removeHandler(_state.handler)
+        _state.listener.stop()
+        _state = None
+
+
+def logging_stats() -> Dict[str, Any]:
+    return _state.stats() if _state is not None else {}
@@ -3,22 +3,26 @@ import logging
 import os
 import sys
 
+from supervisor import WorkerSupervisor, detect_worker_count
 from workflow_consumer import main as workflow_consumer_main
+from log_config import configure_logging
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, PROJECT_ROOT)
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
 
 def main():
     """Main function to start the RecipeAgentService."""
+    configure_logging()
     logging.info("Starting RecipeAgentService...")
 
-    # Start the workflow command consumer and metrics consumer
-    asyncio.run(workflow_consumer_main())
+    worker_count = detect_worker_count()
+    if worker_count > 1:
+        # One consumer + event loop per CPU, supervised by this process
+        WorkerSupervisor(worker_count).run()
+    else:
+        # Start the workflow command consumer and metrics consumer
+        asyncio.run(workflow_consumer_main())
 
     logging.info("RecipeAgentService started successfully.")
 
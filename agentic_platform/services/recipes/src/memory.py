@@ -0,0 +1,211 @@
+import asyncio
+import contextlib
+import contextvars
+import logging
+import os
+import signal
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Workflow that allocations on this task (and the threads it hands work to) belong to
+current_workflow: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_workflow", default=None
+)
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemoryAccounting:
+    """
+    Bytes held by in-flight workflows, attributed per workflow and per stage.
+
+    Stages wrap the large intermediates they keep alive (page HTML, recipe
+    JSON, LLM response text) in `hold()`; the bytes count against the
+    current workflow until the block exits. Accounting is by payload size,
+    not by allocator, so it is cheap enough to leave on in production; use
+    MemoryTracer for allocation-level detail.
+    """
+
+    def __init__(self, history: int = 256):
+        self._lock = threading.Lock()
+        self._workflows: Dict[Optional[str], Dict[str, Any]] = {}
+        self._stages: Dict[str, Dict[str, int]] = {}
+        # Peak bytes of recently finished workflows
+        self._finished_peaks: deque = deque(maxlen=history)
+        self.held_bytes = 0
+        self.peak_held_bytes = 0
+
+    @contextlib.contextmanager
+    def hold(self, stage: str, nbytes: int, workflow_id: Optional[str] = None):
+        workflow_id = workflow_id or current_workflow.get()
+        self._add(workflow_id, stage, nbytes, 1)
+        try:
+            yield
+        finally:
+            self._add(workflow_id, stage, -nbytes, -1)
+
+    def _add(self, workflow_id: Optional[str], stage: str, nbytes: int, count: int):
+        with self._lock:
+            self.held_bytes += nbytes
+            self.peak_held_bytes = max(self.peak_held_bytes, self.held_bytes)
+
+            entry = self._stages.setdefault(stage, {"held_bytes": 0, "holds": 0, "peak_bytes": 0})
+            entry["held_bytes"] += nbytes
+            entry["holds"] += count
+            entry["peak_bytes"] = max(entry["peak_bytes"], entry["held_bytes"])
+
+            if workflow_id is None:
+                return
+            workflow = self._workflows.setdefault(
+                workflow_id, {"held_bytes": 0, "peak_bytes": 0, "stages": {}}
+            )
+            workflow["held_bytes"] += nbytes
+            workflow["peak_bytes"] = max(workflow["peak_bytes"], workflow["held_bytes"])
+            stages = workflow["stages"]
+            stages[stage] = stages.get(stage, 0) + nbytes
+
+    @contextlib.contextmanager
+    def workflow(self, workflow_id: str):
+        """Attributes holds inside the block to `workflow_id`."""
+        token = current_workflow.set(workflow_id)
+        try:
+            yield
+        finally:
+            current_workflow.reset(token)
+            self.finish(workflow_id)
+
+    def finish(self, workflow_id: str):
+        with self._lock:
+            workflow = self._workflows.pop(workflow_id, None)
+            if workflow is not None:
+                self._finished_peaks.append(workflow["peak_bytes"])
+                if workflow["held_bytes"]:
+                    logging.warning(
+                        "Workflow %s finished still holding %s bytes", workflow_id, workflow["held_bytes"]
+                    )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            peaks = sorted(self._finished_peaks)
+            return {
+                "held_bytes": self.held_bytes,
+                "peak_held_bytes": self.peak_held_bytes,
+                "stages": {stage: dict(entry) for stage, entry in sorted(self._stages.items())},
+                "workflows": {
+                    str(workflow_id): {
+                        "held_bytes": workflow["held_bytes"],
+                        "peak_bytes": workflow["peak_bytes"],
+                        "stages": {stage: held for stage, held in workflow["stages"].items() if held},
+                    }
+                    for workflow_id, workflow in self._workflows.items()
+                    if workflow_id is not None
+                },
+                "finished_workflow_peak_bytes": {
+                    "count": len(peaks),
+                    "p50": peaks[len(peaks) // 2] if peaks else 0,
+                    "max": peaks[-1] if peaks else 0,
+                },
+            }
+
+    def reset(self):
+        with self._lock:
+            self._workflows.clear()
+            self._stages.clear()
+            self._finished_peaks.clear()
+            self.held_bytes = 0
+            self.peak_held_bytes = 0
+
+
+memory_accounting = MemoryAccounting()
+
+
+class MemoryTracer:
+    """
+    On-demand tracemalloc capture, toggled by env var at startup or by
+    SIGUSR2. tracemalloc slows allocation down noticeably, so it is off
+    unless asked for. Each toggle-off writes the live allocations made
+    while tracing (by source line) into PROFILE_DIR.
+    """
+
+    def __init__(self):
+        self.frames = int(os.environ.get("MEMORY_TRACE_FRAMES", 1))
+        self.output_dir = os.environ.get("PROFILE_DIR", "/tmp/recipe-profiles")
+        self.top = int(os.environ.get("MEMORY_TRACE_TOP", 50))
+
+    @property
+    def running(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if self.running:
+            return
+        tracemalloc.start(self.frames)
+        logging.info("Memory tracing started (frames=%s)", self.frames)
+
+    def top_allocations(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Largest live allocations made since tracing started, by source line.
+        Memory allocated before tracing started is not attributed.
+        """
+        if not self.running:
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        return [
+            {"location": str(stat.traceback), "bytes": stat.size, "blocks": stat.count}
+            for stat in snapshot.statistics("lineno")[: limit or self.top]
+        ]
+
+    def stop(self) -> Optional[str]:
+        """Stops tracing and returns the path of the written report."""
+        if not self.running:
+            return None
+        allocations = self.top_allocations()
+        traced, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.output_dir, f"memory-{os.getpid()}-{stamp}.txt")
+        with open(path, "w") as f:
+            f.write(f"rss_bytes {rss_bytes()}\ntraced_bytes {traced}\npeak_traced_bytes {peak}\n\n")
+            for allocation in allocations:
+                f.write(f"{allocation['bytes']} B {allocation['blocks']} blocks {allocation['location']}\n")
+        logging.info("Memory tracing stopped, report written to %s", path)
+        return path
+
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+
+memory_tracer = MemoryTracer()
+
+
+def install_memory_tracing() -> MemoryTracer:
+    """
+    - MEMORY_TRACING_ENABLED=1 starts tracemalloc at boot.
+    - SIGUSR2 toggles tracing; each stop writes an allocation report.
+    """
+    if os.environ.get("MEMORY_TRACING_ENABLED", "0") == "1":
+        memory_tracer.start()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR2, memory_tracer.toggle)
+    except (NotImplementedError, RuntimeError, AttributeError) as e:
+        logging.warning("Could not register SIGUSR2 memory tracing toggle: %s", e)
+    return memory_tracer
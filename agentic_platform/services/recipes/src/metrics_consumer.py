@@ -4,10 +4,10 @@ import json
 import logging
 
 import aio_pika
-from pydantic import ValidationError
 
 from consumer import BaseConsumer
-from event_models import MetricsEvent
+from structs import MetricsEvent
+from log_config import configure_logging
 
 
 class InvalidMessageError(Exception):
@@ -23,34 +23,40 @@ class MetricsConsumer(BaseConsumer):
 
     async def process_message(self, delivery: aio_pika.abc.AbstractIncomingMessage):
         try:
-            body = delivery.body.decode("utf-8")
-            message_data = json.loads(body)
-            logging.info(f"Received metrics message: {message_data}")
+            message_data = json.loads(delivery.body)
 
+            # Metrics are published by this service only, so the generated
+            # struct's checks stand in for full pydantic validation.
             try:
-                MetricsEvent.model_validate(message_data)
-            except ValidationError as e:
+                event = MetricsEvent.from_dict(message_data).validate()
+            except (KeyError, TypeError, ValueError) as e:
                 raise InvalidMessageError(f"Invalid metrics message: {e}")
 
-            logging.info(f"Received metrics message: {message_data}")
+            event_type = event.event_type
+            duration = event.duration
+            metadata = event.metadata
+            timestamp = event.timestamp
 
-            event_type = message_data.get("event_type")
-            duration = message_data.get("duration")
-            metadata = message_data.get("metadata")
-            timestamp = message_data.get("timestamp")
-
-            log_message = f"Event Type: {event_type}, Duration: {duration}, Metadata: {metadata}, Timestamp: {timestamp}"
-            logging.info(log_message)
+            # One line per event is the consumer's whole job; keep the payload at DEBUG
+            logging.info("Metrics event %s (duration=%s)", event_type, duration)
+            logging.debug("Metrics event %s at %s: %s", event_type, timestamp, metadata)
 
             await delivery.ack()
-            logging.info(f"Acknowledged message: {delivery.delivery_tag}")
+            logging.debug("Acknowledged message: %s", delivery.delivery_tag)
 
+        except asyncio.CancelledError:
+            await delivery.nack(requeue=True)
+            raise
+        except InvalidMessageError as e:
+            # Fails the same way on every attempt; don't walk it through the retry tiers
+            logging.error(e)
+            await delivery.nack(requeue=False)
         except json.JSONDecodeError as e:
-            logging.error(f"Error decoding JSON: {e}")
+            logging.error("Error decoding JSON: %s", e)
             await delivery.nack(requeue=False)
         except Exception as e:
-            logging.error(f"Error processing metrics message: {e}")
-            await delivery.nack(requeue=True)
+            logging.error("Error processing metrics message: %s", e)
+            await self.retry_later(delivery, e)
 
 
 async def main():
@@ -66,9 +72,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    logging.basicConfig(
-        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-    )
+    configure_logging()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -9,6 +9,7 @@ class RecipeMetricsEventType(Enum):
     success = "recipe_scrape.success"
     failure = "recipe_scrape.failure"
     validation_errors = "recipe_scrape.validation_errors"
+    duplicate = "recipe_scrape.duplicate"
 
 
 class RecipeIngredient(BaseModel):
@@ -0,0 +1,239 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from local_store import state_dir
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def recipe_text(scraped: Dict[str, Any]) -> str:
+    """Title + ingredients + instructions of a recipe_scrapers to_json() result."""
+    ingredients = scraped.get("ingredients") or []
+    if isinstance(ingredients, list):
+        ingredients = "\n".join(str(ingredient) for ingredient in ingredients)
+    return "\n".join(
+        [str(scraped.get("title") or ""), str(ingredients), str(scraped.get("instructions") or "")]
+    )
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles, computed for all permutations at
+    once with NumPy. Seeds are fixed so signatures are stable across
+    processes and restarts.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> List[bytes]:
+        words = _WORD_PATTERN.findall(text.lower())
+        if len(words) < self.shingle_size:
+            return [" ".join(words).encode()] if words else []
+        return [
+            " ".join(words[i : i + self.shingle_size]).encode()
+            for i in range(len(words) - self.shingle_size + 1)
+        ]
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(shingle) for shingle in set(shingles)), dtype=np.uint64
+        )
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return np.bitwise_and(permuted, _MAX_HASH).min(axis=1).astype(np.uint32)
+
+
+def estimated_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash/LSH index of ingested recipes.
+
+    A signature is split into `bands` bands; recipes sharing any band bucket
+    are candidates, and a candidate whose estimated Jaccard similarity is at
+    least `threshold` is a near-duplicate. Buckets live in an indexed SQLite
+    table (shared by the node's worker processes, like LocalStore), so a
+    lookup costs `bands` index probes regardless of corpus size.
+
+    A fingerprint is recorded when the recipe is scraped but only matches
+    once confirm() is called after the recipe was saved, so a scrape that
+    fails, is cancelled or never gets saved cannot shadow later copies.
+    Unconfirmed fingerprints are dropped after NEAR_DUPLICATE_PENDING_TTL_SECONDS.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: Optional[float] = None,
+        num_perm: int = 64,
+        bands: int = 8,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.path = path or os.path.join(state_dir(), "recipe_lsh.db")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.threshold = (
+            threshold
+            if threshold is not None
+            else float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", 0.8))
+        )
+        self.pending_ttl = float(os.environ.get("NEAR_DUPLICATE_PENDING_TTL_SECONDS", 86400))
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS signatures (
+                url TEXT PRIMARY KEY,
+                signature BLOB NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                band INTEGER NOT NULL,
+                bucket BLOB NOT NULL,
+                url TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket);
+            CREATE INDEX IF NOT EXISTS buckets_url ON buckets (url);
+            """
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(signatures)")]
+        if "confirmed" not in columns:
+            # Fingerprints indexed before confirmation existed count as saved
+            self._conn.execute(
+                "ALTER TABLE signatures ADD COLUMN confirmed INTEGER NOT NULL DEFAULT 1"
+            )
+        self._conn.commit()
+
+    def _buckets(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (
+                band,
+                hashlib.blake2b(
+                    signature[band * self.rows : (band + 1) * self.rows].tobytes(),
+                    digest_size=8,
+                ).digest(),
+            )
+            for band in range(self.bands)
+        ]
+
+    def find_duplicate(
+        self, signature: np.ndarray, url: str
+    ) -> Optional[Tuple[str, float]]:
+        """The most similar saved recipe from another URL above the threshold."""
+        buckets = self._buckets(signature)
+        clause = " OR ".join("(band = ? AND bucket = ?)" for _ in buckets)
+        params = [value for bucket in buckets for value in bucket]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT s.url, s.signature FROM signatures s WHERE s.url IN "
+                f"(SELECT DISTINCT url FROM buckets WHERE {clause}) AND s.url != ? AND s.confirmed = 1",
+                (*params, url),
+            ).fetchall()
+
+        best: Optional[Tuple[str, float]] = None
+        for candidate_url, blob in rows:
+            similarity = estimated_similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate_url, similarity)
+        return best
+
+    def add(self, signature: np.ndarray, url: str, confirmed: bool = False):
+        now = time.time()
+        with self._lock:
+            self._purge_pending(now)
+            self._conn.execute("DELETE FROM buckets WHERE url = ?", (url,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO signatures (url, signature, created_at, confirmed) "
+                "VALUES (?, ?, ?, ?)",
+                (url, signature.tobytes(), now, int(confirmed)),
+            )
+            self._conn.executemany(
+                "INSERT INTO buckets (band, bucket, url) VALUES (?, ?, ?)",
+                [(band, bucket, url) for band, bucket in self._buckets(signature)],
+            )
+            self._conn.commit()
+
+    def _purge_pending(self, now: float):
+        expired = "SELECT url FROM signatures WHERE confirmed = 0 AND created_at < ?"
+        cutoff = now - self.pending_ttl
+        self._conn.execute(f"DELETE FROM buckets WHERE url IN ({expired})", (cutoff,))
+        self._conn.execute("DELETE FROM signatures WHERE confirmed = 0 AND created_at < ?", (cutoff,))
+
+    def confirm(self, url: str):
+        """Lets the fingerprint recorded for `url` match other URLs (the recipe was saved)."""
+        with self._lock:
+            self._conn.execute("UPDATE signatures SET confirmed = 1 WHERE url = ?", (url,))
+            self._conn.commit()
+
+    def _is_indexed(self, signature: np.ndarray, url: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT signature FROM signatures WHERE url = ?", (url,)
+            ).fetchone()
+        return row is not None and row[0] == signature.tobytes()
+
+    def release(self, url: str):
+        """Drops the unconfirmed fingerprint for `url`; a saved one is kept."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM buckets WHERE url IN "
+                "(SELECT url FROM signatures WHERE url = ? AND confirmed = 0)",
+                (url,),
+            )
+            self._conn.execute("DELETE FROM signatures WHERE url = ? AND confirmed = 0", (url,))
+            self._conn.commit()
+
+    def remove(self, url: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM buckets WHERE url = ?", (url,))
+            self._conn.execute("DELETE FROM signatures WHERE url = ?", (url,))
+            self._conn.commit()
+
+    def check_and_add(self, scraped: Dict[str, Any], url: str) -> Optional[Tuple[str, float]]:
+        """
+        Returns (duplicate_url, similarity) if `scraped` near-duplicates a
+        saved recipe from another URL; otherwise records its fingerprint
+        under `url`, unconfirmed until confirm(url), and returns None.
+        """
+        signature = self.hasher.signature(recipe_text(scraped))
+        if signature is None:
+            return None
+        duplicate = self.find_duplicate(signature, url)
+        if duplicate is None:
+            if not self._is_indexed(signature, url):
+                self.add(signature, url)
+        else:
+            logging.info(
+                "Near-duplicate recipe: %s matches %s (similarity=%.2f)", url, duplicate[0], duplicate[1]
+            )
+        return duplicate
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
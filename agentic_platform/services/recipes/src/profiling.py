@@ -0,0 +1,295 @@
+import asyncio
+import contextlib
+import cProfile
+import functools
+import inspect
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Dict, Optional
+
+
+class StageTimings:
+    """
+    Thread-safe registry of per-stage wall-clock durations.
+
+    Keeps running totals plus a bounded window of recent samples so that
+    percentiles stay cheap to compute and memory stays flat.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, stage: str, duration: float):
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = {
+                    "count": 0,
+                    "total": 0.0,
+                    "max": 0.0,
+                    "samples": deque(maxlen=self.window),
+                }
+                self._stages[stage] = entry
+            entry["count"] += 1
+            entry["total"] += duration
+            entry["max"] = max(entry["max"], duration)
+            entry["samples"].append(duration)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Returns count/total/max and p50/p95/p99 (over the recent window) per stage."""
+        with self._lock:
+            stages = {
+                stage: (entry["count"], entry["total"], entry["max"], list(entry["samples"]))
+                for stage, entry in self._stages.items()
+            }
+
+        snapshot = {}
+        for stage, (count, total, max_duration, samples) in stages.items():
+            samples.sort()
+            snapshot[stage] = {
+                "count": count,
+                "total": total,
+                "max": max_duration,
+                "p50": _percentile(samples, 0.50),
+                "p95": _percentile(samples, 0.95),
+                "p99": _percentile(samples, 0.99),
+            }
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+def _percentile(sorted_samples: list, fraction: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+stage_timings = StageTimings()
+
+
+@contextlib.contextmanager
+def stage_timer(stage: str):
+    """Times the enclosed block (including awaits) and records it under `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_timings.record(stage, time.perf_counter() - start)
+
+
+def timed_stage(stage: str) -> Callable:
+    """
+    Decorator recording the duration of a sync or async callable under `stage`.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage_timer(stage):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler.
+
+    A daemon thread periodically captures the stack of the target thread
+    (the event loop thread by default) and aggregates them as collapsed
+    stacks, the input format of flamegraph.pl / speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self.stacks.clear()
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._sample_loop, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _sample_loop(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+                )
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """
+    On-demand profile capture, toggled by env var at startup or by SIGUSR1.
+
+    Mode "sampling" writes collapsed stacks, mode "cprofile" writes pstats.
+    Each toggle-off dumps a file into PROFILE_DIR.
+    """
+
+    def __init__(self):
+        self.mode = os.environ.get("PROFILER_MODE", "sampling")
+        self.output_dir = os.environ.get("PROFILE_DIR", "/tmp/recipe-profiles")
+        self.interval = float(os.environ.get("PROFILER_INTERVAL_SECONDS", 0.005))
+        self._sampler: Optional[SamplingProfiler] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+
+    @property
+    def running(self) -> bool:
+        return self._sampler is not None or self._cprofile is not None
+
+    def start(self):
+        if self.running:
+            return
+        if self.mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        else:
+            self._sampler = SamplingProfiler(interval=self.interval)
+            self._sampler.start()
+        logging.info(f"Profiler started (mode={self.mode})")
+
+    def stop(self) -> Optional[str]:
+        """Stops profiling and returns the path of the dumped profile."""
+        if not self.running:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            path = os.path.join(self.output_dir, f"profile-{os.getpid()}-{stamp}.pstats")
+            self._cprofile.dump_stats(path)
+            self._cprofile = None
+        else:
+            self._sampler.stop()
+            path = os.path.join(self.output_dir, f"profile-{os.getpid()}-{stamp}.collapsed")
+            self._sampler.dump(path)
+            self._sampler = None
+        logging.info(f"Profiler stopped, profile written to {path}")
+        return path
+
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up a periodic sleeper.
+
+    Any lag well above zero means a callback blocked the loop (sync I/O,
+    heavy parsing, ...). Blocks above the threshold are logged.
+    """
+
+    def __init__(self, interval: float = 0.25, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.blocked_count = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.threshold:
+                self.blocked_count += 1
+                stage_timings.record("event_loop.blocked", lag)
+                logging.warning("Event loop was blocked for %.3fs", lag)
+
+
+def install_profiling() -> tuple[Profiler, Optional[LoopLagMonitor]]:
+    """
+    Wires profiling into the running event loop.
+
+    - PROFILING_ENABLED=1 starts a capture at boot.
+    - SIGUSR1 toggles capture; each stop dumps a profile file.
+    - LOOP_LAG_MONITOR_ENABLED (default on) starts the event-loop lag monitor.
+    """
+    profiler = Profiler()
+    if os.environ.get("PROFILING_ENABLED", "0") == "1":
+        profiler.start()
+
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGUSR1, profiler.toggle)
+    except (NotImplementedError, RuntimeError, AttributeError) as e:
+        logging.warning(f"Could not register SIGUSR1 profiler toggle: {e}")
+
+    monitor = None
+    if os.environ.get("LOOP_LAG_MONITOR_ENABLED", "1") == "1":
+        monitor = LoopLagMonitor(
+            interval=float(os.environ.get("LOOP_LAG_INTERVAL_SECONDS", 0.25)),
+            threshold=float(os.environ.get("LOOP_LAG_THRESHOLD_SECONDS", 0.1)),
+        )
+        monitor.start()
+    return profiler, monitor
@@ -0,0 +1,218 @@
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Query words that say nothing about which recipe is wanted
+STOP_WORDS = frozenset(
+    {
+        "a", "an", "and", "best", "easy", "for", "homemade", "how", "in", "make",
+        "of", "on", "quick", "recipe", "recipes", "simple", "the", "to", "with",
+    }
+)
+
+# Regional and spelling variants, mapped to one name (after stemming)
+SYNONYMS = {
+    "aubergine": "eggplant",
+    "barbeque": "barbecue",
+    "bbq": "barbecue",
+    "beetroot": "beet",
+    "chile": "chili",
+    "chilli": "chili",
+    "coriander": "cilantro",
+    "courgette": "zucchini",
+    "garbanzo": "chickpea",
+    "prawn": "shrimp",
+    "rocket": "arugula",
+    "yoghurt": "yogurt",
+}
+
+
+# -ie nouns whose plural is not -y -> -ies
+_IE_WORDS = frozenset({"brownie", "calorie", "cookie", "smoothie", "veggie"})
+
+
+def stem(word: str) -> str:
+    """
+    Light plural stemmer (curries -> curry, tomatoes -> tomato,
+    dishes -> dish, tacos -> taco). Deliberately conservative: it never
+    touches -ing or -ed, which would merge distinct dishes.
+    """
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word[:-1] in _IE_WORDS:
+        return word[:-1]
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "sses", "xes", "zes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def canonical_query(search_query: str) -> str:
+    """
+    Case-, stop-word-, plural-, synonym- and word-order-insensitive form of
+    a search query: "Easy Curry Chicken recipe" -> "chicken curry".
+    """
+    words = _WORD_PATTERN.findall(search_query.lower())
+    terms = {SYNONYMS.get(stem(word), stem(word)) for word in words if word not in STOP_WORDS}
+    terms.discard("")
+    return " ".join(sorted(terms)) or " ".join(words)
+
+
+def _ngrams(canonical: str, n: int = 3) -> Counter:
+    grams: Counter = Counter()
+    for word in canonical.split():
+        padded = f" {word} "
+        grams.update(padded[i : i + n] for i in range(max(1, len(padded) - n + 1)))
+    return grams
+
+
+def _numbers(grams: Counter) -> Set[str]:
+    # Padded numeric trigrams; "2 ingredient" and "3 ingredient" must not merge
+    return {gram for gram in grams if gram.strip().isdigit()}
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    dot = sum(count * b.get(gram, 0) for gram, count in a.items())
+    norm = math.sqrt(
+        sum(count * count for count in a.values()) * sum(count * count for count in b.values())
+    )
+    return dot / norm if norm else 0.0
+
+
+class SimilarQueryIndex:
+    """
+    Groups recent canonical queries by character-trigram cosine similarity,
+    so near-identical queries ("vegetable lasagne", "vegetable lasagna")
+    share one cache key. Trigrams are unweighted, so whether two queries
+    merge does not depend on what else has been indexed. Each group is
+    keyed by the first query seen; a new query joins the most similar group
+    with the same number of terms at or above `threshold`, otherwise it
+    starts its own. Queries that add or drop a term ("chicken soup" vs
+    "chicken curry soup"), differ in a number, or swap a short word for an
+    unrelated one ("chicken cake" vs "chicken bake": each differing term
+    must itself score `term_threshold`) never merge.
+
+    In-memory and bounded to the `max_queries` most recently used groups;
+    candidates are found through an inverted trigram index, so a lookup
+    only scores groups that share a trigram with the query.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        max_queries: Optional[int] = None,
+        term_threshold: Optional[float] = None,
+    ):
+        self.threshold = threshold or float(os.environ.get("QUERY_SIMILARITY_THRESHOLD", 0.8))
+        self.term_threshold = term_threshold or float(
+            os.environ.get("QUERY_TERM_SIMILARITY_THRESHOLD", 0.6)
+        )
+        self.max_queries = max_queries or int(os.environ.get("QUERY_INDEX_MAX_QUERIES", 5000))
+        self._lock = threading.Lock()
+        self._groups: "OrderedDict[str, Counter]" = OrderedDict()  # representative -> trigrams
+        self._aliases: Dict[str, str] = {}  # canonical query -> representative
+        self._members: Dict[str, Set[str]] = {}  # representative -> aliased queries
+        self._postings: Dict[str, Set[str]] = {}  # trigram -> representatives
+        self.stats = Counter()
+
+    def _terms_match(self, canonical: str, representative: str) -> bool:
+        # Canonical terms are sorted, so a misspelt term lines up with its original
+        return all(
+            term == other or _cosine(_ngrams(term), _ngrams(other)) >= self.term_threshold
+            for term, other in zip(canonical.split(), representative.split())
+        )
+
+    def _best_match(self, canonical: str, grams: Counter) -> Tuple[Optional[str], float]:
+        candidates = set()
+        for gram in grams:
+            candidates.update(self._postings.get(gram, ()))
+        if not candidates:
+            return None, 0.0
+        best, best_score = None, 0.0
+        numbers = _numbers(grams)
+        for representative in candidates:
+            if representative.count(" ") != canonical.count(" "):
+                continue
+            if _numbers(self._groups[representative]) != numbers:
+                continue
+            score = _cosine(grams, self._groups[representative])
+            if score > best_score and self._terms_match(canonical, representative):
+                best, best_score = representative, score
+        return best, best_score
+
+    def resolve(self, search_query: str) -> Tuple[str, float]:
+        """Returns (group key, similarity) for a query, registering it."""
+        canonical = canonical_query(search_query)
+        with self._lock:
+            representative = self._aliases.get(canonical)
+            if representative is not None:
+                self._groups.move_to_end(representative)
+                self.stats["exact"] += 1
+                return representative, 1.0
+
+            grams = _ngrams(canonical)
+            best, score = self._best_match(canonical, grams)
+            if best is not None and score >= self.threshold:
+                self._aliases[canonical] = best
+                self._members[best].add(canonical)
+                self._groups.move_to_end(best)
+                self.stats["similar"] += 1
+                return best, score
+
+            self._groups[canonical] = grams
+            self._aliases[canonical] = canonical
+            self._members[canonical] = {canonical}
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(canonical)
+            self.stats["new"] += 1
+            while len(self._groups) > self.max_queries:
+                self._evict_oldest()
+            return canonical, 1.0
+
+    def _evict_oldest(self):
+        representative, grams = self._groups.popitem(last=False)
+        for member in self._members.pop(representative, ()):
+            self._aliases.pop(member, None)
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(representative)
+                if not postings:
+                    del self._postings[gram]
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+
+@lru_cache(maxsize=1)
+def get_similar_query_index() -> Optional[SimilarQueryIndex]:
+    """The process's query index, or None when QUERY_SIMILARITY_ENABLED is false."""
+    if os.environ.get("QUERY_SIMILARITY_ENABLED", "true").lower() != "true":
+        return None
+    return SimilarQueryIndex()
+
+
+def query_cache_key(search_query: str) -> str:
+    """
+    Key for every cache keyed on a search query: the canonical query, or
+    the key of the similar-query group it falls into.
+    """
+    index = get_similar_query_index()
+    if index is None:
+        return canonical_query(search_query)
+    return index.resolve(search_query)[0]
+
+
+def query_terms(search_query: str) -> List[str]:
+    """Meaningful words of a query, in order, without stemming."""
+    words = _WORD_PATTERN.findall(search_query.lower())
+    return [word for word in dict.fromkeys(words) if word not in STOP_WORDS and len(word) > 1]
@@ -0,0 +1,50 @@
+import logging
+import os
+
+_ready = False
+
+
+def readiness_file() -> str:
+    return os.environ.get("READINESS_FILE", "/tmp/recipe-service-ready")
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+def mark_ready():
+    """Flags the service as ready and drops the marker file used by exec probes."""
+    global _ready
+    _ready = True
+    try:
+        with open(readiness_file(), "w") as f:
+            f.write(str(os.getpid()))
+    except OSError as e:
+        logging.warning(f"Could not write readiness file {readiness_file()}: {e}")
+    logging.info("Service is ready")
+
+
+def mark_not_ready():
+    global _ready
+    _ready = False
+    try:
+        os.remove(readiness_file())
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logging.warning(f"Could not remove readiness file {readiness_file()}: {e}")
+
+
+def warmup():
+    """
+    Pays the one-off startup costs (LLM client, scraper stack) before the
+    service reports ready, so the first message does not absorb them.
+    Blocking; run it in a worker thread.
+    """
+    import recipe_scrapers  # noqa: F401
+
+    import ingredient_units  # noqa: F401
+
+    from llm import get_model
+
+    get_model()
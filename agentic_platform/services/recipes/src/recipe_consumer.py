@@ -6,9 +6,12 @@ import logging
 import aio_pika
 from pydantic import ValidationError
 
-from consumer import BaseConsumer
+from coalescing import WorkflowCoalescer, workflow_coalescing_key
+from consumer import BaseConsumer, ConsumerLane
 from workflow_orchestrator import WorkflowOrchestrator
-from event_models import WorkflowInitiateMessage
+from event_models import WorkflowInitiateMessage, WorkflowPriority
+from recipe_index import get_recipe_index
+from log_config import configure_logging
 
 
 class InvalidMessageError(Exception):
@@ -18,9 +21,57 @@ class InvalidMessageError(Exception):
 
 
 class RecipeConsumer(BaseConsumer):
+    """
+    Consumes workflow messages from two lanes: the interactive queue (user
+    searches) and the batch queue (backfills). Each lane has its own prefetch
+    and concurrency budget, so a draining backfill cannot occupy the slots
+    interactive requests need. Messages published to the interactive queue
+    with priority "batch" are moved to the batch queue.
+    """
+
     def __init__(self):
         queue_name = os.environ.get("WORKFLOW_MESSAGES_QUEUE_NAME", "workflow_messages")
-        super().__init__(queue_name)
+        self.batch_queue_name = os.environ.get(
+            "WORKFLOW_BATCH_QUEUE_NAME", "workflow_messages_batch"
+        )
+        interactive_concurrency = int(os.environ.get("WORKFLOW_INTERACTIVE_CONCURRENCY", 8))
+        batch_concurrency = int(os.environ.get("WORKFLOW_BATCH_CONCURRENCY", 2))
+        super().__init__(
+            queue_name,
+            lanes=[
+                ConsumerLane(
+                    name=WorkflowPriority.interactive.value,
+                    queue_name=queue_name,
+                    prefetch_count=interactive_concurrency,
+                    max_concurrency=interactive_concurrency,
+                ),
+                ConsumerLane(
+                    name=WorkflowPriority.batch.value,
+                    queue_name=self.batch_queue_name,
+                    prefetch_count=batch_concurrency,
+                    max_concurrency=batch_concurrency,
+                ),
+            ],
+        )
+        self.orchestrator: WorkflowOrchestrator | None = None
+        self._orchestrator_lock = asyncio.Lock()
+        self.coalescer = WorkflowCoalescer()
+        self.recipe_index = get_recipe_index()
+        # Fraction of the requested recipes the index must already hold to skip the workflow
+        self.index_skip_fraction = float(os.environ.get("RECIPE_INDEX_SKIP_FRACTION", 1.0))
+
+    async def _get_orchestrator(self) -> WorkflowOrchestrator:
+        """
+        One orchestrator (and broker connection) shared by all messages.
+        Concurrent first deliveries wait for the one being connected.
+        """
+        if self.orchestrator is None:
+            async with self._orchestrator_lock:
+                if self.orchestrator is None:
+                    orchestrator = WorkflowOrchestrator()
+                    await orchestrator._connect_to_rabbitmq()
+                    self.orchestrator = orchestrator
+        return self.orchestrator
 
     async def process_message(self, message: aio_pika.abc.AbstractIncomingMessage):
         try:
@@ -32,33 +83,160 @@ class RecipeConsumer(BaseConsumer):
             except ValidationError as e:
                 raise InvalidMessageError(f"Invalid workflow initiate message: {e}")
 
-            logging.info(f"Received workflow message: {message_data}")
+            logging.info(
+                "Received workflow message: workflow_id=%s type=%s priority=%s",
+                message_data.get("workflow_id"),
+                message_data.get("workflow_type"),
+                message_data.get("priority"),
+            )
+            logging.debug("Workflow message body: %s", message_data)
+
+            if (
+                message_data.get("priority") == WorkflowPriority.batch.value
+                and message.routing_key != self.batch_queue_name
+            ):
+                await self._move_to_batch_lane(message)
+                return
 
             workflow_type = message_data.get("workflow_type")
             workflow_payload = message_data.get("workflow_payload")
 
-            workflow_orchestrator = WorkflowOrchestrator()
-            await workflow_orchestrator._connect_to_rabbitmq()
-            await workflow_orchestrator.initiate_workflow(
-                workflow_type, workflow_payload
+            workflow_orchestrator = await self._get_orchestrator()
+
+            workflow_payload = await self._apply_index_coverage(
+                workflow_orchestrator, workflow_payload, message_data.get("workflow_id")
             )
+            if workflow_payload is None:
+                await message.ack()
+                return
+
+            async def execute_workflow():
+                workflow_id = await workflow_orchestrator.initiate_workflow(
+                    workflow_type,
+                    workflow_payload,
+                    message_data.get("workflow_id"),
+                    deadline_seconds=message_data.get("deadline_seconds"),
+                )
+                instance = workflow_orchestrator.workflow_instances.get(workflow_id, {})
+                return {"workflow_id": str(workflow_id), "status": instance.get("status")}
+
+            coalescing_key = workflow_coalescing_key(workflow_type, workflow_payload)
+            result, role = await self.coalescer.run(
+                coalescing_key,
+                execute_workflow,
+                is_reusable=lambda result: result["status"] == "completed",
+            )
+            if role != "leader":
+                await workflow_orchestrator._publish_metrics(
+                    "workflow.coalesced",
+                    {
+                        "role": role,
+                        "workflow_id": result["workflow_id"],
+                        "request_workflow_id": message_data.get("workflow_id"),
+                        "coalescing_key": coalescing_key,
+                        "attached_total": self.coalescer.stats["attached"],
+                        "cached_total": self.coalescer.stats["cached"],
+                    },
+                    None,
+                )
 
             logging.info(
-                f"Workflow Type: {workflow_type}, Workflow Payload: {workflow_payload}"
+                "Workflow %s finished as %s (%s, role=%s)",
+                result["workflow_id"],
+                result["status"],
+                workflow_type,
+                role,
             )
 
             await message.ack()
-            logging.info(f"Acknowledged message: {message.delivery_tag}")
+            logging.debug("Acknowledged message: %s", message.delivery_tag)
 
+        except asyncio.CancelledError:
+            # Interrupted by shutdown; the orchestrator has checkpointed progress
+            logging.warning("Requeueing interrupted message: %s", message.delivery_tag)
+            await message.nack(requeue=True)
+            raise
         except InvalidMessageError as e:
             logging.error(e)
             await message.nack(requeue=False)
         except json.JSONDecodeError as e:
-            logging.error(f"Error decoding JSON: {e}")
+            logging.error("Error decoding JSON: %s", e)
             await message.nack(requeue=False)
         except Exception as e:
-            logging.error(f"Error processing message: {e}")
-            await message.nack(requeue=True)
+            logging.error("Error processing message: %s", e)
+            await self.retry_later(message, e)
+
+    async def _apply_index_coverage(
+        self,
+        workflow_orchestrator: WorkflowOrchestrator,
+        workflow_payload: dict,
+        workflow_id: str | None,
+    ) -> dict | None:
+        """
+        Checks how many ingested recipes already match the query. Returns
+        None when the index covers the request (the workflow is skipped),
+        otherwise the payload, shrunk to the recipes still missing.
+        """
+        if self.recipe_index is None:
+            return workflow_payload
+        search_query = workflow_payload.get("search_query", "")
+        wanted = (
+            workflow_payload.get("number_of_urls")
+            or workflow_payload.get("number_of_recipes")
+            or 10
+        )
+        try:
+            covered = self.recipe_index.count_matches(search_query, wanted)
+        except Exception as e:
+            logging.warning("Recipe index lookup failed, running the workflow: %s", e)
+            return workflow_payload
+
+        if covered and covered >= wanted * self.index_skip_fraction:
+            logging.info(
+                "Index already holds %s recipes for '%s', skipping workflow",
+                covered,
+                search_query,
+            )
+            await workflow_orchestrator._publish_metrics(
+                "workflow.served_from_index",
+                {
+                    "workflow_id": str(workflow_id) if workflow_id else None,
+                    "search_query": search_query,
+                    "indexed_matches": covered,
+                    "requested": wanted,
+                },
+                None,
+            )
+            return None
+        if covered:
+            logging.info(
+                "Index holds %s/%s recipes for '%s', shrinking workflow",
+                covered,
+                wanted,
+                search_query,
+            )
+            return {**workflow_payload, "number_of_urls": wanted - covered}
+        return workflow_payload
+
+    async def _move_to_batch_lane(self, message: aio_pika.abc.AbstractIncomingMessage):
+        await self.channel.default_exchange.publish(
+            aio_pika.Message(
+                body=message.body,
+                headers=message.headers,
+                content_type=message.content_type,
+                correlation_id=message.correlation_id,
+                message_id=message.message_id,
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            ),
+            routing_key=self.batch_queue_name,
+        )
+        await message.ack()
+        logging.info("Moved batch-priority message to queue %s", self.batch_queue_name)
+
+    async def close(self):
+        await super().close()
+        if self.orchestrator and self.orchestrator.connection:
+            await self.orchestrator.connection.close()
 
 
 async def main():
@@ -68,15 +246,13 @@ async def main():
         await consumer.start_consuming()
         await asyncio.Future()  # Run forever
     except Exception as e:
-        logging.error(f"Main error: {e}")
+        logging.error("Main error: %s", e)
     finally:
         await consumer.close()
 
 
 if __name__ == "__main__":
-    logging.basicConfig(
-        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-    )
+    configure_logging()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
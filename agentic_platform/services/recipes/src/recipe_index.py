@@ -0,0 +1,157 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from local_store import state_dir
+from query_normalizer import query_terms
+
+
+def _match_expression(terms: List[str], columns: Optional[str] = None) -> str:
+    # Every term must match; terms are quoted so user input is never FTS syntax
+    expression = " ".join(f'"{term}"' for term in terms)
+    return f"{{{columns}}} : ({expression})" if columns else expression
+
+
+class RecipeIndex:
+    """
+    Local full-text index (SQLite FTS5, porter stemming) over ingested
+    recipes: title, ingredient names and the query that found them.
+
+    Lets the consumer see how many ingested recipes already answer a query
+    before running search, scrape and LLM calls. Coverage checks stop at
+    the requested count instead of ranking every match, so they stay in the
+    low milliseconds at millions of recipes.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(state_dir(), "recipe_index.db")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS recipes (
+                id INTEGER PRIMARY KEY,
+                source_url TEXT NOT NULL UNIQUE,
+                recipe_id TEXT,
+                title TEXT NOT NULL,
+                ingredients TEXT NOT NULL,
+                created_from_query TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS recipe_fts USING fts5(
+                title, ingredients, created_from_query,
+                content='recipes', content_rowid='id', tokenize='porter unicode61'
+            );
+            """
+        )
+        # Title matches count most, then the query that found the recipe
+        self._conn.execute(
+            "INSERT INTO recipe_fts (recipe_fts, rank) VALUES ('rank', 'bm25(10.0, 2.0, 5.0)')"
+        )
+        self._conn.commit()
+
+    def add(
+        self,
+        source_url: str,
+        title: str,
+        ingredients: List[str],
+        created_from_query: Optional[str] = None,
+        recipe_id: Optional[str] = None,
+    ):
+        """Indexes (or re-indexes) an ingested recipe."""
+        fields = (title, " ".join(ingredients), created_from_query or "")
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, title, ingredients, created_from_query FROM recipes WHERE source_url = ?",
+                (source_url,),
+            ).fetchone()
+            if row is not None:
+                rowid = row[0]
+                # External-content FTS tables delete by re-supplying the old values
+                self._conn.execute(
+                    "INSERT INTO recipe_fts (recipe_fts, rowid, title, ingredients, created_from_query) "
+                    "VALUES ('delete', ?, ?, ?, ?)",
+                    row,
+                )
+                self._conn.execute(
+                    "UPDATE recipes SET recipe_id = ?, title = ?, ingredients = ?, "
+                    "created_from_query = ?, indexed_at = ? WHERE id = ?",
+                    (recipe_id, *fields, time.time(), rowid),
+                )
+            else:
+                rowid = self._conn.execute(
+                    "INSERT INTO recipes (source_url, recipe_id, title, ingredients, created_from_query, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (source_url, recipe_id, *fields, time.time()),
+                ).lastrowid
+            self._conn.execute(
+                "INSERT INTO recipe_fts (rowid, title, ingredients, created_from_query) VALUES (?, ?, ?, ?)",
+                (rowid, *fields),
+            )
+            self._conn.commit()
+
+    def count_matches(self, search_query: str, limit: int) -> int:
+        """
+        Number of indexed recipes (up to `limit`) whose title or originating
+        query contains every meaningful word of `search_query`.
+        """
+        terms = query_terms(search_query)
+        if not terms or limit <= 0:
+            return 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rowid FROM recipe_fts WHERE recipe_fts MATCH ? LIMIT ?",
+                (_match_expression(terms, "title created_from_query"), limit),
+            ).fetchall()
+        return len(rows)
+
+    def known_urls(self, urls: List[str]) -> set:
+        """The subset of `urls` already ingested and indexed."""
+        if not urls:
+            return set()
+        placeholders = ",".join("?" for _ in urls)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT source_url FROM recipes WHERE source_url IN ({placeholders})", list(urls)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def search(self, search_query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Best matches across all indexed fields, ranked by weighted BM25."""
+        terms = query_terms(search_query)
+        if not terms:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.source_url, r.recipe_id, r.title FROM recipe_fts f "
+                "JOIN recipes r ON r.id = f.rowid "
+                "WHERE recipe_fts MATCH ? ORDER BY f.rank LIMIT ?",
+                (_match_expression(terms), limit),
+            ).fetchall()
+        return [
+            {"source_url": source_url, "recipe_id": recipe_id, "title": title}
+            for source_url, recipe_id, title in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache(maxsize=1)
+def get_recipe_index() -> Optional[RecipeIndex]:
+    """The node's recipe index, or None when RECIPE_INDEX_ENABLED is false."""
+    if os.environ.get("RECIPE_INDEX_ENABLED", "true").lower() != "true":
+        return None
+    try:
+        return RecipeIndex()
+    except Exception as e:
+        logging.warning(f"Recipe index disabled, could not open it: {e}")
+        return None
@@ -1,23 +1,26 @@
 from datetime import datetime
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, Callable
 import time
 import logging
-from dotenv import load_dotenv
+import os
 
-from recipe_scrapers import scrape_html
 from pydantic import ValidationError
-import requests
-import google.generativeai as genai
-import os
 import json
 import asyncio
+import contextvars
+from concurrent.futures import Executor
 import aiohttp
+import math
 import re
 
 from models import Recipe, RecipeMetricsEventType, RecipeIngredient
 from event_models import MetricsEvent
-
-load_dotenv()
+from llm import get_model
+from profiling import timed_stage
+from memory import memory_accounting
+from domain_stats import url_domain
+from fetch_latency import fetch_latencies
+from jsonld import JsonLdScanner, extract_recipe
 
 
 class RecipeScraperWorkflowStep:
@@ -27,35 +30,163 @@ class RecipeScraperWorkflowStep:
 
     def __init__(
         self,
-        model: genai.GenerativeModel,
+        model: Optional[Any] = None,
         logger: Optional[logging.Logger] = None,
+        model_factory: Callable[[], Any] = get_model,
+        llm_executor: Optional[Executor] = None,
+        duplicate_index: Optional[Any] = None,
+        domain_stats: Optional[Any] = None,
     ):
         self.logger = logger or logging.getLogger(__name__)
-        self.model = model
-
+        self._model = model
+        self._model_factory = model_factory
+        # Blocking LLM calls run here (None = the loop's default executor)
+        self.llm_executor = llm_executor
+        self._duplicate_index = duplicate_index
+        self.near_duplicate_detection = (
+            os.environ.get("NEAR_DUPLICATE_DETECTION_ENABLED", "true").lower() == "true"
+        )
+        self._domain_stats = domain_stats
+        # Tail-latency controls for page fetches and scrape batches
+        self.fetch_timeout = float(os.environ.get("FETCH_TIMEOUT_SECONDS", 15))
+        self.fetch_hedging = os.environ.get("FETCH_HEDGING_ENABLED", "true").lower() == "true"
+        self.fetch_latencies = fetch_latencies
+        self.fetch_max_bytes = int(os.environ.get("FETCH_MAX_BYTES", 2 * 1024 * 1024))
+        # Pages buffered at once (fetching or being parsed), so peak page
+        # memory stays under max_pages_in_memory * fetch_max_bytes
+        self.max_pages_in_memory = int(os.environ.get("SCRAPE_MAX_PAGES_IN_MEMORY", 16))
+        self._page_slots: Optional[asyncio.Semaphore] = None
+        self._page_slots_loop = None
+        self.scrape_quorum = float(os.environ.get("SCRAPE_QUORUM_FRACTION", 0.8))
+        self.straggler_grace = float(os.environ.get("SCRAPE_STRAGGLER_GRACE_SECONDS", 2.0))
+
+    @property
+    def model(self):
+        """The LLM client, constructed on first use."""
+        if self._model is None:
+            self._model = self._model_factory()
+        return self._model
+
+    @property
+    def duplicate_index(self):
+        """The persistent near-duplicate (MinHash/LSH) index, opened on first use."""
+        if self._duplicate_index is None:
+            # numpy is imported on first use to keep service startup fast
+            from near_duplicates import NearDuplicateIndex
+
+            self._duplicate_index = NearDuplicateIndex()
+        return self._duplicate_index
+
+    @property
+    def domain_stats(self):
+        """The node's per-domain scrape outcome store (None when disabled)."""
+        if self._domain_stats is None:
+            from domain_stats import get_domain_stats
+
+            self._domain_stats = get_domain_stats()
+        return self._domain_stats
+
+    @timed_stage("scraper.scrape_recipes")
     async def scrape_recipes(
-        self, urls: List[str]
+        self,
+        urls: List[str],
+        on_result: Optional[
+            Callable[[str, Tuple[Optional[Recipe], List[MetricsEvent]]], None]
+        ] = None,
     ) -> List[Tuple[Optional[Recipe], List[MetricsEvent]]]:
         """
         Scrape multiple recipes in parallel.
+
+        `on_result(url, result)` is called as each URL finishes, so callers can
+        keep partial progress if the batch is cancelled part-way. Once a
+        quorum of URLs has produced a recipe, stragglers get a grace period
+        and are then cancelled; only finished URLs are returned.
         """
+
+        async def scrape_and_report(url: str, session: aiohttp.ClientSession):
+            result = await self.scrape_recipe(url, session)
+            if on_result:
+                on_result(url, result)
+            return result
+
         async with aiohttp.ClientSession() as session:
-            tasks = [self.scrape_recipe(url, session) for url in urls]
-            return await asyncio.gather(*tasks)
+            tasks = [asyncio.create_task(scrape_and_report(url, session)) for url in urls]
+            try:
+                await self._wait_for_quorum(tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+            return [task.result() for task in tasks if not task.cancelled()]
+
+    def _page_slot(self) -> asyncio.Semaphore:
+        """The page cap of the running loop (the step outlives test event loops)."""
+        loop = asyncio.get_running_loop()
+        if self._page_slots is None or self._page_slots_loop is not loop:
+            self._page_slots = asyncio.Semaphore(max(1, self.max_pages_in_memory))
+            self._page_slots_loop = loop
+        return self._page_slots
+
+    async def _wait_for_quorum(self, tasks: List[asyncio.Task]):
+        """
+        Waits until ceil(scrape_quorum * len(tasks)) scrapes have succeeded
+        (or all have finished), then gives the rest the larger of
+        straggler_grace and half the time the quorum took.
+        """
+        quorum = math.ceil(self.scrape_quorum * len(tasks))
+        if quorum >= len(tasks):
+            await asyncio.gather(*tasks)
+            return
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        pending = set(tasks)
+        successes = 0
+        while pending and successes < quorum:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                recipe, _ = task.result()
+                successes += recipe is not None
+        if not pending:
+            return
+
+        grace = max(self.straggler_grace, (loop.time() - started) / 2)
+        _, pending = await asyncio.wait(pending, timeout=grace)
+        if pending:
+            self.logger.info(
+                "Scrape quorum of %s/%s reached, cancelling %s stragglers",
+                quorum,
+                len(tasks),
+                len(pending),
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
 
     async def scrape_recipe(
         self, url: str, session: Optional[aiohttp.ClientSession] = None
     ) -> Tuple[Optional[Recipe], List[MetricsEvent]]:
         """
-        Main entry point for recipe scraping.
+        Main entry point for recipe scraping. The outcome is also recorded
+        against the URL's domain for URL ranking (see domain_stats).
         """
+        recipe, metrics = await self._scrape_recipe(url, session)
+        if self.domain_stats is not None:
+            try:
+                self.domain_stats.record_events(metrics)
+            except Exception as e:
+                self.logger.warning("Could not record domain stats for %s: %s", url, e)
+        return recipe, metrics
+
+    async def _scrape_recipe(
+        self, url: str, session: Optional[aiohttp.ClientSession] = None
+    ) -> Tuple[Optional[Recipe], List[MetricsEvent]]:
         metrics: List[MetricsEvent] = []
         start_time = time.time()
 
         # Clean the URL first
         cleaned_url = self._clean_url(url)
         if not cleaned_url:
-            self.logger.error(f"Invalid URL format: {url}")
+            self.logger.error("Invalid URL format: %s", url)
             metrics.append(
                 self._create_metrics_event(
                     RecipeMetricsEventType.failure,
@@ -68,19 +199,30 @@ class RecipeScraperWorkflowStep:
         try:
             # Use cleaned URL for scraping
             parsed_data = await self._try_gemini_scrape(cleaned_url, session)
-            if not parsed_data:
+            if parsed_data and "duplicate_of" in parsed_data:
+                metrics.append(
+                    self._create_metrics_event(
+                        RecipeMetricsEventType.duplicate,
+                        duration=time.time() - start_time,
+                        metadata={"url": cleaned_url, **parsed_data},
+                    )
+                )
+                return None, metrics
+            if not parsed_data or "failed_stage" in parsed_data:
                 metrics.append(
                     self._create_metrics_event(
                         RecipeMetricsEventType.failure,
                         duration=time.time() - start_time,
-                        metadata={"url": cleaned_url, "method": "gemini"},
+                        metadata={"url": cleaned_url, "method": "gemini", **(parsed_data or {})},
                     )
                 )
                 return None, metrics
 
             # Create Recipe object from parsed data
             recipe_data = parsed_data["recipe"]
-            recipe_data["ingredients"] = parsed_data["ingredients"]
+            recipe_data["ingredients"] = self._normalize_ingredients(
+                parsed_data["ingredients"]
+            )
 
             # Filter ingredients and update notes
             recipe_data = self._filter_ingredients_and_update_notes(recipe_data)
@@ -88,6 +230,7 @@ class RecipeScraperWorkflowStep:
             # Validate recipe data
             is_valid, validation_errors = self._validate_recipe(recipe_data)
             if not is_valid:
+                self._release_near_duplicate(cleaned_url)
                 metrics.append(
                     self._create_metrics_event(
                         RecipeMetricsEventType.validation_errors,
@@ -109,8 +252,12 @@ class RecipeScraperWorkflowStep:
             )
             return recipe, metrics
 
+        except asyncio.CancelledError:
+            self._release_near_duplicate(cleaned_url)
+            raise
         except Exception as e:
-            self.logger.error(f"Error scraping recipe from {cleaned_url}: {str(e)}")
+            self._release_near_duplicate(cleaned_url)
+            self.logger.error("Error scraping recipe from %s: %s", cleaned_url, e)
             metrics.append(
                 self._create_metrics_event(
                     RecipeMetricsEventType.failure,
@@ -128,85 +275,267 @@ class RecipeScraperWorkflowStep:
         self, url: str, session: Optional[aiohttp.ClientSession] = None
     ) -> Optional[Dict]:
         """
-        Attempts to scrape recipe using Gemini-based approach.
+        Attempts to scrape recipe using Gemini-based approach. A failure
+        returns {"failed_stage", "error_type"} naming the step that failed.
         """
         try:
-            self.logger.info(f"Starting scrape for URL: {url}")
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
+            self.logger.info("Starting scrape for URL: %s", url)
+
+            async with self._page_slot():
+                try:
+                    html = await self._fetch_html(url, session)
+                    self.logger.debug("Successfully fetched HTML from %s", url)
+                except Exception as e:
+                    self.logger.error("Failed to fetch URL %s: %s", url, e)
+                    return {"failed_stage": "fetch", "error_type": type(e).__name__}
+
+                try:
+                    with memory_accounting.hold("scrape.html", len(html)):
+                        recipe_json = self._extract_recipe_json(html, url)
+                    self.logger.debug("Successfully scraped recipe JSON from %s", url)
+                except Exception as e:
+                    self.logger.error("Failed to scrape HTML from %s: %s", url, e)
+                    return {"failed_stage": "extract", "error_type": type(e).__name__}
+                finally:
+                    # The page is the largest intermediate; release it (and its
+                    # slot) before the LLM wait instead of when the scrape ends
+                    del html
+
+            duplicate = self._check_near_duplicate(recipe_json, url)
+            if duplicate is not None:
+                duplicate_of, similarity = duplicate
+                return {"duplicate_of": duplicate_of, "similarity": round(similarity, 3)}
+
+            # Serialized once, as the prompt embeds it; the text is what the
+            # LLM wait keeps alive, and its length is what is accounted
+            recipe_text = str(recipe_json)
+            del recipe_json
+            with memory_accounting.hold("scrape.recipe_json", len(recipe_text)):
+                # The context carries the workflow the LLM response is attributed to
+                parsed_data = await asyncio.get_running_loop().run_in_executor(
+                    self.llm_executor,
+                    contextvars.copy_context().run,
+                    self._parse_with_llm,
+                    recipe_text,
+                    url,
+                )
+            del recipe_text
+            if parsed_data is None:
+                self._release_near_duplicate(url)
+                return {"failed_stage": "llm", "error_type": "ParseError"}
+            return parsed_data
 
-            try:
-                if session:
-                    async with session.get(url, headers=headers) as response:
-                        html = await response.text()
-                else:
-                    response = requests.get(url, headers=headers)
-                    html = response.text
-                self.logger.debug(f"Successfully fetched HTML from {url}")
-            except Exception as e:
-                self.logger.error(f"Failed to fetch URL {url}: {str(e)}")
-                return None
+        except Exception as e:
+            self.logger.error("Gemini scraping failed for %s: %s", url, e)
+            return {"failed_stage": "llm", "error_type": type(e).__name__}
 
-            try:
-                scraper = scrape_html(html=html, org_url=url, wild_mode=True)
-                recipe_json = scraper.to_json()
-                self.logger.debug(f"Successfully scraped recipe JSON from {url}")
-            except Exception as e:
-                self.logger.error(f"Failed to scrape HTML from {url}: {str(e)}")
-                return None
+    @timed_stage("scraper.fetch")
+    async def _fetch_html(
+        self, url: str, session: Optional[aiohttp.ClientSession] = None
+    ) -> str:
+        """
+        Fetches the HTML of a recipe page, up to the end of its JSON-LD
+        Recipe block when it has one (see _get_text).
+        """
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        }
+        if session:
+            return await self._hedged_fetch(url, session, headers)
+
+        import requests
+
+        scanner = JsonLdScanner()
+        with requests.get(url, headers=headers, timeout=self.fetch_timeout, stream=True) as response:
+            for chunk in response.iter_content(chunk_size=65536):
+                if scanner.feed(chunk) or len(scanner.buffer) >= self.fetch_max_bytes:
+                    break
+            return self._decode(scanner.buffer, response.encoding)
+
+    async def _get_text(
+        self, url: str, session: aiohttp.ClientSession, headers: Dict[str, str]
+    ) -> str:
+        """
+        Streams the page and stops reading once a complete schema.org Recipe
+        JSON-LD block has arrived (it usually sits in the <head>, ahead of
+        megabytes of ads and scripts) or fetch_max_bytes have been read.
+        """
+        scanner = JsonLdScanner()
+        async with session.get(url, headers=headers) as response:
+            async for chunk in response.content.iter_chunked(65536):
+                if scanner.feed(chunk) or len(scanner.buffer) >= self.fetch_max_bytes:
+                    break
+            return self._decode(scanner.buffer, response.charset)
+
+    def _decode(self, body: bytearray, encoding: Optional[str]) -> str:
+        body = body[: self.fetch_max_bytes]
+        try:
+            return body.decode(encoding or "utf-8", errors="replace")
+        except LookupError:
+            return body.decode("utf-8", errors="replace")
 
-            try:
-                prompt = f"""
-                Parse this recipe JSON into our required format. Return ONLY a JSON with two keys: 'recipe' and 'ingredients'.
-
-                Recipe JSON:
-                {recipe_json}
-
-                For ingredients, use this EXACT format and separate quantity/unit from name:
-                [
-                    {{"name": "boneless chicken thigh fillets", "quantity": 450.0, "unit": "g", "notes": "1 pound", "group": None}},
-                    {{"name": "sweet potato", "quantity": 100.0, "unit": "g", "notes": "3.5 ounces, peeled and thinly sliced", "group": None}}
-                ]
-
-                Rules for ingredients:
-                - Extract quantity and unit from the ingredient name
-                - Put the pure ingredient name without measurements in "name"
-                - Convert fractions to decimals
-                - Include any additional info in notes
-                - Keep the original group if present
-
-                For recipe, include these fields:
-                {{
-                    "title": str,
-                    "instructions": str,
-                    "prep_time": int (in minutes),
-                    "cook_time": int (in minutes),
-                    "total_time": int (in minutes),
-                    "servings": int,
-                    "source_url": str,
-                    "notes": str or None
-                }}
-
-                Use None (not null) for any missing fields.
-                """
-
-                response = self.model.generate_content(prompt)
-                json_str = response.text.replace("```json\n", "").replace("\n```", "")
-                parsed_data = json.loads(json_str)
-                self.logger.debug(f"Successfully parsed recipe data from {url}")
-                return parsed_data
-            except Exception as e:
-                self.logger.error(
-                    f"Failed to parse recipe with Gemini for {url}: {str(e)}"
-                )
-                self.logger.error(
-                    f"Gemini response: {response.text if 'response' in locals() else 'No response'}"
+    async def _hedged_fetch(
+        self, url: str, session: aiohttp.ClientSession, headers: Dict[str, str]
+    ) -> str:
+        """
+        Fetches within fetch_timeout. If the request is still running after
+        the domain's hedge delay (its recent p95 fetch latency), an identical
+        second request is sent; the first response wins and the other
+        request is cancelled.
+        """
+        domain = url_domain(url)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.fetch_timeout
+        hedge_at = (
+            started + self.fetch_latencies.hedge_delay(domain) if self.fetch_hedging else None
+        )
+
+        def launch() -> asyncio.Task:
+            task = asyncio.create_task(self._get_text(url, session, headers))
+            started_at[task] = loop.time()
+            return task
+
+        started_at: Dict[asyncio.Task, float] = {}
+        pending = {launch()}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                wake_at = min(deadline, hedge_at) if hedge_at is not None else deadline
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(0.0, wake_at - loop.time()),
+                    return_when=asyncio.FIRST_COMPLETED,
                 )
-                return None
+                for task in done:
+                    if task.exception() is None:
+                        self.fetch_latencies.record(domain, loop.time() - started_at[task])
+                        return task.result()
+                    error = task.exception()
+                if loop.time() >= deadline:
+                    error = None
+                    break
+                if hedge_at is not None and not done and loop.time() >= hedge_at:
+                    self.logger.debug("Hedging slow fetch of %s", url)
+                    hedge_at = None
+                    pending.add(launch())
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if error is not None:
+            raise error
+        # Timeouts count at the deadline so slow domains hedge earlier next time
+        self.fetch_latencies.record(domain, self.fetch_timeout)
+        raise asyncio.TimeoutError(f"Fetching {url} took longer than {self.fetch_timeout}s")
+
+    @timed_stage("scraper.parse")
+    def _extract_recipe_json(self, html: str, url: str) -> Dict[str, Any]:
+        """
+        Extracts the schema.org recipe from the HTML as JSON: straight from
+        the JSON-LD block when there is one, otherwise with a full
+        recipe_scrapers (BeautifulSoup) parse.
+        """
+        recipe = extract_recipe(html, url)
+        if recipe is not None:
+            return recipe
+
+        from recipe_scrapers import scrape_html
+
+        scraper = scrape_html(html=html, org_url=url, wild_mode=True)
+        return scraper.to_json()
+
+    @timed_stage("scraper.dedupe")
+    def _check_near_duplicate(self, recipe_json: Dict, url: str) -> Optional[Tuple[str, float]]:
+        """
+        Fingerprints the scraped recipe before the LLM call. Returns
+        (duplicate_url, similarity) for a near-duplicate of an already
+        saved recipe; otherwise records the fingerprint for this URL, which
+        only matches other URLs once confirm_near_duplicate() is called.
+        """
+        if not self.near_duplicate_detection:
+            return None
+        try:
+            return self.duplicate_index.check_and_add(recipe_json, url)
+        except Exception as e:
+            self.logger.warning("Near-duplicate check failed for %s: %s", url, e)
+            return None
 
+    def _release_near_duplicate(self, url: str):
+        """Drops a pending fingerprint when the recipe could not be ingested."""
+        if not self.near_duplicate_detection or self._duplicate_index is None:
+            return
+        try:
+            self._duplicate_index.release(url)
+        except Exception as e:
+            self.logger.warning("Could not release near-duplicate entry for %s: %s", url, e)
+
+    def confirm_near_duplicate(self, url: str):
+        """Called once the recipe scraped from `url` is saved."""
+        if not self.near_duplicate_detection or self._duplicate_index is None:
+            return
+        try:
+            self._duplicate_index.confirm(url)
         except Exception as e:
-            self.logger.error(f"Gemini scraping failed for {url}: {str(e)}")
+            self.logger.warning("Could not confirm near-duplicate entry for %s: %s", url, e)
+
+    def release_near_duplicate(self, url: str):
+        """Called when the recipe scraped from `url` could not be saved."""
+        self._release_near_duplicate(url)
+
+    @timed_stage("scraper.llm")
+    def _parse_with_llm(self, recipe_json: str, url: str) -> Optional[Dict]:
+        """
+        Asks the LLM to convert the scraped recipe JSON into our recipe format.
+        """
+        try:
+            prompt = f"""
+            Parse this recipe JSON into our required format. Return ONLY a JSON with two keys: 'recipe' and 'ingredients'.
+
+            Recipe JSON:
+            {recipe_json}
+
+            For ingredients, use this EXACT format and separate quantity/unit from name:
+            [
+                {{"name": "boneless chicken thigh fillets", "quantity": 450.0, "unit": "g", "notes": "1 pound", "group": None}},
+                {{"name": "sweet potato", "quantity": 100.0, "unit": "g", "notes": "3.5 ounces, peeled and thinly sliced", "group": None}}
+            ]
+
+            Rules for ingredients:
+            - Extract quantity and unit from the ingredient name
+            - Put the pure ingredient name without measurements in "name"
+            - Convert fractions to decimals
+            - Include any additional info in notes
+            - Keep the original group if present
+
+            For recipe, include these fields:
+            {{
+                "title": str,
+                "instructions": str,
+                "prep_time": int (in minutes),
+                "cook_time": int (in minutes),
+                "total_time": int (in minutes),
+                "servings": int,
+                "source_url": str,
+                "notes": str or None
+            }}
+
+            Use None (not null) for any missing fields.
+            """
+
+            response = self.model.generate_content(prompt)
+            del prompt
+            with memory_accounting.hold("llm.response", len(response.text)):
+                json_str = response.text.replace("```json\n", "").replace("\n```", "")
+                parsed_data = json.loads(json_str)
+            self.logger.debug("Successfully parsed recipe data from %s", url)
+            return parsed_data
+        except Exception as e:
+            self.logger.error("Failed to parse recipe with Gemini for %s: %s", url, e)
+            self.logger.error(
+                "Gemini response: %s",
+                response.text if 'response' in locals() else 'No response',
+            )
             return None
 
     def _create_metrics_event(
@@ -225,6 +554,7 @@ class RecipeScraperWorkflowStep:
             timestamp=datetime.utcnow(),
         )
 
+    @timed_stage("scraper.validate")
     def _validate_recipe(self, recipe_data: dict) -> Tuple[bool, List[str]]:
         """
         Validates recipe data against Recipe model.
@@ -239,6 +569,17 @@ class RecipeScraperWorkflowStep:
             errors = [f"{error['loc'][0]}: {error['msg']}" for error in e.errors()]
             return False, errors
 
+    @timed_stage("scraper.normalize")
+    def _normalize_ingredients(self, ingredients: List[Dict]) -> List[Dict]:
+        """
+        Parses quantities, canonicalizes units and converts to metric, so
+        fewer ingredients are dropped for lacking a quantity.
+        """
+        # numpy is imported on first use to keep service startup fast
+        from ingredient_units import normalize_ingredients
+
+        return normalize_ingredients(ingredients)
+
     def _filter_ingredients_and_update_notes(self, recipe_data: Dict) -> Dict:
         """
         Filter out ingredients without quantity/unit and add them to notes.
@@ -267,22 +608,21 @@ class RecipeScraperWorkflowStep:
 
     def _clean_url(self, url: str) -> Optional[str]:
         """Clean markdown formatted URLs and ensure we have valid http/https URLs."""
-        self.logger.debug(f"Cleaning URL: {url}")
-        import re
+        self.logger.debug("Cleaning URL: %s", url)
 
         # Try to extract URL from markdown format [title](url)
         markdown_match = re.search(r"\[(.*?)\]\((https?://[^)]+)\)", url)
         if markdown_match:
             cleaned = markdown_match.group(2)  # Get the URL part
-            self.logger.debug(f"Extracted URL from markdown: {cleaned}")
+            self.logger.debug("Extracted URL from markdown: %s", cleaned)
             return cleaned
 
         # If not markdown, check if it's a plain http/https URL
         if url.startswith(("http://", "https://")):
-            self.logger.debug(f"URL is already clean: {url}")
+            self.logger.debug("URL is already clean: %s", url)
             return url
 
-        self.logger.error(f"Could not extract valid URL from: {url}")
+        self.logger.error("Could not extract valid URL from: %s", url)
         return None
 
 
@@ -297,12 +637,8 @@ async def main():
         #     "https://www.simplyrecipes.com/recipes/homemade_pizza/",
         #     "https://invalid-recipe-url.com/recipe",  # Should fail
         # ]
-        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-        model = genai.GenerativeModel(
-            "gemini-2.0-flash", generation_config={"temperature": 0}
-        )
         # Initialize scraper
-        scraper = RecipeScraperWorkflowStep(model)
+        scraper = RecipeScraperWorkflowStep()
 
         # Process each URL
         for url in test_urls:
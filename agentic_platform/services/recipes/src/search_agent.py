@@ -1,9 +1,57 @@
 import logging
+import os
 import time
+from functools import lru_cache
 from typing import List, Optional, Tuple
-from duckduckgo_search import DDGS
 from datetime import datetime
 from event_models import MetricsEvent
+from local_store import LocalStore
+from query_normalizer import query_cache_key
+
+SEARCH_CACHE_NAMESPACE = "search_results"
+
+
+@lru_cache(maxsize=1)
+def get_search_cache() -> Optional[LocalStore]:
+    """The node's search result cache, or None when SEARCH_CACHE_TTL_SECONDS is 0."""
+    if float(os.environ.get("SEARCH_CACHE_TTL_SECONDS", 6 * 3600)) <= 0:
+        return None
+    try:
+        return LocalStore()
+    except Exception as e:
+        logging.warning("Search cache disabled, could not open it: %s", e)
+        return None
+
+
+def _cached_urls(query_key: str, excluded_domains: Optional[List[str]], num_urls: int) -> List[str]:
+    """
+    Cached results for the query group, minus excluded domains; empty when
+    fewer than `num_urls` remain. Results are cached per query only, so
+    requests excluding different domains share them.
+    """
+    cache = get_search_cache()
+    if cache is None:
+        return []
+    try:
+        cached = cache.get(SEARCH_CACHE_NAMESPACE, query_key) or []
+    except Exception as e:
+        logging.warning("Could not read search cache: %s", e)
+        return []
+    urls = [url for url in cached if not any(domain in url for domain in excluded_domains or [])]
+    return urls[:num_urls] if len(urls) >= num_urls else []
+
+
+def _cache_urls(query_key: str, urls: List[str]):
+    cache = get_search_cache()
+    if cache is None or not urls:
+        return
+    try:
+        # Keep the longest result list seen for the group
+        if len(urls) >= len(cache.get(SEARCH_CACHE_NAMESPACE, query_key) or []):
+            ttl = float(os.environ.get("SEARCH_CACHE_TTL_SECONDS", 6 * 3600))
+            cache.set(SEARCH_CACHE_NAMESPACE, query_key, urls, ttl=ttl)
+    except Exception as e:
+        logging.warning("Could not write search cache: %s", e)
 
 
 def search_recipes(
@@ -14,7 +62,10 @@ def search_recipes(
     retry_delay: float = 1.0,
 ) -> Tuple[List[str], MetricsEvent]:
     """
-    Searches for recipes using DuckDuckGo Search API, with domain exclusion and retry logic.
+    Searches for recipes by racing the configured search providers (see
+    search_providers), with domain exclusion and retry logic. Results are
+    cached under the canonical query (see query_normalizer), so similar
+    queries reuse one search.
     Returns both the recipe URLs and a metrics event for tracking duration.
 
     Args:
@@ -30,60 +81,61 @@ def search_recipes(
     start_time = time.time()
 
     logging.info(
-        f"Searching for recipes with query: {search_query}, "
-        f"excluding domains: {excluded_domains}, num_urls: {num_urls}"
+        "Searching for recipes with query: %s, excluding domains: %s, num_urls: %s",
+        search_query,
+        excluded_domains,
+        num_urls,
     )
 
+    # The cache key is the query alone; exclusions are applied to the cached results
+    query_key = query_cache_key(search_query)
+    recipe_urls = _cached_urls(query_key, excluded_domains, num_urls)
+    if recipe_urls:
+        logging.info("Search cache hit for '%s': %s URLs", query_key, len(recipe_urls))
+        metrics_event = MetricsEvent(
+            event_type="recipe_search.duration",
+            duration=time.time() - start_time,
+            timestamp=datetime.utcnow(),
+            metadata={
+                "search_query": search_query,
+                "query_key": query_key,
+                "num_urls_requested": num_urls,
+                "num_urls_found": len(recipe_urls),
+                "attempts": 0,
+                "cache": "hit",
+            },
+        )
+        return recipe_urls, metrics_event
+
     # Build the search query with domain exclusions
     if excluded_domains:
         exclusion_string = " ".join([f"-site:{domain}" for domain in excluded_domains])
         search_query = f"{search_query} {exclusion_string}"
 
     search_query = f"{search_query} recipe -gallery -collection"
-    logging.info(f"Final search query: {search_query}")
+    logging.info("Final search query: %s", search_query)
+
+    from search_providers import get_search_race
 
-    ddgs = DDGS()
+    race = get_search_race()
     recipe_urls = []
+    providers = {}
 
     for attempt in range(max_retries):
-        try:
-            results = list(
-                ddgs.text(
-                    keywords=search_query,
-                    region="wt-wt",
-                    safesearch="off",
-                    max_results=num_urls * 2,
-                )
-            )
-
-            if results:
-                for result in results:
-                    url = result.get("link") or result.get("href")
-                    if url and not any(
-                        domain in url for domain in (excluded_domains or [])
-                    ):
-                        recipe_urls.append(url)
-
-                if recipe_urls:
-                    recipe_urls = recipe_urls[:num_urls]
-                    logging.info(f"Found {len(recipe_urls)} recipe URLs")
-                    logging.debug(f"URLs found: {recipe_urls}")
-                    break
-                else:
-                    logging.warning(
-                        f"No valid URLs found in results on attempt {attempt + 1}"
-                    )
-
-        except Exception as e:
-            logging.error(
-                f"Error during recipe search (attempt {attempt + 1}/{max_retries}): {str(e)}"
-            )
-            if attempt < max_retries - 1:
-                logging.info(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                continue
-            else:
-                logging.error("Max retries reached, returning empty list")
+        recipe_urls, providers = race.search(search_query, num_urls, excluded_domains)
+        if recipe_urls:
+            logging.info("Found %s recipe URLs", len(recipe_urls))
+            logging.debug("URLs found: %s", recipe_urls)
+            break
+
+        logging.warning(
+            "No valid URLs found on attempt %s/%s: %s", attempt + 1, max_retries, providers
+        )
+        if attempt < max_retries - 1:
+            logging.info("Retrying in %s seconds...", retry_delay)
+            time.sleep(retry_delay)
+        else:
+            logging.error("Max retries reached, returning empty list")
 
     end_time = time.time()
     duration = end_time - start_time
@@ -95,11 +147,15 @@ def search_recipes(
         timestamp=datetime.utcnow(),
         metadata={
             "search_query": search_query,
+            "query_key": query_key,
             "num_urls_requested": num_urls,
             "num_urls_found": len(recipe_urls),
             "attempts": attempt + 1,
+            "providers": providers,
+            "cache": "miss",
         },
     )
+    _cache_urls(query_key, recipe_urls)
 
     if not recipe_urls:
         logging.warning("No valid results found after all retry attempts")
@@ -0,0 +1,227 @@
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+
+class SearchProvider(ABC):
+    """A web search backend returning result URLs for a query."""
+
+    name: str
+
+    @abstractmethod
+    def search(self, query: str, num_results: int) -> List[str]:
+        """Blocking search; raises on errors (including rate limits)."""
+
+
+class DuckDuckGoProvider(SearchProvider):
+    name = "duckduckgo"
+
+    def search(self, query: str, num_results: int) -> List[str]:
+        from duckduckgo_search import DDGS
+
+        results = DDGS().text(
+            keywords=query,
+            region="wt-wt",
+            safesearch="off",
+            max_results=num_results,
+        )
+        return [
+            result.get("link") or result.get("href")
+            for result in results or []
+            if result.get("link") or result.get("href")
+        ]
+
+
+class SearxngProvider(SearchProvider):
+    """
+    A self-hosted SearXNG (or compatible) metasearch endpoint, queried
+    through its JSON API: GET <base_url>/search?q=...&format=json.
+    """
+
+    name = "searxng"
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def search(self, query: str, num_results: int) -> List[str]:
+        import requests
+
+        response = requests.get(
+            f"{self.base_url}/search",
+            params={"q": query, "format": "json", "safesearch": 0},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        results = response.json().get("results", [])
+        return [result["url"] for result in results[:num_results] if result.get("url")]
+
+
+class ProviderStats:
+    """
+    Exponentially weighted latency and error rate per provider. A provider's
+    weight is its expected good answers per second, so fast, reliable
+    providers are raced first and their results ranked first.
+    """
+
+    def __init__(self, alpha: float = 0.2, default_latency: float = 2.0):
+        self.alpha = alpha
+        self.default_latency = default_latency
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, provider: str, latency: float, ok: bool):
+        with self._lock:
+            entry = self._stats.get(provider)
+            if entry is None:
+                entry = self._stats[provider] = {
+                    "latency": latency,
+                    "error_rate": 0.0 if ok else 1.0,
+                    "calls": 0,
+                    "errors": 0,
+                }
+            else:
+                entry["latency"] += self.alpha * (latency - entry["latency"])
+                entry["error_rate"] += self.alpha * ((0.0 if ok else 1.0) - entry["error_rate"])
+            entry["calls"] += 1
+            entry["errors"] += 0 if ok else 1
+
+    def weight(self, provider: str) -> float:
+        with self._lock:
+            entry = self._stats.get(provider)
+            if entry is None:
+                return 1.0 / self.default_latency
+            return (1.0 - entry["error_rate"]) / max(entry["latency"], 0.05)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {provider: dict(entry) for provider, entry in self._stats.items()}
+
+
+def normalize_url(url: str) -> str:
+    """Dedup key: lowercase host, no fragment, no trailing slash."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+class SearchRace:
+    """
+    Runs a query against the best `width` providers at once (by weight) and
+    merges their results in weight order as they arrive. It returns as soon
+    as the merged, deduplicated results reach the requested count, so the
+    first good answer wins; if every raced provider fails, the remaining
+    providers are tried. Losing providers finish in the background and
+    still update the stats.
+    """
+
+    def __init__(
+        self,
+        providers: List[SearchProvider],
+        stats: Optional[ProviderStats] = None,
+        width: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.providers = providers
+        self.stats = stats or ProviderStats()
+        self.width = width or int(os.environ.get("SEARCH_RACE_WIDTH", 2))
+        self.timeout = timeout or float(os.environ.get("SEARCH_RACE_TIMEOUT_SECONDS", 15))
+        self._executor = ThreadPoolExecutor(max_workers=max(4, 2 * len(providers)), thread_name_prefix="search")
+
+    def _run(self, provider: SearchProvider, query: str, num_results: int) -> List[str]:
+        started = time.perf_counter()
+        try:
+            urls = provider.search(query, num_results)
+        except Exception:
+            self.stats.record(provider.name, time.perf_counter() - started, ok=False)
+            raise
+        # An empty answer is as useless as an error
+        self.stats.record(provider.name, time.perf_counter() - started, ok=bool(urls))
+        return urls
+
+    def search(
+        self,
+        query: str,
+        num_urls: int,
+        excluded_domains: Optional[List[str]] = None,
+    ) -> Tuple[List[str], Dict[str, Dict]]:
+        """Returns (urls, per-provider outcome of this race)."""
+        ranked = sorted(self.providers, key=lambda provider: -self.stats.weight(provider.name))
+        deadline = time.monotonic() + self.timeout
+        outcomes: Dict[str, Dict] = {}
+        results: Dict[str, List[str]] = {}
+
+        for batch_start in range(0, len(ranked), self.width):
+            batch = ranked[batch_start : batch_start + self.width]
+            futures: Dict[Future, SearchProvider] = {
+                self._executor.submit(self._run, provider, query, num_urls * 2): provider
+                for provider in batch
+            }
+            pending = set(futures)
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    provider = futures[future]
+                    try:
+                        results[provider.name] = future.result()
+                        outcomes[provider.name] = {"ok": True, "urls": len(results[provider.name])}
+                    except Exception as e:
+                        logging.warning("Search provider %s failed: %s", provider.name, e)
+                        outcomes[provider.name] = {"ok": False, "error": type(e).__name__}
+                merged = self._merge(ranked, results, excluded_domains)
+                if len(merged) >= num_urls:
+                    return merged[:num_urls], outcomes
+            for future in pending:
+                outcomes[futures[future].name] = {"ok": False, "error": "timeout"}
+            merged = self._merge(ranked, results, excluded_domains)
+            if merged or time.monotonic() >= deadline:
+                return merged[:num_urls], outcomes
+        return [], outcomes
+
+    def _merge(
+        self,
+        ranked: List[SearchProvider],
+        results: Dict[str, List[str]],
+        excluded_domains: Optional[List[str]],
+    ) -> List[str]:
+        merged: List[str] = []
+        seen = set()
+        for provider in ranked:
+            for url in results.get(provider.name, []):
+                key = normalize_url(url)
+                if key in seen or any(domain in url for domain in (excluded_domains or [])):
+                    continue
+                seen.add(key)
+                merged.append(url)
+        return merged
+
+
+def configured_providers() -> List[SearchProvider]:
+    """
+    Providers named in SEARCH_PROVIDERS (default "duckduckgo,searxng");
+    searxng is only used when SEARXNG_URL is set.
+    """
+    providers: List[SearchProvider] = []
+    for name in os.environ.get("SEARCH_PROVIDERS", "duckduckgo,searxng").split(","):
+        name = name.strip().lower()
+        if name == "duckduckgo":
+            providers.append(DuckDuckGoProvider())
+        elif name == "searxng" and os.environ.get("SEARXNG_URL"):
+            providers.append(SearxngProvider(os.environ["SEARXNG_URL"]))
+        elif name and name != "searxng":
+            logging.warning(f"Unknown search provider: {name}")
+    return providers
+
+
+@lru_cache(maxsize=1)
+def get_search_race() -> SearchRace:
+    return SearchRace(configured_providers())
@@ -0,0 +1,358 @@
+# generated by gen_structs.py:
+#   sources: schema.json, metrics_schema.json, models.Recipe
+#   regenerate with `make structs`; do not edit by hand.
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+# Reused encoder: json.dumps builds a new JSONEncoder per call for non-default options
+_encode_json = json.JSONEncoder(separators=(",", ":"), default=_json_default).encode
+
+
+def _check(value: Any, field: str, types: tuple, required: bool, enum: tuple = ()):
+    if value is None:
+        if required:
+            raise ValueError(f"{field}: field required")
+        return
+    if isinstance(value, bool) and bool not in types:
+        raise ValueError(f"{field}: expected {'/'.join(t.__name__ for t in types)}")
+    if not isinstance(value, types):
+        raise ValueError(f"{field}: expected {'/'.join(t.__name__ for t in types)}")
+    if enum and value not in enum:
+        raise ValueError(f"{field}: must be one of {', '.join(map(str, enum))}")
+
+
+class WorkflowPayload:
+    """Payload data specific to the workflow type."""
+
+    __slots__ = ("search_query", "number_of_recipes")
+
+    def __init__(
+        self,
+        search_query: str,
+        number_of_recipes: Optional[int] = None,
+    ):
+        self.search_query = search_query
+        self.number_of_recipes = number_of_recipes
+
+    def __repr__(self) -> str:
+        return f"WorkflowPayload(search_query={self.search_query!r}, number_of_recipes={self.number_of_recipes!r})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, WorkflowPayload):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "search_query": self.search_query,
+            "number_of_recipes": self.number_of_recipes,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> WorkflowPayload:
+        return cls(
+            search_query=data["search_query"],
+            number_of_recipes=data.get("number_of_recipes"),
+        )
+
+    def encode(self) -> bytes:
+        return _encode_json(self.to_dict()).encode()
+
+    @classmethod
+    def decode(cls, raw: bytes | str) -> WorkflowPayload:
+        return cls.from_dict(json.loads(raw))
+
+    def validate(self) -> WorkflowPayload:
+        """Checks required fields, types and enums; raises ValueError."""
+        _check(self.search_query, "search_query", (str,), True)
+        _check(self.number_of_recipes, "number_of_recipes", (int,), False)
+        return self
+
+
+class WorkflowInitiateMessage:
+    """Message to initiate a workflow in the Recipe Agent Service"""
+
+    __slots__ = ("workflow_type", "workflow_payload", "workflow_id", "priority", "deadline_seconds")
+
+    def __init__(
+        self,
+        workflow_type: str,
+        workflow_payload: WorkflowPayload,
+        workflow_id: Optional[str] = None,
+        priority: Optional[str] = None,
+        deadline_seconds: Optional[float] = None,
+    ):
+        self.workflow_type = workflow_type
+        self.workflow_payload = workflow_payload
+        self.workflow_id = workflow_id
+        self.priority = priority
+        self.deadline_seconds = deadline_seconds
+
+    def __repr__(self) -> str:
+        return f"WorkflowInitiateMessage(workflow_type={self.workflow_type!r}, workflow_payload={self.workflow_payload!r}, workflow_id={self.workflow_id!r}, priority={self.priority!r}, deadline_seconds={self.deadline_seconds!r})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, WorkflowInitiateMessage):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "workflow_type": self.workflow_type,
+            "workflow_payload": self.workflow_payload.to_dict() if self.workflow_payload is not None else None,
+            "workflow_id": self.workflow_id,
+            "priority": self.priority,
+            "deadline_seconds": self.deadline_seconds,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> WorkflowInitiateMessage:
+        return cls(
+            workflow_type=data["workflow_type"],
+            workflow_payload=WorkflowPayload.from_dict(data["workflow_payload"]),
+            workflow_id=data.get("workflow_id"),
+            priority=data.get("priority"),
+            deadline_seconds=data.get("deadline_seconds"),
+        )
+
+    def encode(self) -> bytes:
+        return _encode_json(self.to_dict()).encode()
+
+    @classmethod
+    def decode(cls, raw: bytes | str) -> WorkflowInitiateMessage:
+        return cls.from_dict(json.loads(raw))
+
+    def validate(self) -> WorkflowInitiateMessage:
+        """Checks required fields, types and enums; raises ValueError."""
+        _check(self.workflow_type, "workflow_type", (str,), True, ('recipe_workflow_full',))
+        _check(self.workflow_payload, "workflow_payload", (WorkflowPayload,), True)
+        if self.workflow_payload is not None:
+            self.workflow_payload.validate()
+        _check(self.workflow_id, "workflow_id", (str, UUID), False)
+        _check(self.priority, "priority", (str,), False, ('interactive', 'batch'))
+        _check(self.deadline_seconds, "deadline_seconds", (int, float), False)
+        return self
+
+
+class MetricsEvent:
+    """Schema for generic metrics events."""
+
+    __slots__ = ("event_type", "timestamp", "duration", "count", "metadata")
+
+    def __init__(
+        self,
+        event_type: str,
+        timestamp: str | datetime,
+        duration: Optional[float] = None,
+        count: Optional[int] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self.event_type = event_type
+        self.timestamp = timestamp
+        self.duration = duration
+        self.count = count
+        self.metadata = metadata
+
+    def __repr__(self) -> str:
+        return f"MetricsEvent(event_type={self.event_type!r}, timestamp={self.timestamp!r}, duration={self.duration!r}, count={self.count!r}, metadata={self.metadata!r})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, MetricsEvent):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "event_type": self.event_type,
+            "timestamp": self.timestamp,
+            "duration": self.duration,
+            "count": self.count,
+            "metadata": self.metadata,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> MetricsEvent:
+        return cls(
+            event_type=data["event_type"],
+            timestamp=data["timestamp"],
+            duration=data.get("duration"),
+            count=data.get("count"),
+            metadata=data.get("metadata"),
+        )
+
+    def encode(self) -> bytes:
+        return _encode_json(self.to_dict()).encode()
+
+    @classmethod
+    def decode(cls, raw: bytes | str) -> MetricsEvent:
+        return cls.from_dict(json.loads(raw))
+
+    def validate(self) -> MetricsEvent:
+        """Checks required fields, types and enums; raises ValueError."""
+        _check(self.event_type, "event_type", (str,), True)
+        _check(self.timestamp, "timestamp", (str, datetime), True)
+        _check(self.duration, "duration", (int, float), False)
+        _check(self.count, "count", (int,), False)
+        _check(self.metadata, "metadata", (dict,), False)
+        return self
+
+
+class RecipeIngredient:
+    """RecipeIngredient"""
+
+    __slots__ = ("name", "quantity", "unit", "notes", "group")
+
+    def __init__(
+        self,
+        name: str,
+        quantity: Optional[float] = None,
+        unit: Optional[str] = None,
+        notes: Optional[str] = None,
+        group: Optional[str] = None,
+    ):
+        self.name = name
+        self.quantity = quantity
+        self.unit = unit
+        self.notes = notes
+        self.group = group
+
+    def __repr__(self) -> str:
+        return f"RecipeIngredient(name={self.name!r}, quantity={self.quantity!r}, unit={self.unit!r}, notes={self.notes!r}, group={self.group!r})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, RecipeIngredient):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "quantity": self.quantity,
+            "unit": self.unit,
+            "notes": self.notes,
+            "group": self.group,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> RecipeIngredient:
+        return cls(
+            name=data["name"],
+            quantity=data.get("quantity"),
+            unit=data.get("unit"),
+            notes=data.get("notes"),
+            group=data.get("group"),
+        )
+
+    def encode(self) -> bytes:
+        return _encode_json(self.to_dict()).encode()
+
+    @classmethod
+    def decode(cls, raw: bytes | str) -> RecipeIngredient:
+        return cls.from_dict(json.loads(raw))
+
+    def validate(self) -> RecipeIngredient:
+        """Checks required fields, types and enums; raises ValueError."""
+        _check(self.name, "name", (str,), True)
+        _check(self.quantity, "quantity", (int, float), False)
+        _check(self.unit, "unit", (str,), False)
+        _check(self.notes, "notes", (str,), False)
+        _check(self.group, "group", (str,), False)
+        return self
+
+
+class Recipe:
+    """Recipe"""
+
+    __slots__ = ("title", "instructions", "prep_time", "cook_time", "total_time", "servings", "source_url", "ingredients", "notes")
+
+    def __init__(
+        self,
+        title: str,
+        instructions: str,
+        prep_time: int,
+        cook_time: int,
+        total_time: int,
+        servings: int,
+        source_url: str,
+        ingredients: List[RecipeIngredient],
+        notes: Optional[str] = None,
+    ):
+        self.title = title
+        self.instructions = instructions
+        self.prep_time = prep_time
+        self.cook_time = cook_time
+        self.total_time = total_time
+        self.servings = servings
+        self.source_url = source_url
+        self.ingredients = ingredients
+        self.notes = notes
+
+    def __repr__(self) -> str:
+        return f"Recipe(title={self.title!r}, instructions={self.instructions!r}, prep_time={self.prep_time!r}, cook_time={self.cook_time!r}, total_time={self.total_time!r}, servings={self.servings!r}, source_url={self.source_url!r}, ingredients={self.ingredients!r}, notes={self.notes!r})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Recipe):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "title": self.title,
+            "instructions": self.instructions,
+            "prep_time": self.prep_time,
+            "cook_time": self.cook_time,
+            "total_time": self.total_time,
+            "servings": self.servings,
+            "source_url": self.source_url,
+            "ingredients": [item.to_dict() for item in self.ingredients] if self.ingredients is not None else None,
+            "notes": self.notes,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Recipe:
+        return cls(
+            title=data["title"],
+            instructions=data["instructions"],
+            prep_time=data["prep_time"],
+            cook_time=data["cook_time"],
+            total_time=data["total_time"],
+            servings=data["servings"],
+            source_url=data["source_url"],
+            ingredients=[RecipeIngredient.from_dict(item) for item in data["ingredients"]],
+            notes=data.get("notes"),
+        )
+
+    def encode(self) -> bytes:
+        return _encode_json(self.to_dict()).encode()
+
+    @classmethod
+    def decode(cls, raw: bytes | str) -> Recipe:
+        return cls.from_dict(json.loads(raw))
+
+    def validate(self) -> Recipe:
+        """Checks required fields, types and enums; raises ValueError."""
+        _check(self.title, "title", (str,), True)
+        _check(self.instructions, "instructions", (str,), True)
+        _check(self.prep_time, "prep_time", (int,), True)
+        _check(self.cook_time, "cook_time", (int,), True)
+        _check(self.total_time, "total_time", (int,), True)
+        _check(self.servings, "servings", (int,), True)
+        _check(self.source_url, "source_url", (str,), True)
+        _check(self.ingredients, "ingredients", (list,), True)
+        for item in self.ingredients or ():
+            _check(item, "ingredients[]", (RecipeIngredient,), True)
+            item.validate()
+        _check(self.notes, "notes", (str,), False)
+        return self
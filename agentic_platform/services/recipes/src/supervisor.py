@@ -0,0 +1,417 @@
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from local_store import LocalStore
+
+HEARTBEAT_NAMESPACE = "worker_heartbeats"
+
+
+def detect_worker_count() -> int:
+    """
+    Number of worker processes for this pod.
+
+    RECIPE_WORKERS may be an integer or "auto" (default). "auto" uses the
+    container's CPU limit from cgroups (v2 cpu.max, then v1 CFS quota),
+    capped at RECIPE_MAX_WORKERS (8). Without a limit the visible CPUs are
+    the node's, not the pod's share, so "auto" runs a single worker; each
+    worker carries its own LLM and HTTP pools.
+    """
+    configured = os.environ.get("RECIPE_WORKERS", "auto")
+    if configured != "auto":
+        return max(1, int(configured))
+
+    cpu_limit = _cgroup_cpu_limit()
+    if not cpu_limit:
+        return 1
+    return max(1, min(math.ceil(cpu_limit), int(os.environ.get("RECIPE_MAX_WORKERS", 8))))
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def admin_port() -> int:
+    return int(os.environ.get("ADMIN_PORT", 8081))
+
+
+def worker_admin_port(worker_index: int) -> int:
+    """Supervised workers listen above the pod's admin port, which the supervisor serves."""
+    return admin_port() + 1 + worker_index
+
+
+def _with_worker_label(sample: str, worker_index: int) -> str:
+    name, brace, rest = sample.partition("{")
+    if brace:
+        return f'{name}{{worker="{worker_index}",{rest}'
+    name, _, value = sample.partition(" ")
+    return f'{name}{{worker="{worker_index}"}} {value}'
+
+
+def merge_worker_metrics(texts: Dict[int, str]) -> List[str]:
+    """
+    Combines the workers' Prometheus text into one exposition, each sample
+    labelled with its worker and each family kept as one group.
+    """
+    families: Dict[str, List[str]] = {}
+    for worker_index, text in sorted(texts.items()):
+        family = None
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            if line.startswith("#"):
+                parts = line.split(" ", 3)
+                if len(parts) >= 3 and parts[1] in ("HELP", "TYPE"):
+                    family = parts[2]
+                    lines = families.setdefault(family, [])
+                    if line not in lines:
+                        lines.append(line)
+                continue
+            name = line.split("{", 1)[0].split(" ", 1)[0]
+            key = family if family and name.startswith(family) else name
+            families.setdefault(key, []).append(_with_worker_label(line, worker_index))
+    # HELP/TYPE first within each family
+    return [
+        line
+        for lines in families.values()
+        for line in sorted(lines, key=lambda line: not line.startswith("#"))
+    ]
+
+
+async def heartbeat_loop(worker_index: int, consumer, queue_depths=None, interval: float = 5.0):
+    """
+    Periodically records this worker's liveness, readiness, load and
+    autoscaling inputs in the shared local store so the supervisor can
+    aggregate pod health and the pod's replica signal.
+    """
+    from autoscaling import ReplicaAdvisor
+    from readiness import is_ready
+
+    store = LocalStore()
+    advisor = ReplicaAdvisor(consumer, workers=1)
+    queue_depths = queue_depths or consumer.queue_depths
+    while True:
+        try:
+            depths = await asyncio.wait_for(queue_depths(), timeout=1.0)
+        except Exception as e:
+            logging.debug("Could not read queue depths for heartbeat: %s", e)
+            depths = {}
+        store.set(
+            HEARTBEAT_NAMESPACE,
+            str(worker_index),
+            {
+                "pid": os.getpid(),
+                "ready": is_ready(),
+                "in_flight": consumer.in_flight_count,
+                "autoscale": advisor.compute(depths),
+                "timestamp": time.time(),
+            },
+        )
+        await asyncio.sleep(interval)
+
+
+def _run_worker(worker_index: int):
+    """
+    Worker process entry point: one consumer and one event loop. Everything
+    stateful (log queue, SQLite connections, pools) is created here, never
+    reused from the supervisor.
+    """
+    os.environ["RECIPE_WORKER_INDEX"] = str(worker_index)
+    os.environ["READINESS_FILE"] = (
+        f"{os.environ.get('READINESS_FILE', '/tmp/recipe-service-ready')}.worker-{worker_index}"
+    )
+    # The supervisor forwards SIGTERM; reset inherited handlers for the worker loop.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    from log_config import configure_logging, shutdown_logging
+
+    # Before anything logs: the inherited handler feeds the supervisor's listener
+    configure_logging()
+
+    from workflow_consumer import main as workflow_consumer_main
+
+    try:
+        asyncio.run(workflow_consumer_main())
+    finally:
+        # Forked workers leave through os._exit, which skips atexit handlers
+        shutdown_logging()
+
+
+class SupervisorAdminServer:
+    """
+    The pod's admin port when workers are supervised, so probes and
+    scrapes cover every worker rather than the one that owns the port:
+
+    - /healthz: the supervisor loop is running
+    - /readyz: every worker is alive with a fresh ready heartbeat (503 otherwise)
+    - /metrics: each worker's /metrics with a worker label, plus pod series
+      (readiness, and the autoscaling signal combined across workers)
+    - /debug/workers: the aggregated heartbeats
+
+    Runs on a thread; the supervisor loop itself is synchronous.
+    """
+
+    def __init__(self, supervisor: "WorkerSupervisor", host: Optional[str] = None,
+                 port: Optional[int] = None):
+        self.supervisor = supervisor
+        self.host = host or os.environ.get("ADMIN_HOST", "0.0.0.0")
+        self.port = admin_port() if port is None else port
+        self.scrape_timeout = float(os.environ.get("WORKER_SCRAPE_TIMEOUT_SECONDS", 2))
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self):
+        admin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, content_type, body = admin.handle(self.path.split("?", 1)[0])
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="supervisor-admin", daemon=True).start()
+        logging.info("Supervisor admin server listening on %s:%s", self.host, self.port)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def handle(self, path: str):
+        if path == "/healthz":
+            alive = self.supervisor.loop_alive()
+            return (200 if alive else 503), "text/plain", b"ok\n" if alive else b"stalled\n"
+        if path == "/readyz":
+            ready = self.supervisor.health()["ready"] and not self.supervisor.stopping
+            return (200 if ready else 503), "text/plain", b"ready\n" if ready else b"not ready\n"
+        if path == "/metrics":
+            return 200, "text/plain; charset=utf-8", self.render_metrics().encode()
+        if path == "/debug/workers":
+            return 200, "application/json", json.dumps(self.supervisor.health()).encode()
+        return 404, "text/plain", b"not found\n"
+
+    def scrape_worker(self, worker_index: int) -> Optional[str]:
+        url = f"http://127.0.0.1:{worker_admin_port(worker_index)}/metrics"
+        try:
+            with urllib.request.urlopen(url, timeout=self.scrape_timeout) as response:
+                return response.read().decode()
+        except OSError as e:
+            logging.debug("Could not scrape worker %s: %s", worker_index, e)
+            return None
+
+    def render_metrics(self) -> str:
+        from admin_server import PrometheusText, pod_autoscale_metrics
+        from autoscaling import ReplicaAdvisor
+
+        health = self.supervisor.health()
+        texts = {}
+        for worker in health["workers"]:
+            text = self.scrape_worker(worker["index"]) if worker["alive"] else None
+            if text is not None:
+                texts[worker["index"]] = text
+
+        pod = PrometheusText()
+        pod.metric("recipe_pod_ready", "gauge", "1 when every worker in the pod is ready.",
+                   [({}, health["ready"] and not self.supervisor.stopping)])
+        pod.metric("recipe_worker_up", "gauge", "1 when the worker's metrics could be scraped.",
+                   [({"worker": worker["index"]}, worker["index"] in texts) for worker in health["workers"]])
+        pod.metric("recipe_worker_restarts", "gauge", "Consecutive restarts of each worker.",
+                   [({"worker": worker["index"]}, worker["restarts"]) for worker in health["workers"]])
+        signals = [worker["autoscale"] for worker in health["workers"] if worker["autoscale"]]
+        pod_autoscale_metrics(pod, ReplicaAdvisor(None, workers=self.supervisor.worker_count).combine(signals))
+        return "\n".join(merge_worker_metrics(texts) + pod.lines) + "\n"
+
+
+class WorkerSupervisor:
+    """
+    Forks N worker processes, each with its own consumer and event loop, so
+    a pod can use all of its CPUs despite the GIL-bound parsing work.
+
+    Crashed workers are restarted with exponential backoff. Pod readiness
+    (the READINESS_FILE marker and SupervisorAdminServer's /readyz) is the
+    aggregate of the workers' heartbeats.
+    Workers share checkpoints and caches through the file-backed LocalStore
+    in RECIPE_STATE_DIR. The supervisor only opens it briefly, under the lock
+    it forks under, so no worker inherits an open SQLite connection.
+    """
+
+    def __init__(self, worker_count: int):
+        self.worker_count = worker_count
+        self.heartbeat_timeout = float(os.environ.get("WORKER_HEARTBEAT_TIMEOUT_SECONDS", 20))
+        self.shutdown_grace_seconds = float(os.environ.get("SHUTDOWN_GRACE_SECONDS", 25))
+        self.max_restart_backoff = float(os.environ.get("WORKER_MAX_RESTART_BACKOFF_SECONDS", 30))
+        self.readiness_file = os.environ.get("READINESS_FILE", "/tmp/recipe-service-ready")
+        self._context = multiprocessing.get_context("fork")
+        self._workers: Dict[int, multiprocessing.Process] = {}
+        self._restart_counts: Dict[int, int] = {}
+        self._next_start: Dict[int, float] = {}
+        self._started_at: Dict[int, float] = {}
+        self._stopping = False
+        self._last_tick = time.monotonic()
+        # Held while forking and while the supervisor has the shared store open
+        self._fork_lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _store(self):
+        with self._fork_lock:
+            store = LocalStore()
+            try:
+                yield store
+            finally:
+                store.close()
+
+    def _start_worker(self, index: int):
+        process = self._context.Process(
+            target=_run_worker, args=(index,), name=f"recipe-worker-{index}", daemon=False
+        )
+        with self._fork_lock:
+            process.start()
+        self._workers[index] = process
+        self._started_at[index] = time.time()
+        logging.info("Started worker %s (pid=%s)", index, process.pid)
+
+    def _check_workers(self):
+        now = time.time()
+        for index in range(self.worker_count):
+            process = self._workers.get(index)
+            if process is not None and process.is_alive():
+                # A worker that stayed up for a minute is considered healthy again
+                if now - self._started_at[index] > 60:
+                    self._restart_counts[index] = 0
+                continue
+
+            if process is not None:
+                process.join(timeout=0)
+                restarts = self._restart_counts.get(index, 0)
+                backoff = min(self.max_restart_backoff, 2**restarts)
+                self._restart_counts[index] = restarts + 1
+                self._next_start[index] = now + backoff
+                self._workers.pop(index)
+                with self._store() as store:
+                    store.delete(HEARTBEAT_NAMESPACE, str(index))
+                logging.error(
+                    "Worker %s exited with code %s, restarting in %ss", index, process.exitcode, backoff
+                )
+
+            if now >= self._next_start.get(index, 0):
+                self._start_worker(index)
+
+    def health(self) -> Dict:
+        """Aggregated pod health from worker heartbeats."""
+        now = time.time()
+        with self._store() as store:
+            heartbeats = dict(store.items(HEARTBEAT_NAMESPACE))
+        workers: List[Dict] = []
+        for index in range(self.worker_count):
+            process = self._workers.get(index)
+            heartbeat = heartbeats.get(str(index)) or {}
+            fresh = now - heartbeat.get("timestamp", 0) < self.heartbeat_timeout
+            workers.append(
+                {
+                    "index": index,
+                    "pid": process.pid if process else None,
+                    "alive": bool(process and process.is_alive()),
+                    "ready": bool(fresh and heartbeat.get("ready")),
+                    "in_flight": heartbeat.get("in_flight", 0),
+                    "autoscale": heartbeat.get("autoscale") if fresh else None,
+                    "restarts": self._restart_counts.get(index, 0),
+                }
+            )
+        return {
+            "ready": all(worker["alive"] and worker["ready"] for worker in workers),
+            "in_flight": sum(worker["in_flight"] for worker in workers),
+            "workers": workers,
+        }
+
+    @property
+    def stopping(self) -> bool:
+        return self._stopping
+
+    def loop_alive(self, timeout: float = 30.0) -> bool:
+        return time.monotonic() - self._last_tick < timeout
+
+    def _update_readiness(self):
+        if self.health()["ready"] and not self._stopping:
+            if not os.path.exists(self.readiness_file):
+                with open(self.readiness_file, "w") as f:
+                    f.write(str(os.getpid()))
+                logging.info("All %s workers ready", self.worker_count)
+        elif os.path.exists(self.readiness_file):
+            os.remove(self.readiness_file)
+
+    def _request_stop(self, signum, frame):
+        logging.info("Supervisor received signal %s, stopping workers...", signum)
+        self._stopping = True
+
+    def _stop_workers(self):
+        for process in self._workers.values():
+            if process.is_alive():
+                process.terminate()  # SIGTERM: workers drain in-flight workflows
+        deadline = time.time() + self.shutdown_grace_seconds + 5
+        for process in self._workers.values():
+            process.join(timeout=max(0.0, deadline - time.time()))
+            if process.is_alive():
+                logging.warning("Worker pid=%s did not exit in time, killing", process.pid)
+                process.kill()
+                process.join()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        logging.info("Supervisor starting %s workers", self.worker_count)
+        admin = None
+        if os.environ.get("ADMIN_SERVER_ENABLED", "true").lower() == "true":
+            admin = SupervisorAdminServer(self)
+            try:
+                admin.start()
+            except OSError as e:
+                logging.warning("Supervisor admin server disabled, could not listen: %s", e)
+                admin = None
+
+        while not self._stopping:
+            self._check_workers()
+            self._update_readiness()
+            self._last_tick = time.monotonic()
+            time.sleep(1.0)
+
+        self._update_readiness()
+        self._stop_workers()
+        if admin is not None:
+            admin.stop()
+        logging.info("All workers stopped")
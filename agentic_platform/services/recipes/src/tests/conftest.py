@@ -0,0 +1,30 @@
+import sys
+
+import pytest
+
+# Process-wide stores opened lazily under RECIPE_STATE_DIR
+CACHED_GETTERS = [
+    ("recipe_index", "get_recipe_index"),
+    ("search_agent", "get_search_cache"),
+    ("domain_stats", "get_domain_stats"),
+    ("ingredient_index", "get_ingredient_index"),
+    ("query_normalizer", "get_similar_query_index"),
+]
+
+
+def _clear_cached_getters():
+    # Modules are imported both as src.<name> (tests) and <name> (service code)
+    for module_name, getter in CACHED_GETTERS:
+        for name in (module_name, f"src.{module_name}"):
+            module = sys.modules.get(name)
+            if module is not None and hasattr(module, getter):
+                getattr(module, getter).cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_state_dir(tmp_path, monkeypatch):
+    """Keeps every test's stores out of the real /tmp/recipe-state."""
+    monkeypatch.setenv("RECIPE_STATE_DIR", str(tmp_path / "state"))
+    _clear_cached_getters()
+    yield
+    _clear_cached_getters()
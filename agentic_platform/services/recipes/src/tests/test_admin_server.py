@@ -0,0 +1,79 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.admin_server import AdminServer
+from src.autoscaling import ProcessingStats
+from src.consumer import ConsumerLane
+from src.profiling import LoopLagMonitor
+
+
+class FakeConsumer:
+    def __init__(self):
+        self.connection = SimpleNamespace(is_closed=False)
+        self.in_flight_count = 1
+        self.in_flight_by_lane = {"interactive": 1, "batch": 0}
+        self.lanes = [ConsumerLane("interactive", "workflow_commands", max_concurrency=8)]
+        self.processing = ProcessingStats()
+        self.coalescer = SimpleNamespace(stats=Counter(leader=3, attached=1))
+        started = (datetime.now() - timedelta(seconds=30)).isoformat()
+        self.orchestrator = SimpleNamespace(
+            workflow_instances={
+                "wf-1": {
+                    "workflow_type": "recipe_workflow_full",
+                    "status": "recipe_scraping_in_progress",
+                    "current_step": "recipe_scraping",
+                    "start_timestamp": started,
+                    "payload": {"search_query": "chicken curry"},
+                },
+                "wf-2": {"status": "completed", "current_step": "completed", "start_timestamp": started},
+            }
+        )
+        self.depth_reads = 0
+
+    async def queue_depths(self):
+        self.depth_reads += 1
+        return {"workflow_commands": 7}
+
+
+def test_admin_endpoints():
+    consumer = FakeConsumer()
+    monitor = LoopLagMonitor()
+    monitor.last_lag, monitor.max_lag, monitor.blocked_count = 0.002, 0.3, 2
+    admin = AdminServer(consumer, loop_lag_monitor=monitor, port=0)
+
+    async def scenario():
+        client = TestClient(TestServer(admin.build_app()))
+        await client.start_server()
+        try:
+            assert (await client.get("/healthz")).status == 200
+            with patch("src.admin_server.is_ready", return_value=False):
+                assert (await client.get("/readyz")).status == 503
+            with patch("src.admin_server.is_ready", return_value=True):
+                assert (await client.get("/readyz")).status == 200
+
+            workflows = await (await client.get("/debug/workflows")).json()
+            loop = await (await client.get("/debug/loop")).json()
+            first = await (await client.get("/metrics")).text()
+            await client.get("/metrics")
+            return workflows, loop, first
+        finally:
+            await client.close()
+
+    workflows, loop, metrics = asyncio.run(scenario())
+
+    assert workflows["in_flight"] == 1
+    assert workflows["workflows"][0]["workflow_id"] == "wf-1"
+    assert workflows["workflows"][0]["current_step"] == "recipe_scraping"
+    assert 29 < workflows["workflows"][0]["age_seconds"] < 60
+    assert loop["max_lag_seconds"] == 0.3 and loop["tasks"] >= 1
+    assert 'recipe_queue_messages{queue="workflow_commands"} 7' in metrics
+    assert 'recipe_workflows{status="completed"} 1' in metrics
+    assert 'recipe_coalesced_total{role="leader"} 3' in metrics
+    assert "recipe_event_loop_blocked_total 2" in metrics
+    # Queue depth is cached between scrapes
+    assert consumer.depth_reads == 1
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+from src.autoscaling import ProcessingStats, ReplicaAdvisor
+from src.consumer import ConsumerLane
+
+
+def make_consumer(service_times, in_flight=0):
+    processing = ProcessingStats(alpha=0.5, window=60)
+    for i, duration in enumerate(service_times):
+        processing.record(duration, now=1000.0 + i)
+    return SimpleNamespace(
+        lanes=[
+            ConsumerLane("interactive", "workflow_messages", max_concurrency=8),
+            ConsumerLane("batch", "workflow_messages.batch", max_concurrency=2),
+        ],
+        processing=processing,
+        in_flight_count=in_flight,
+    )
+
+
+def test_processing_stats_smooth_service_time_and_window_rate():
+    stats = ProcessingStats(alpha=0.5, window=10)
+    stats.record(10.0, now=0.0)
+    stats.record(20.0, now=5.0)
+    stats.record(30.0, now=12.0)
+
+    assert stats.service_time == 22.5
+    assert stats.rate(now=12.0) == 0.2  # two completions within the last 10s
+
+
+def test_desired_replicas_track_backlog_drain_time():
+    # 10 slots, 20s per message -> 0.5 messages/s per worker
+    consumer = make_consumer([20.0, 20.0], in_flight=5)
+    advisor = ReplicaAdvisor(consumer, workers=2, target_drain_seconds=60, min_replicas=1, max_replicas=20)
+
+    # One replica (2 workers) drains 60 messages per minute
+    assert advisor.compute({"workflow_messages": 0})["desired_replicas"] == 1
+    signal = advisor.compute({"workflow_messages": 500, "workflow_messages.batch": 100, "metrics_queue": 9999})
+    assert signal["backlog"] == 600
+    assert signal["capacity_per_second"] == 1.0
+    assert signal["drain_seconds"] == 600
+    assert signal["desired_replicas"] == 10
+    assert signal["utilization"] == 0.5
+    assert advisor.compute({"workflow_messages": 10**6})["desired_replicas"] == 20
+
+
+def test_pod_signal_adds_up_every_workers_slots_and_capacity():
+    advisor = ReplicaAdvisor(None, workers=2, target_drain_seconds=60, min_replicas=1, max_replicas=20)
+    workers = [
+        ReplicaAdvisor(make_consumer([20.0], in_flight=10), workers=1).compute({"workflow_messages": 600}),
+        ReplicaAdvisor(make_consumer([20.0], in_flight=0), workers=1).compute({"workflow_messages": 600}),
+    ]
+
+    pod = advisor.combine(workers)
+
+    assert pod["backlog"] == 600 and pod["worker_slots"] == 20
+    assert pod["utilization"] == 0.5  # worker 0 alone would report 1.0
+    assert pod["capacity_per_second"] == 1.0
+    assert pod["desired_replicas"] == 10
+
+
+def test_slow_service_time_scales_out_without_cpu():
+    fast = ReplicaAdvisor(make_consumer([2.0]), workers=1, target_drain_seconds=60)
+    slow = ReplicaAdvisor(make_consumer([40.0]), workers=1, target_drain_seconds=60, max_replicas=50)
+    depths = {"workflow_messages": 300}
+
+    assert fast.compute(depths)["desired_replicas"] == 1
+    assert slow.compute(depths)["desired_replicas"] == 20
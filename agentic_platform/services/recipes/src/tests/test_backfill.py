@@ -0,0 +1,102 @@
+import asyncio
+from unittest.mock import MagicMock
+
+from src.backfill import BackfillCheckpoint, BackfillJob
+
+
+class FakeScraperStep:
+    def __init__(self):
+        self.scraped = []
+        self.confirmed = []
+        self.released = []
+
+    def confirm_near_duplicate(self, url):
+        self.confirmed.append(url)
+
+    def release_near_duplicate(self, url):
+        self.released.append(url)
+
+    async def scrape_recipe(self, url, session=None):
+        self.scraped.append(url)
+        if "broken" in url:
+            return None, []
+        recipe = MagicMock()
+        recipe.model_dump.return_value = {"source_url": url}
+        return recipe, []
+
+
+def fake_search(search_query, excluded_domains, num_urls):
+    slug = search_query.replace(" ", "-")
+    return [f"https://example.com/{slug}/1", f"https://example.com/{slug}/2"], None
+
+
+def run_job(checkpoint_path, inputs, api_client=None):
+    checkpoint = BackfillCheckpoint(checkpoint_path)
+    scraper_step = FakeScraperStep()
+    api_client = api_client or MagicMock()
+    job = BackfillJob(
+        checkpoint,
+        scraper_step=scraper_step,
+        api_client=api_client,
+        search=fake_search,
+        report_interval=60,
+    )
+    try:
+        progress = asyncio.run(job.run(inputs))
+    finally:
+        checkpoint.close()
+    return progress, scraper_step, api_client
+
+
+def test_backfill_pipeline_saves_recipes(tmp_path):
+    inputs = ["banana bread", "https://example.com/direct", "https://example.com/broken"]
+
+    progress, scraper_step, api_client = run_job(str(tmp_path / "progress.jsonl"), inputs)
+
+    assert progress.queries_searched == 1
+    assert progress.urls_scraped == 4
+    assert progress.saves == 3
+    assert progress.scrape_failures == 1
+    saved = [call.args[0] for call in api_client.create_recipe.call_args_list]
+    assert {"source_url": "https://example.com/direct"} in saved
+    assert {
+        "source_url": "https://example.com/banana-bread/1",
+        "created_from_query": "banana bread",
+    } in saved
+
+
+def test_backfill_resumes_from_checkpoint(tmp_path):
+    checkpoint_path = str(tmp_path / "progress.jsonl")
+    run_job(checkpoint_path, ["banana bread"])
+
+    progress, scraper_step, api_client = run_job(
+        checkpoint_path, ["banana bread", "chickpea curry"]
+    )
+
+    assert sorted(scraper_step.scraped) == [
+        "https://example.com/chickpea-curry/1",
+        "https://example.com/chickpea-curry/2",
+    ]
+    assert progress.skipped == 2
+    assert api_client.create_recipe.call_count == 2
+
+
+def test_backfill_confirms_saved_fingerprints_and_releases_failed_ones(tmp_path):
+    def create_recipe(recipe_dict):
+        if "failing" in recipe_dict["source_url"]:
+            raise RuntimeError("api down")
+        return {}
+
+    api_client = MagicMock()
+    api_client.create_recipe.side_effect = create_recipe
+
+    progress, scraper_step, _ = run_job(
+        str(tmp_path / "progress.jsonl"),
+        ["https://example.com/saved", "https://example.com/failing"],
+        api_client=api_client,
+    )
+
+    assert progress.saves == 1 and progress.save_failures == 1
+    # Unconfirmed fingerprints never match, so backfilled recipes must be confirmed
+    assert scraper_step.confirmed == ["https://example.com/saved"]
+    assert scraper_step.released == ["https://example.com/failing"]
@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+from src.checkpoints import WorkflowCheckpointStore, workflow_checkpoint_key
+from src.event_models import MetricsEvent
+from src.local_store import LocalStore
+from src.models import Recipe, RecipeIngredient
+
+
+def make_recipe(url: str) -> Recipe:
+    return Recipe(
+        title="Chickpea Curry",
+        instructions="1. Simmer.",
+        prep_time=10,
+        cook_time=20,
+        total_time=30,
+        servings=4,
+        source_url=url,
+        ingredients=[RecipeIngredient(name="chickpeas", quantity=400.0, unit="g")],
+    )
+
+
+def make_metrics(url: str) -> list:
+    return [
+        MetricsEvent(
+            event_type="recipe_scrape.success",
+            timestamp=datetime.utcnow(),
+            metadata={"url": url},
+        )
+    ]
+
+
+def test_checkpoint_key_is_stable_for_same_payload():
+    payload = {"search_query": "curry", "number_of_urls": 3}
+    assert workflow_checkpoint_key("recipe_workflow_full", payload) == workflow_checkpoint_key(
+        "recipe_workflow_full", dict(reversed(list(payload.items())))
+    )
+    assert workflow_checkpoint_key("recipe_workflow_full", payload, "abc") == "abc"
+
+
+def test_checkpoint_round_trip(tmp_path):
+    store = WorkflowCheckpointStore(LocalStore(str(tmp_path / "state.db")))
+    url = "https://example.com/curry"
+    store.save(
+        "wf-1",
+        {
+            "recipe_search_results": [url, "https://example.com/failed"],
+            "scraped_by_url": {
+                url: (make_recipe(url), make_metrics(url)),
+                "https://example.com/failed": (None, make_metrics("https://example.com/failed")),
+            },
+            "saved_urls": {url},
+        },
+    )
+
+    restored = store.load("wf-1")
+    assert restored["recipe_search_results"] == [url, "https://example.com/failed"]
+    recipe, metrics = restored["scraped_by_url"][url]
+    assert recipe.model_dump_json() == make_recipe(url).model_dump_json()
+    assert metrics[0].metadata == {"url": url}
+    assert restored["scraped_by_url"]["https://example.com/failed"][0] is None
+    assert restored["saved_urls"] == {url}
+
+    store.delete("wf-1")
+    assert store.load("wf-1") is None
+
+
+def test_interrupted_workflow_resumes_without_search_or_rescrape(tmp_path, monkeypatch):
+    monkeypatch.setenv("RECIPE_STATE_DIR", str(tmp_path))
+    from src import workflow_orchestrator
+
+    orchestrator = workflow_orchestrator.WorkflowOrchestrator()
+    orchestrator.checkpoints = WorkflowCheckpointStore(LocalStore(str(tmp_path / "state.db")))
+    orchestrator._publish_metrics = AsyncMock()
+    orchestrator.save_recipes = AsyncMock()
+
+    done_url, pending_url = "https://example.com/done", "https://example.com/pending"
+    payload = {"search_query": "curry", "number_of_urls": 2}
+    key = workflow_checkpoint_key("recipe_workflow_full", payload)
+    orchestrator.checkpoints.save(
+        key,
+        {
+            "recipe_search_results": [done_url, pending_url],
+            "scraped_by_url": {done_url: (make_recipe(done_url), make_metrics(done_url))},
+        },
+    )
+
+    scraped_urls = []
+
+    async def fake_scrape(urls, on_result=None):
+        for url in urls:
+            scraped_urls.append(url)
+            on_result(url, (make_recipe(url), make_metrics(url)))
+
+    orchestrator.scraperStep.scrape_recipes = fake_scrape
+    with patch.object(workflow_orchestrator, "search_recipes") as mock_search:
+        asyncio.run(orchestrator.initiate_workflow("recipe_workflow_full", payload))
+
+    mock_search.assert_not_called()
+    assert scraped_urls == [pending_url]
+    saved = orchestrator.save_recipes.call_args.kwargs["scraped_recipes"]
+    assert {recipe.source_url for recipe, _ in saved} == {done_url, pending_url}
+    assert orchestrator.checkpoints.load(key) is None
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from src.coalescing import WorkflowCoalescer, workflow_coalescing_key
+from src.local_store import LocalStore
+
+
+def test_coalescing_key_normalizes_query_and_domains():
+    first = workflow_coalescing_key(
+        "recipe_workflow_full",
+        {"search_query": "  Chicken   Curry", "excluded_domains": ["B.com", "a.com"], "number_of_urls": 5},
+    )
+    second = workflow_coalescing_key(
+        "recipe_workflow_full",
+        {"search_query": "chicken curry", "excluded_domains": ["a.com", "b.com"], "number_of_urls": 5},
+    )
+    assert first == second
+    assert first != workflow_coalescing_key(
+        "recipe_workflow_full", {"search_query": "chicken curry", "number_of_urls": 3}
+    )
+
+
+def test_duplicates_attach_to_in_flight_run_and_repeats_hit_window(tmp_path):
+    coalescer = WorkflowCoalescer(LocalStore(str(tmp_path / "state.db")))
+    executions = 0
+
+    async def execute():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.05)
+        return {"workflow_id": "wf-1", "status": "completed"}
+
+    async def scenario():
+        concurrent = await asyncio.gather(*(coalescer.run("key", execute) for _ in range(5)))
+        repeat = await coalescer.run("key", execute)
+        return concurrent, repeat
+
+    concurrent, repeat = asyncio.run(scenario())
+
+    assert executions == 1
+    assert sorted(role for _, role in concurrent) == ["attached"] * 4 + ["leader"]
+    assert all(result["workflow_id"] == "wf-1" for result, _ in concurrent)
+    assert repeat[1] == "cached"
+    assert dict(coalescer.stats) == {"leader": 1, "attached": 4, "cached": 1}
+
+
+def test_failures_propagate_to_attached_and_are_not_cached(tmp_path):
+    coalescer = WorkflowCoalescer(LocalStore(str(tmp_path / "state.db")))
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("search down")
+
+    async def scenario():
+        return await asyncio.gather(
+            coalescer.run("key", failing), coalescer.run("key", failing), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(coalescer.run("key", failing))
+    assert coalescer.stats["leader"] == 2
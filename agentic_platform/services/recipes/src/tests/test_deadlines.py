@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.checkpoints import WorkflowCheckpointStore, workflow_checkpoint_key
+from src.deadlines import DeadlineExceeded, WorkflowDeadline
+from src.local_store import LocalStore
+from src.tests.test_checkpoints import make_metrics, make_recipe
+
+
+def test_step_budget_gives_unused_time_to_later_steps():
+    deadline = WorkflowDeadline(100)
+    assert deadline.step_budget("search") == pytest.approx(15, abs=0.1)
+    assert deadline.step_budget("save") == pytest.approx(100, abs=0.1)
+
+    async def slow_step():
+        async with deadline.step("search"):
+            await asyncio.sleep(60)
+
+    deadline = WorkflowDeadline(0.2)
+    with pytest.raises(DeadlineExceeded) as error:
+        asyncio.run(slow_step())
+    assert error.value.step == "search"
+
+
+def test_stuck_steps_are_cancelled_within_the_deadline(tmp_path, monkeypatch):
+    monkeypatch.setenv("RECIPE_STATE_DIR", str(tmp_path))
+    from src import workflow_orchestrator
+
+    orchestrator = workflow_orchestrator.WorkflowOrchestrator()
+    orchestrator.checkpoints = WorkflowCheckpointStore(LocalStore(str(tmp_path / "state.db")))
+    orchestrator._publish_metrics = AsyncMock()
+
+    fast_url, stuck_url = "https://example.com/fast", "https://example.com/stuck"
+
+    async def fake_scrape(urls, on_result=None):
+        on_result(fast_url, (make_recipe(fast_url), make_metrics(fast_url)))
+        await asyncio.sleep(60)
+
+    async def stuck_save(**kwargs):
+        await asyncio.sleep(60)
+
+    orchestrator.scraperStep.scrape_recipes = fake_scrape
+    orchestrator.save_recipes = stuck_save
+    payload = {"search_query": "curry", "number_of_urls": 2}
+    with patch.object(
+        orchestrator, "_search_ranked_urls", return_value=([fast_url, stuck_url], make_metrics(fast_url)[0])
+    ):
+        workflow_id = asyncio.run(
+            asyncio.wait_for(
+                orchestrator.initiate_workflow("recipe_workflow_full", payload, deadline_seconds=0.5),
+                timeout=5,
+            )
+        )
+
+    instance = orchestrator.workflow_instances[workflow_id]
+    assert instance["status"] == "deadline_exceeded"
+    assert instance["deadline_exceeded_step"] == "save"
+    exceeded_steps = [
+        call.args[1]["step"]
+        for call in orchestrator._publish_metrics.await_args_list
+        if call.args[0] == "workflow.deadline_exceeded" and call.args[1]
+    ]
+    assert exceeded_steps == ["scrape", "save"]
+    checkpoint = orchestrator.checkpoints.load(workflow_checkpoint_key("recipe_workflow_full", payload))
+    assert list(checkpoint["scraped_by_url"]) == [fast_url]
+
+
+def test_api_requests_are_bounded_by_the_remaining_deadline(tmp_path, monkeypatch):
+    monkeypatch.setenv("RECIPE_STATE_DIR", str(tmp_path))
+    from src import workflow_orchestrator
+
+    orchestrator = workflow_orchestrator.WorkflowOrchestrator()
+    orchestrator._publish_metrics = AsyncMock()
+    orchestrator._index_saved_recipe = lambda *args: None
+    url = "https://example.com/curry"
+    canonicalized_on = []
+
+    def canonicalize(recipe):
+        # Refreshing the lexicon is a blocking API call
+        canonicalized_on.append(threading.current_thread())
+
+    with patch("src.workflow_orchestrator.PantryChefAPIClient") as client_class, \
+            patch("src.workflow_orchestrator.canonicalize_ingredients", canonicalize):
+        client_class.return_value.create_recipe.return_value = {"id": 1}
+        asyncio.run(
+            orchestrator.save_recipes(
+                [(make_recipe(url), make_metrics(url))], "wf-1", "curry", deadline=WorkflowDeadline(20)
+            )
+        )
+
+    # Cancelling the awaiting task cannot stop a request already in its thread
+    recipe_dict, timeout = client_class.return_value.create_recipe.call_args.args
+    assert recipe_dict["source_url"] == url
+    assert 19 < timeout <= 20
+    assert canonicalized_on and canonicalized_on[0] is not threading.main_thread()
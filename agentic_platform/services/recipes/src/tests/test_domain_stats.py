@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from src.domain_stats import DomainStatsStore
+from src.event_models import MetricsEvent
+
+
+def event(event_type: str, url: str, duration: float, **metadata) -> MetricsEvent:
+    return MetricsEvent(
+        event_type=event_type,
+        duration=duration,
+        timestamp=datetime.utcnow(),
+        metadata={"url": url, **metadata},
+    )
+
+
+def test_failing_domains_are_excluded_and_ranked_last(tmp_path):
+    store = DomainStatsStore(path=str(tmp_path / "domains.db"), min_samples=3)
+    for i in range(4):
+        store.record_events(
+            [
+                event("recipe_scrape.success", f"https://www.fast.example/{i}", 0.5),
+                event("recipe_scrape.success", f"https://slow.example/{i}", 8.0),
+                event(
+                    "recipe_scrape.failure",
+                    f"https://broken.example/{i}",
+                    12.0,
+                    failed_stage="fetch",
+                    error_type="TimeoutError",
+                ),
+            ]
+        )
+
+    stats = store.stats(["fast.example", "broken.example"])
+    assert stats["fast.example"]["success_rate"] == 1.0
+    assert stats["fast.example"]["median_latency"] == 0.5
+    assert stats["broken.example"]["failures"] == {"fetch": 4}
+    assert store.excluded_domains() == ["broken.example"]
+
+    ranked = store.rank_urls(
+        [
+            "https://broken.example/new",
+            "https://slow.example/new",
+            "https://unseen.example/new",
+            "https://fast.example/new",
+        ]
+    )
+    assert ranked[0] == "https://fast.example/new"
+    assert ranked[-1] == "https://broken.example/new"
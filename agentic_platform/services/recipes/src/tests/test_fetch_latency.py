@@ -0,0 +1,80 @@
+import asyncio
+
+from src.fetch_latency import FetchLatencyTracker
+from src.recipe_scraper_step import RecipeScraperWorkflowStep
+
+
+def make_step() -> RecipeScraperWorkflowStep:
+    step = RecipeScraperWorkflowStep(model=object(), domain_stats=object())
+    step.fetch_latencies = FetchLatencyTracker(
+        min_samples=5, default_delay=0.05, min_delay=0.01, max_delay=1.0
+    )
+    step.fetch_timeout = 1.0
+    return step
+
+
+def test_hedge_delay_follows_domain_p95():
+    tracker = FetchLatencyTracker(min_samples=5, default_delay=3.0, min_delay=0.1, max_delay=8.0)
+    assert tracker.hedge_delay("slow.example") == 3.0
+    for _ in range(19):
+        tracker.record("slow.example", 0.5)
+    tracker.record("slow.example", 20.0)
+
+    assert 0.5 <= tracker.hedge_delay("slow.example") < 0.7
+    for _ in range(20):
+        tracker.record("slow.example", 20.0)
+    assert tracker.hedge_delay("slow.example") == 8.0
+
+
+def test_slow_fetch_is_hedged_and_stragglers_cancelled():
+    step = make_step()
+    calls = []
+
+    async def get_text(url, session, headers):
+        calls.append(url)
+        # The first request stalls; the hedged duplicate answers quickly
+        await asyncio.sleep(10 if len(calls) == 1 else 0.01)
+        return "<html>"
+
+    step._get_text = get_text
+    html = asyncio.run(step._hedged_fetch("https://stall.example/r", object(), {}))
+
+    assert html == "<html>"
+    assert len(calls) == 2
+    assert step.fetch_latencies.snapshot()["stall.example"]["samples"] == 1
+
+
+def test_fetch_deadline_raises_timeout():
+    step = make_step()
+    step.fetch_timeout = 0.1
+
+    async def get_text(url, session, headers):
+        await asyncio.sleep(10)
+
+    step._get_text = get_text
+    try:
+        asyncio.run(step._hedged_fetch("https://down.example/r", object(), {}))
+    except asyncio.TimeoutError:
+        pass
+    else:
+        raise AssertionError("expected a timeout")
+
+
+def test_scrape_quorum_cancels_stragglers():
+    step = make_step()
+    step.scrape_quorum = 0.5
+    step.straggler_grace = 0.05
+    finished = []
+
+    async def scrape_recipe(url, session=None):
+        await asyncio.sleep(10 if "slow" in url else 0.01)
+        return object(), []
+
+    step.scrape_recipe = scrape_recipe
+    urls = ["https://a.example/1", "https://b.example/2", "https://slow.example/3"]
+    results = asyncio.run(
+        step.scrape_recipes(urls, on_result=lambda url, result: finished.append(url))
+    )
+
+    assert len(results) == 2
+    assert sorted(finished) == urls[:2]
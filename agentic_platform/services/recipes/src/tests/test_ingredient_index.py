@@ -0,0 +1,58 @@
+from unittest.mock import MagicMock
+
+from src.ingredient_index import IngredientIndex, canonicalize_ingredients, ingredient_tokens
+from src.models import Recipe, RecipeIngredient
+
+
+def make_index(tmp_path, names):
+    api_client = MagicMock()
+    api_client.list_ingredients.return_value = [{"name": name} for name in names]
+    index = IngredientIndex(path=str(tmp_path / "lexicon.txt"), api_client=api_client)
+    index.refresh(force=True)
+    return index
+
+
+def test_ingredient_tokens_normalizes_variants():
+    assert ingredient_tokens("Chicken Thighs, boneless") == ["boneless", "chicken", "thigh"]
+    assert ingredient_tokens("finely chopped tomatoes") == ["tomato"]
+
+
+def test_lookup_exact_and_fuzzy(tmp_path):
+    index = make_index(
+        tmp_path, ["boneless chicken thigh fillets", "chicken breast", "brown sugar", "sugar"]
+    )
+
+    assert index.lookup("Chicken breasts") == "chicken breast"
+    assert index.lookup("chicken thighs, boneless") == "boneless chicken thigh fillets"
+    assert index.lookup("brown sugar") == "brown sugar"
+    assert index.lookup("smoked paprika") is None
+
+
+def test_canonicalize_adds_unknown_names_and_reloads(tmp_path):
+    index = make_index(tmp_path, ["sugar"])
+
+    assert index.canonicalize("  smoked   paprika ") == "smoked paprika"
+    assert index.canonicalize("smoked paprikas") == "smoked paprika"
+
+    # A second index over the same lexicon (another worker) sees appended names
+    other = IngredientIndex(path=index.path)
+    assert len(other) == 2
+    assert other.lookup("Smoked Paprika") == "smoked paprika"
+
+
+def test_canonicalize_recipe_ingredients(tmp_path):
+    index = make_index(tmp_path, ["boneless chicken thigh fillets"])
+    recipe = Recipe(
+        title="Tandoori chicken",
+        instructions="1. Cook",
+        prep_time=10,
+        cook_time=20,
+        total_time=30,
+        servings=4,
+        source_url="https://example.com/tandoori",
+        ingredients=[RecipeIngredient(name="chicken thighs, boneless", quantity=450, unit="g")],
+    )
+
+    canonicalize_ingredients(recipe, index)
+
+    assert recipe.ingredients[0].name == "boneless chicken thigh fillets"
@@ -0,0 +1,51 @@
+import pytest
+
+from src.ingredient_units import canonical_unit, normalize_ingredients, parse_ingredient_line
+
+
+@pytest.mark.parametrize(
+    "unit, expected",
+    [("g", "g"), ("grams", "g"), ("Tbs.", "tbsp"), ("tablespoons", "tbsp"), ("cups", "cup"), ("inches", None),
+     ("T", "tbsp"), ("t", "tsp")],
+)
+def test_canonical_unit(unit, expected):
+    assert canonical_unit(unit) == expected
+
+
+def test_parse_ingredient_line_fractions_and_ranges():
+    assert parse_ingredient_line("1 1/2 Tbs. olive oil") == (1.5, "tbsp", "olive oil")
+    assert parse_ingredient_line("½ cup milk") == (0.5, "cup", "milk")
+    assert parse_ingredient_line("2-3 cloves garlic") == (2.5, None, "cloves garlic")
+    assert parse_ingredient_line("salt") == (None, None, "salt")
+    assert parse_ingredient_line("1 T olive oil") == (1.0, "tbsp", "olive oil")
+    assert parse_ingredient_line("2 t. salt") == (2.0, "tsp", "salt")
+
+
+def test_parse_ingredient_line_thousands_and_decimal_commas():
+    assert parse_ingredient_line("1,000 g flour") == (1000.0, "g", "flour")
+    assert parse_ingredient_line("1,250.5 ml water") == (1250.5, "ml", "water")
+    assert parse_ingredient_line("1,5 kg potatoes") == (1.5, "kg", "potatoes")
+
+
+def test_normalize_ingredients_converts_to_metric():
+    ingredients = [
+        {"name": "chicken thighs", "quantity": 1, "unit": "pounds", "notes": None},
+        {"name": "2 cups stock", "quantity": None, "unit": None},
+        {"name": "olive oil", "quantity": "1 1/2", "unit": "Tbs."},
+        {"name": "garlic", "quantity": "2-3", "unit": "cloves", "notes": "minced"},
+        {"name": "salt", "quantity": None, "unit": None, "notes": "to taste"},
+        {"name": "egg", "quantity": 1.0, "unit": None},
+    ]
+
+    normalized = normalize_ingredients(ingredients, to_metric=True)
+
+    assert [(i["name"], i["quantity"], i["unit"]) for i in normalized] == [
+        ("chicken thighs", 453.59, "g"),
+        ("stock", 473.18, "ml"),
+        ("olive oil", 1.5, "tbsp"),
+        ("garlic", 2.5, "piece"),
+        ("salt", None, "to_taste"),
+        ("egg", 1.0, None),
+    ]
+    assert normalized[0]["notes"] == "1 lb"
+    assert normalized[3]["notes"] == "cloves, minced"
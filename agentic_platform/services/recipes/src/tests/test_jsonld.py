@@ -0,0 +1,59 @@
+import json
+
+from src.jsonld import JsonLdScanner, extract_recipe
+
+RECIPE = {
+    "@context": "https://schema.org",
+    "@graph": [
+        {"@type": "WebPage", "name": "Curry | Example"},
+        {
+            "@type": ["Recipe", "NewsArticle"],
+            "name": "Chickpea Curry",
+            "author": [{"@type": "Person", "name": "Sam"}],
+            "recipeIngredient": ["1 can chickpeas", "1 onion, diced"],
+            "recipeInstructions": [
+                {
+                    "@type": "HowToSection",
+                    "itemListElement": [
+                        {"@type": "HowToStep", "text": "Fry the onion."},
+                        {"@type": "HowToStep", "text": "Add the chickpeas."},
+                    ],
+                }
+            ],
+            "totalTime": "PT1H5M",
+            "recipeYield": ["4", "4 servings"],
+        },
+    ],
+}
+
+PAGE = (
+    '<html lang="en"><head><script>var x = 1;</script>'
+    f'<script type="application/ld+json">{json.dumps(RECIPE)}</script></head>'
+    "<body>" + "<p>Advertisement</p>" * 1000 + "</body></html>"
+).encode()
+
+
+def test_scanner_stops_after_the_recipe_block_across_chunk_splits():
+    scanner = JsonLdScanner()
+    end_of_block = PAGE.index(b"</script></head>") + len(b"</script>")
+    for start in range(0, len(PAGE), 7):
+        if scanner.feed(PAGE[start : start + 7]):
+            break
+    assert end_of_block <= len(scanner.buffer) < end_of_block + 7
+
+
+def test_extract_recipe_from_graph():
+    recipe = extract_recipe(PAGE.decode(), "https://www.example.com/curry")
+
+    assert recipe["title"] == "Chickpea Curry"
+    assert recipe["author"] == "Sam"
+    assert recipe["ingredients"] == ["1 can chickpeas", "1 onion, diced"]
+    assert recipe["instructions"] == "Fry the onion.\nAdd the chickpeas."
+    assert recipe["total_time"] == 65
+    assert recipe["yields"] == "4 servings"
+    assert recipe["host"] == "www.example.com"
+    assert recipe["language"] == "en"
+
+
+def test_extract_recipe_without_json_ld_falls_back():
+    assert extract_recipe("<html><body><h1>Curry</h1></body></html>", "https://example.com") is None
@@ -0,0 +1,19 @@
+import json
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+HEAVY_MODULES = ["google.generativeai", "recipe_scrapers", "duckduckgo_search", "requests", "pika", "numpy"]
+
+
+def test_service_entry_point_does_not_import_heavy_modules():
+    probe = (
+        "import sys, json, workflow_consumer; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    assert json.loads(result.stdout) == []
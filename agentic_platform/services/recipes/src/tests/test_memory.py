@@ -0,0 +1,112 @@
+import asyncio
+import contextvars
+from unittest.mock import AsyncMock, patch
+
+from src.checkpoints import WorkflowCheckpointStore
+from src.local_store import LocalStore
+from src.memory import MemoryAccounting, current_workflow
+from src.recipe_scraper_step import RecipeScraperWorkflowStep
+from src.tests.test_checkpoints import make_metrics, make_recipe
+
+
+def test_accounting_attributes_held_bytes_to_workflow_and_stage():
+    accounting = MemoryAccounting()
+    seen = {}
+
+    def parse():
+        with accounting.hold("llm.response", 300):
+            seen["during"] = accounting.snapshot()
+
+    async def scenario():
+        with accounting.workflow("wf-1"):
+            with accounting.hold("scrape.html", 1000):
+                await asyncio.get_running_loop().run_in_executor(
+                    None, contextvars.copy_context().run, parse
+                )
+
+    asyncio.run(scenario())
+
+    during = seen["during"]
+    assert during["held_bytes"] == 1300
+    assert during["workflows"]["wf-1"]["stages"] == {"scrape.html": 1000, "llm.response": 300}
+    after = accounting.snapshot()
+    assert after["held_bytes"] == 0 and after["workflows"] == {}
+    assert after["stages"]["scrape.html"] == {"held_bytes": 0, "holds": 0, "peak_bytes": 1000}
+    assert after["finished_workflow_peak_bytes"]["max"] == 1300
+    assert current_workflow.get() is None
+
+
+def test_pages_are_capped_and_released_before_the_llm_call():
+    accounting = MemoryAccounting()
+    step = RecipeScraperWorkflowStep(model=object(), domain_stats=None)
+    step.max_pages_in_memory = 2
+    step.near_duplicate_detection = False
+    pages = {"open": 0, "max": 0}
+    held_during_llm = []
+
+    async def fetch(url, session=None):
+        pages["open"] += 1
+        pages["max"] = max(pages["max"], pages["open"])
+        await asyncio.sleep(0.01)
+        return "<html>" + "x" * 5000
+
+    def extract(html, url):
+        pages["open"] -= 1
+        return {"name": "Curry", "ingredients": ["2 tbsp curry paste", "400 ml coconut milk"]}
+
+    def parse(recipe_json, url):
+        held_during_llm.append(accounting.snapshot()["workflows"][current_workflow.get()]["stages"])
+        return {"recipe": {}, "ingredients": []}
+
+    step._fetch_html = fetch
+    step._extract_recipe_json = extract
+    step._parse_with_llm = parse
+
+    async def scrape(i):
+        with accounting.workflow(f"wf-{i}"):
+            return await step._try_gemini_scrape(f"https://example.com/{i}")
+
+    async def scenario():
+        with patch("src.recipe_scraper_step.memory_accounting", accounting):
+            return await asyncio.gather(*(scrape(i) for i in range(6)))
+
+    results = asyncio.run(scenario())
+
+    assert results == [{"recipe": {}, "ingredients": []}] * 6
+    assert pages["max"] == 2
+    assert accounting.snapshot()["stages"]["scrape.html"]["peak_bytes"] == 5006
+    # Each workflow has released its page by the time its LLM call runs
+    # The serialized recipe is accounted, not the number of keys in the dict
+    assert held_during_llm == [{"scrape.recipe_json": 79}] * 6
+
+
+def test_finished_workflows_release_intermediates_and_are_retired(tmp_path, monkeypatch):
+    monkeypatch.setenv("RECIPE_STATE_DIR", str(tmp_path))
+    monkeypatch.setenv("WORKFLOW_INSTANCE_RETENTION", "2")
+    from src import workflow_orchestrator
+
+    orchestrator = workflow_orchestrator.WorkflowOrchestrator()
+    orchestrator.checkpoints = WorkflowCheckpointStore(LocalStore(str(tmp_path / "state.db")))
+    orchestrator._publish_metrics = AsyncMock()
+    orchestrator.save_recipes = AsyncMock()
+
+    async def fake_scrape(urls, on_result=None):
+        for url in urls:
+            on_result(url, (make_recipe(url), make_metrics(url)))
+
+    orchestrator.scraperStep.scrape_recipes = fake_scrape
+    workflow_ids = []
+    for query in ["curry", "soup", "stew"]:
+        url = f"https://example.com/{query}"
+        with patch.object(orchestrator, "_search_ranked_urls", return_value=([url], make_metrics(url)[0])):
+            workflow_ids.append(
+                asyncio.run(
+                    orchestrator.initiate_workflow("recipe_workflow_full", {"search_query": query})
+                )
+            )
+
+    assert list(orchestrator.workflow_instances) == workflow_ids[1:]
+    latest = orchestrator.workflow_instances[workflow_ids[-1]]
+    assert latest["status"] == "completed"
+    assert latest["context_data"] == {}
+    assert latest["summary"] == {"recipe_urls": 1, "scraped": 1, "saved": 0}
@@ -0,0 +1,68 @@
+from src.near_duplicates import NearDuplicateIndex
+
+BANANA_BREAD = {
+    "title": "Banana Bread",
+    "ingredients": [
+        "3 ripe bananas, mashed",
+        "75 g butter, melted",
+        "150 g sugar",
+        "1 egg, beaten",
+        "1 tsp vanilla extract",
+        "1 tsp baking soda",
+        "190 g all-purpose flour",
+    ],
+    "instructions": (
+        "Preheat the oven to 175C and butter a loaf pan. Mix the butter into the "
+        "mashed bananas. Mix in baking soda, sugar, egg and vanilla, then the flour. "
+        "Bake for 60 minutes and cool on a rack."
+    ),
+}
+
+
+def test_syndicated_copy_is_detected(tmp_path):
+    index = NearDuplicateIndex(path=str(tmp_path / "lsh.db"))
+    copy = dict(BANANA_BREAD, title="Banana Bread | Syndicated Kitchen")
+
+    assert index.check_and_add(BANANA_BREAD, "https://a.example/banana-bread") is None
+    index.confirm("https://a.example/banana-bread")
+    duplicate_of, similarity = index.check_and_add(copy, "https://b.example/bread")
+
+    assert duplicate_of == "https://a.example/banana-bread"
+    assert similarity >= index.threshold
+
+
+def test_same_url_and_different_recipes_are_not_duplicates(tmp_path):
+    index = NearDuplicateIndex(path=str(tmp_path / "lsh.db"))
+    chickpea_curry = {
+        "title": "Chickpea Curry",
+        "ingredients": ["2 cans chickpeas", "1 onion", "400 ml coconut milk", "2 tbsp curry paste"],
+        "instructions": "Fry the onion with the curry paste, add chickpeas and coconut milk, simmer 20 minutes.",
+    }
+
+    assert index.check_and_add(BANANA_BREAD, "https://a.example/banana-bread") is None
+    assert index.check_and_add(BANANA_BREAD, "https://a.example/banana-bread") is None
+    assert index.check_and_add(chickpea_curry, "https://a.example/curry") is None
+
+
+def test_removed_recipe_is_no_longer_matched(tmp_path):
+    path = str(tmp_path / "lsh.db")
+    index = NearDuplicateIndex(path=path)
+    index.check_and_add(BANANA_BREAD, "https://a.example/banana-bread")
+    index.confirm("https://a.example/banana-bread")
+    index.remove("https://a.example/banana-bread")
+
+    # The index is persistent: a fresh instance sees the same state
+    assert NearDuplicateIndex(path=path).check_and_add(BANANA_BREAD, "https://b.example/bread") is None
+
+
+def test_unsaved_recipe_does_not_shadow_later_copies(tmp_path):
+    index = NearDuplicateIndex(path=str(tmp_path / "lsh.db"))
+    copy = dict(BANANA_BREAD, title="Banana Bread | Syndicated Kitchen")
+
+    # Scraped but never saved (LLM failure, cancellation, failed save)
+    assert index.check_and_add(BANANA_BREAD, "https://a.example/banana-bread") is None
+    assert index.check_and_add(copy, "https://b.example/bread") is None
+
+    index.confirm("https://b.example/bread")
+    index.release("https://b.example/bread")
+    assert index.check_and_add(BANANA_BREAD, "https://c.example/bread")[0] == "https://b.example/bread"
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+from src.profiling import SamplingProfiler, StageTimings, stage_timings, timed_stage
+
+
+def test_stage_timings_snapshot_percentiles():
+    timings = StageTimings(window=100)
+    for duration in range(1, 101):
+        timings.record("scraper.fetch", duration / 100)
+
+    snapshot = timings.snapshot()["scraper.fetch"]
+    assert snapshot["count"] == 100
+    assert snapshot["max"] == 1.0
+    assert 0.49 <= snapshot["p50"] <= 0.51
+    assert 0.94 <= snapshot["p95"] <= 0.96
+
+
+def test_timed_stage_records_sync_and_async():
+    stage_timings.reset()
+
+    @timed_stage("test.sync")
+    def sync_step():
+        return "sync"
+
+    @timed_stage("test.async")
+    async def async_step():
+        await asyncio.sleep(0.01)
+        return "async"
+
+    assert sync_step() == "sync"
+    assert asyncio.run(async_step()) == "async"
+
+    snapshot = stage_timings.snapshot()
+    assert snapshot["test.sync"]["count"] == 1
+    assert snapshot["test.async"]["total"] >= 0.01
+
+
+def test_sampling_profiler_writes_collapsed_stacks(tmp_path):
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    deadline = time.time() + 0.1
+    while time.time() < deadline:
+        sum(range(1000))
+    profiler.stop()
+
+    output = tmp_path / "profile.collapsed"
+    profiler.dump(str(output))
+    lines = output.read_text().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert "test_sampling_profiler_writes_collapsed_stacks" in stack
+    assert int(count) > 0
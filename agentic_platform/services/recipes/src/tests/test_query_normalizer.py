@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+from src.local_store import LocalStore
+from src.query_normalizer import SimilarQueryIndex, canonical_query
+from src.search_agent import search_recipes
+from src.search_providers import SearchRace
+from src.tests.test_search_providers import FakeProvider
+
+
+def test_canonical_query_ignores_case_stop_words_plurals_and_order():
+    assert canonical_query("Chicken Curry") == "chicken curry"
+    assert canonical_query("chicken curry recipe") == "chicken curry"
+    assert canonical_query("Easy Curry Chicken") == "chicken curry"
+    assert canonical_query("chicken curries") == "chicken curry"
+    assert canonical_query("garbanzo bean stew") == "bean chickpea stew"
+    assert canonical_query("chocolate chip cookies") == "chip chocolate cookie"
+    assert canonical_query("the best") == "the best"
+
+
+def test_similar_queries_share_a_group_but_added_terms_do_not():
+    index = SimilarQueryIndex(threshold=0.8)
+    for query in ["vegetable lasagna", "chicken soup", "beef stew", "chicken tikka"]:
+        index.resolve(query)
+
+    assert index.resolve("Vegetable Lasagne")[0] == "lasagna vegetable"
+    assert index.resolve("soup chicken recipe") == ("chicken soup", 1.0)
+    assert index.resolve("chicken curry soup")[0] == "chicken curry soup"
+    assert index.resolve("chicken tinga")[0] == "chicken tinga"
+    assert index.resolve("pork stew")[0] == "pork stew"
+    assert index.resolve("3 ingredient cookies")[0] == "3 cookie ingredient"
+    assert index.resolve("4 ingredient cookies")[0] == "4 cookie ingredient"
+    assert index.stats == {"new": 9, "similar": 1, "exact": 1}
+
+
+def test_index_evicts_least_recently_used_groups():
+    index = SimilarQueryIndex(threshold=0.8, max_queries=2)
+    index.resolve("vegetable lasagna")
+    index.resolve("beef stew")
+    index.resolve("lasagna vegetable")
+    index.resolve("pad thai")
+
+    assert len(index) == 2
+    assert index.stats == {"new": 3, "exact": 1}
+    index.resolve("vegetable lasagna")
+    index.resolve("beef stew")
+    assert index.stats == {"new": 4, "exact": 2}
+
+
+def test_similar_searches_reuse_cached_results_across_exclusions(tmp_path):
+    provider = FakeProvider("fake", [f"https://site{i}.example/pie" for i in range(6)])
+    race = SearchRace([provider], width=1, timeout=5)
+    with patch("src.search_agent.get_search_cache", return_value=LocalStore(str(tmp_path / "s.db"))), \
+            patch("search_providers.get_search_race", return_value=race):
+        first, first_metrics = search_recipes("Apple Pie", num_urls=5)
+        second, second_metrics = search_recipes(
+            "easy apple pies recipe", excluded_domains=["site0.example"], num_urls=3
+        )
+
+    assert provider.calls == 1
+    assert first_metrics.metadata["cache"] == "miss"
+    assert second_metrics.metadata["cache"] == "hit"
+    assert second == [f"https://site{i}.example/pie" for i in (1, 2, 3)]
+
+
+def test_similarity_does_not_depend_on_what_was_indexed_before():
+    cold = SimilarQueryIndex(threshold=0.8)
+    cold.resolve("vegetable lasagna")
+    key, score = cold.resolve("vegetable lasagne")
+
+    warm = SimilarQueryIndex(threshold=0.8)
+    for query in ["vegetable soup", "vegetable curry", "beef lasagna", "vegetable lasagna"]:
+        warm.resolve(query)
+
+    assert key == "lasagna vegetable"
+    assert warm.resolve("vegetable lasagne") == (key, score)
+    cold.resolve("chicken cake")
+    assert cold.resolve("chicken bake")[0] == "bake chicken"
@@ -0,0 +1,75 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+from src.recipe_consumer import RecipeConsumer
+from src.recipe_index import RecipeIndex
+from src.tests.test_workflow_consumer import make_message
+
+
+def make_index(tmp_path) -> RecipeIndex:
+    index = RecipeIndex(str(tmp_path / "recipe_index.db"))
+    index.add("https://a.example/1", "Thai Green Curry", ["chicken", "coconut milk"], "thai curry")
+    index.add("https://b.example/2", "Chickpea Curry", ["chickpeas", "onion"], "vegan curry")
+    index.add("https://c.example/3", "Banana Bread", ["bananas", "flour"], "banana bread")
+    return index
+
+
+def test_coverage_and_search(tmp_path):
+    index = make_index(tmp_path)
+
+    assert index.count_matches("easy curry recipe", 10) == 2
+    assert index.count_matches("curry", 1) == 1
+    assert index.count_matches("chickpeas curry", 10) == 1  # stemmed title match
+    assert index.count_matches('"); DROP TABLE recipes; --', 10) == 0
+    assert [hit["title"] for hit in index.search("coconut")] == ["Thai Green Curry"]
+    assert index.known_urls(["https://a.example/1", "https://new.example/4"]) == {"https://a.example/1"}
+
+    index.add("https://c.example/3", "Banana Walnut Bread", ["bananas", "walnuts"], "banana bread")
+    assert [hit["title"] for hit in index.search("walnuts")] == ["Banana Walnut Bread"]
+    assert index.search("flour") == []
+
+
+@patch("src.recipe_consumer.WorkflowOrchestrator")
+def test_consumer_skips_or_shrinks_covered_workflows(mock_orchestrator_class, tmp_path):
+    orchestrator = mock_orchestrator_class.return_value
+    orchestrator._connect_to_rabbitmq = AsyncMock()
+    orchestrator.initiate_workflow = AsyncMock()
+    orchestrator._publish_metrics = AsyncMock()
+    orchestrator.workflow_instances = {}
+
+    consumer = RecipeConsumer()
+    consumer.recipe_index = make_index(tmp_path)
+    consumer.coalescer.window_seconds = 0
+
+    def send(query: str, count: int):
+        payload = {"search_query": query, "number_of_urls": count}
+        message = make_message(
+            json.dumps({"workflow_type": "recipe_workflow_full", "workflow_payload": payload}).encode()
+        )
+        asyncio.run(consumer.process_message(message))
+        message.ack.assert_awaited_once()
+
+    send("curry", 2)
+    orchestrator.initiate_workflow.assert_not_called()
+    assert orchestrator._publish_metrics.await_args.args[0] == "workflow.served_from_index"
+
+    send("curry", 5)
+    payload = orchestrator.initiate_workflow.await_args.args[1]
+    assert payload["number_of_urls"] == 3
+
+
+def test_indexed_urls_are_not_searched_again_without_domain_ranking(tmp_path, monkeypatch):
+    monkeypatch.setenv("DOMAIN_STATS_ENABLED", "false")
+    from src import workflow_orchestrator
+
+    orchestrator = workflow_orchestrator.WorkflowOrchestrator()
+    orchestrator.recipe_index = make_index(tmp_path)
+    urls = ["https://a.example/1", "https://new.example/4", "https://c.example/3", "https://new.example/5"]
+
+    with patch("src.workflow_orchestrator.search_recipes", return_value=(urls, None)) as search:
+        recipe_urls, _ = orchestrator._search_ranked_urls("curry", [], 2)
+
+    assert orchestrator.scraperStep.domain_stats is None
+    assert search.call_args.kwargs["num_urls"] == 4
+    assert recipe_urls == ["https://new.example/4", "https://new.example/5"]
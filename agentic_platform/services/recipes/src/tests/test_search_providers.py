@@ -0,0 +1,60 @@
+import time
+from typing import List
+
+from src.search_providers import ProviderStats, SearchProvider, SearchRace
+
+
+class FakeProvider(SearchProvider):
+    def __init__(self, name: str, urls: List[str], delay: float = 0.0, error: Exception = None):
+        self.name = name
+        self.urls = urls
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def search(self, query: str, num_results: int) -> List[str]:
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.urls[:num_results]
+
+
+def test_fastest_good_provider_wins_the_race():
+    slow = FakeProvider("slow", ["https://slow.example/a"], delay=2.0)
+    fast = FakeProvider("fast", ["https://a.example/1", "https://b.example/2/"])
+    race = SearchRace([slow, fast], width=2, timeout=5)
+
+    started = time.perf_counter()
+    urls, outcomes = race.search("curry recipe", num_urls=2)
+
+    assert time.perf_counter() - started < 1.0
+    assert urls == ["https://a.example/1", "https://b.example/2/"]
+    assert outcomes == {"fast": {"ok": True, "urls": 2}}
+
+
+def test_results_are_merged_deduplicated_and_filtered():
+    first = FakeProvider("first", ["https://A.example/1/", "https://excluded.example/x"])
+    second = FakeProvider("second", ["https://a.example/1", "https://c.example/3"])
+    race = SearchRace([first, second], width=2, timeout=5)
+
+    urls, _ = race.search("curry recipe", num_urls=5, excluded_domains=["excluded.example"])
+
+    assert sorted(urls) == ["https://A.example/1/", "https://c.example/3"]
+
+
+def test_failing_provider_loses_weight_and_falls_back():
+    stats = ProviderStats()
+    broken = FakeProvider("broken", [], error=RuntimeError("rate limited"))
+    backup = FakeProvider("backup", ["https://a.example/1"])
+    race = SearchRace([broken, backup], stats=stats, width=1, timeout=5)
+    stats.record("backup", 5.0, ok=True)  # slower than an unseen provider
+
+    urls, outcomes = race.search("curry recipe", num_urls=1)
+    assert urls == ["https://a.example/1"]
+    assert outcomes["broken"] == {"ok": False, "error": "RuntimeError"}
+    assert stats.weight("broken") < stats.weight("backup")
+
+    race.search("curry recipe", num_urls=1)
+    assert broken.calls == 1
+    assert backup.calls == 2
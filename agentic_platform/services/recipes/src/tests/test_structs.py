@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from src import structs
+from src.gen_structs import SRC_DIR, generate
+
+
+def test_generated_structs_are_up_to_date():
+    with open(os.path.join(SRC_DIR, "structs.py")) as f:
+        assert f.read() == generate(), "structs.py is stale; run `make structs`"
+
+
+def test_metrics_event_round_trip():
+    event = structs.MetricsEvent(
+        event_type="recipe.saved",
+        timestamp="2025-02-09T06:32:47",
+        metadata={"url": "https://example.com/cake"},
+    )
+
+    decoded = structs.MetricsEvent.decode(event.encode()).validate()
+
+    assert decoded == event
+    assert decoded.metadata == {"url": "https://example.com/cake"}
+
+
+def test_recipe_validate_rejects_bad_fields():
+    recipe = structs.Recipe.from_dict(
+        {
+            "title": "Cake",
+            "instructions": "1. Bake",
+            "prep_time": 10,
+            "cook_time": "20",
+            "total_time": 30,
+            "servings": 8,
+            "source_url": "https://example.com/cake",
+            "ingredients": [{"name": "flour", "quantity": 200, "unit": "g"}],
+        }
+    )
+
+    with pytest.raises(ValueError, match="cook_time"):
+        recipe.validate()
+
+    with pytest.raises(ValueError, match="priority"):
+        structs.WorkflowInitiateMessage(
+            "recipe_workflow_full",
+            structs.WorkflowPayload(search_query="cake"),
+            priority="urgent",
+        ).validate()
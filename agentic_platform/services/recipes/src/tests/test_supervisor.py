@@ -0,0 +1,87 @@
+import time
+from unittest.mock import MagicMock, mock_open, patch
+
+from src import supervisor
+from src.local_store import LocalStore
+
+
+def test_detect_worker_count_uses_explicit_setting(monkeypatch):
+    monkeypatch.setenv("RECIPE_WORKERS", "3")
+    assert supervisor.detect_worker_count() == 3
+
+
+def test_detect_worker_count_rounds_up_cgroup_v2_limit(monkeypatch):
+    monkeypatch.setenv("RECIPE_WORKERS", "auto")
+    with patch("builtins.open", mock_open(read_data="250000 100000\n")):
+        assert supervisor.detect_worker_count() == 3
+
+
+def test_auto_worker_count_ignores_node_cpus_and_is_capped(monkeypatch):
+    monkeypatch.setenv("RECIPE_WORKERS", "auto")
+    with patch("builtins.open", side_effect=OSError):
+        # No CPU limit: the visible CPUs belong to the node, not the pod
+        assert supervisor.detect_worker_count() == 1
+    monkeypatch.setenv("RECIPE_MAX_WORKERS", "4")
+    with patch("builtins.open", mock_open(read_data="3200000 100000\n")):
+        assert supervisor.detect_worker_count() == 4
+
+
+def test_health_requires_fresh_ready_heartbeats(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.db")
+    store = LocalStore(path)
+    # The supervisor opens its own short-lived connections
+    monkeypatch.setattr(supervisor, "LocalStore", lambda: LocalStore(path))
+    worker_supervisor = supervisor.WorkerSupervisor(worker_count=2)
+    worker_supervisor._workers = {
+        0: MagicMock(pid=100, is_alive=MagicMock(return_value=True)),
+        1: MagicMock(pid=101, is_alive=MagicMock(return_value=True)),
+    }
+
+    now = time.time()
+    store.set(supervisor.HEARTBEAT_NAMESPACE, "0", {"ready": True, "in_flight": 2, "timestamp": now})
+    store.set(supervisor.HEARTBEAT_NAMESPACE, "1", {"ready": True, "in_flight": 1, "timestamp": now - 60})
+    health = worker_supervisor.health()
+    assert health["ready"] is False
+    assert health["in_flight"] == 3
+
+    store.set(supervisor.HEARTBEAT_NAMESPACE, "1", {"ready": True, "in_flight": 1, "timestamp": now})
+    assert worker_supervisor.health()["ready"] is True
+
+
+def test_admin_port_serves_pod_readiness_and_every_workers_metrics(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.db")
+    store = LocalStore(path)
+    # The supervisor opens its own short-lived connections
+    monkeypatch.setattr(supervisor, "LocalStore", lambda: LocalStore(path))
+    worker_supervisor = supervisor.WorkerSupervisor(worker_count=2)
+    worker_supervisor._workers = {
+        0: MagicMock(pid=100, is_alive=MagicMock(return_value=True)),
+        1: MagicMock(pid=101, is_alive=MagicMock(return_value=True)),
+    }
+    store.set(supervisor.HEARTBEAT_NAMESPACE, "0", {"ready": True, "timestamp": time.time()})
+    admin = supervisor.SupervisorAdminServer(worker_supervisor, port=0)
+    worker_metrics = {
+        0: '# HELP recipe_ready Ready.\n# TYPE recipe_ready gauge\nrecipe_ready 1\n'
+        '# HELP recipe_consumer_in_flight In flight.\n# TYPE recipe_consumer_in_flight gauge\n'
+        'recipe_consumer_in_flight{lane="interactive"} 2\n',
+        1: '# HELP recipe_ready Ready.\n# TYPE recipe_ready gauge\nrecipe_ready 0\n',
+    }
+    admin.scrape_worker = worker_metrics.get
+
+    assert admin.handle("/healthz")[0] == 200
+    assert admin.handle("/readyz")[0] == 503
+    autoscale = {"backlog": 30, "in_flight": 4, "worker_slots": 8, "service_time_seconds": 10.0}
+    store.set(supervisor.HEARTBEAT_NAMESPACE, "1", {"ready": True, "autoscale": autoscale, "timestamp": time.time()})
+    assert admin.handle("/readyz")[0] == 200
+
+    lines = admin.handle("/metrics")[2].decode().splitlines()
+    assert lines[:4] == [
+        "# HELP recipe_ready Ready.",
+        "# TYPE recipe_ready gauge",
+        'recipe_ready{worker="0"} 1',
+        'recipe_ready{worker="1"} 0',
+    ]
+    assert 'recipe_consumer_in_flight{worker="0",lane="interactive"} 2' in lines
+    assert "recipe_pod_ready 1" in lines
+    assert "recipe_pod_utilization 0.5" in lines and "recipe_pod_in_flight 4" in lines
+    assert supervisor.worker_admin_port(1) == supervisor.admin_port() + 2
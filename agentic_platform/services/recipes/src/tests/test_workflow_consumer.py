@@ -1,91 +1,155 @@
-import pytest
+import asyncio
 import json
-from unittest.mock import patch, MagicMock
-from src import workflow_consumer
-import pika
+from unittest.mock import AsyncMock, MagicMock, patch
 
+from src.metrics_consumer import MetricsConsumer
+from src.recipe_consumer import RecipeConsumer
 
-@pytest.fixture(autouse=True)
-def reset_workflow_initiate_schema():
-    """Fixture to reset workflow_initiate_schema before each test."""
-    workflow_consumer.workflow_initiate_schema = None
 
+def make_message(body: bytes) -> MagicMock:
+    message = MagicMock()
+    message.body = body
+    message.delivery_tag = 1
+    message.ack = AsyncMock()
+    message.nack = AsyncMock()
+    return message
 
-@patch("src.workflow_consumer.search_recipes")
-@patch("pika.BlockingConnection")
-@patch("src.workflow_consumer.load_workflow_initiate_schema")
-def test_process_workflow_command_valid(
-    mock_load_workflow_initiate_schema, mock_blocking_connection, mock_search_recipes
-):
+
+@patch("src.recipe_consumer.WorkflowOrchestrator")
+def test_process_workflow_command_valid(mock_orchestrator_class):
     """Test processing a valid workflow command."""
-    # Mock the load_workflow_initiate_schema function to return a sample schema
-    mock_load_workflow_initiate_schema.return_value = {
-        "type": "object",
-        "properties": {
-            "workflow_type": {"type": "string"},
-            "workflow_payload": {"type": "object"},
-        },
-        "required": ["workflow_type", "workflow_payload"],
+    orchestrator = mock_orchestrator_class.return_value
+    orchestrator._connect_to_rabbitmq = AsyncMock()
+    orchestrator.initiate_workflow = AsyncMock()
+
+    payload = {
+        "search_query": "chocolate cake",
+        "excluded_domains": ["example.com"],
+        "number_of_urls": 2,
     }
-
-    # Mock the search_recipes function to return a sample list of URLs
-    mock_search_recipes.return_value = [
-        "http://example.com/recipe1",
-        "http://example.com/recipe2",
-    ]
-
-    # Sample valid workflow command
     body = json.dumps(
-        {
-            "workflow_type": "recipe_workflow_full",
-            "workflow_payload": {
-                "search_query": "chocolate cake",
-                "excluded_domains": ["example.com"],
-                "number_of_urls": 2,
-            },
-        }
+        {"workflow_type": "recipe_workflow_full", "workflow_payload": payload}
     ).encode("utf-8")
+    message = make_message(body)
 
-    # Mock pika objects
-    mock_channel = MagicMock()
-    mock_connection = MagicMock()
-    mock_connection.channel.return_value = mock_channel
-    mock_blocking_connection.return_value = mock_connection
-    method = pika.spec.Basic.Deliver(delivery_tag=1)  # Mock method
-    properties = pika.spec.BasicProperties()  # Mock properties
-
-    # Call the process_workflow_command function
-    workflow_consumer.process_workflow_command(mock_channel, method, properties, body)
-
-    # Assert that search_recipes was called with the correct arguments
-    mock_search_recipes.assert_called_once_with("chocolate cake", ["example.com"], 2)
+    asyncio.run(RecipeConsumer().process_message(message))
 
-    # Assert that the message was acknowledged
-    mock_channel.basic_ack.assert_called_once_with(delivery_tag=1)
+    orchestrator.initiate_workflow.assert_awaited_once_with(
+        "recipe_workflow_full", payload, None, deadline_seconds=None
+    )
+    message.ack.assert_awaited_once()
+    message.nack.assert_not_called()
 
 
-@patch("pika.BlockingConnection")
-@patch("src.workflow_consumer.search_recipes")
-def test_process_workflow_command_invalid_json(
-    mock_search_recipes, mock_blocking_connection
-):
+@patch("src.recipe_consumer.WorkflowOrchestrator")
+def test_process_workflow_command_invalid_json(mock_orchestrator_class):
     """Test processing an invalid workflow command (invalid JSON)."""
-    # Invalid JSON body
-    body = "invalid json".encode("utf-8")
+    message = make_message("invalid json".encode("utf-8"))
 
-    # Mock pika objects
-    mock_channel = MagicMock()
-    mock_connection = MagicMock()
-    mock_connection.channel.return_value = mock_channel
-    mock_blocking_connection.return_value = mock_connection
-    method = pika.spec.Basic.Deliver(delivery_tag=1)  # Mock method
-    properties = pika.spec.BasicProperties()  # Mock properties
+    asyncio.run(RecipeConsumer().process_message(message))
 
-    # Call the process_workflow_command function
-    workflow_consumer.process_workflow_command(mock_channel, method, properties, body)
+    mock_orchestrator_class.assert_not_called()
+    message.nack.assert_awaited_once_with(requeue=False)
 
-    # Assert that search_recipes was not called
-    mock_search_recipes.assert_not_called()
 
-    # Assert that the message was rejected
-    mock_channel.basic_nack.assert_called_once_with(delivery_tag=1, requeue=False)
+@patch("src.recipe_consumer.WorkflowOrchestrator")
+def test_batch_priority_message_moves_to_batch_queue(mock_orchestrator_class):
+    """Batch-priority messages on the interactive queue are moved to the batch lane."""
+    body = json.dumps(
+        {
+            "workflow_type": "recipe_workflow_full",
+            "workflow_payload": {"search_query": "chocolate cake"},
+            "priority": "batch",
+        }
+    ).encode("utf-8")
+    message = make_message(body)
+    message.routing_key = "workflow_messages"
+    message.headers = {}
+    message.content_type = "application/json"
+    message.correlation_id = "corr-1"
+    message.message_id = "msg-1"
+
+    consumer = RecipeConsumer()
+    consumer.channel = MagicMock()
+    consumer.channel.default_exchange.publish = AsyncMock()
+    asyncio.run(consumer.process_message(message))
+
+    published, = consumer.channel.default_exchange.publish.await_args.args
+    assert published.body == body
+    assert (published.correlation_id, published.message_id) == ("corr-1", "msg-1")
+    assert (
+        consumer.channel.default_exchange.publish.await_args.kwargs["routing_key"]
+        == consumer.batch_queue_name
+    )
+    mock_orchestrator_class.assert_not_called()
+    message.ack.assert_awaited_once()
+
+
+@patch("src.recipe_consumer.WorkflowOrchestrator")
+def test_failed_message_goes_to_retry_tier_then_dead_letter_queue(mock_orchestrator_class):
+    """Failures are retried with growing delays and dead-lettered after max attempts."""
+    orchestrator = mock_orchestrator_class.return_value
+    orchestrator._connect_to_rabbitmq = AsyncMock()
+    orchestrator.initiate_workflow = AsyncMock(side_effect=RuntimeError("api down"))
+    body = json.dumps(
+        {
+            "workflow_type": "recipe_workflow_full",
+            "workflow_payload": {"search_query": "chocolate cake"},
+        }
+    ).encode("utf-8")
+
+    consumer = RecipeConsumer()
+    consumer.channel = MagicMock()
+    consumer.channel.default_exchange.publish = AsyncMock()
+    publish = consumer.channel.default_exchange.publish
+
+    targets = []
+    headers = {}
+    for _ in range(consumer.max_attempts):
+        message = make_message(body)
+        message.routing_key = "workflow_messages"
+        message.headers = headers
+        asyncio.run(consumer.process_message(message))
+        message.ack.assert_awaited_once()
+        message.nack.assert_not_called()
+        published, = publish.await_args.args
+        headers = published.headers
+        targets.append(publish.await_args.kwargs["routing_key"])
+
+    assert targets == [
+        f"workflow_messages.retry.{delay}s" for delay in consumer.retry_delays
+    ] + ["workflow_messages.dlq"]
+    assert headers["x-retry-attempts"] == consumer.max_attempts
+    assert headers["x-original-queue"] == "workflow_messages"
+    assert "api down" in headers["x-last-error"]
+
+
+def test_invalid_metrics_message_is_rejected_without_retries():
+    consumer = MetricsConsumer()
+    consumer.channel = MagicMock()
+    consumer.channel.default_exchange.publish = AsyncMock()
+    message = make_message(json.dumps({"event_type": "recipe.saved"}).encode("utf-8"))
+    message.routing_key = "metrics_queue"
+    message.headers = {}
+
+    asyncio.run(consumer.process_message(message))
+
+    message.nack.assert_awaited_once_with(requeue=False)
+    consumer.channel.default_exchange.publish.assert_not_called()
+
+
+@patch("src.recipe_consumer.WorkflowOrchestrator")
+def test_concurrent_first_deliveries_share_one_orchestrator(mock_orchestrator_class):
+    async def slow_connect():
+        await asyncio.sleep(0.01)
+
+    mock_orchestrator_class.return_value._connect_to_rabbitmq = slow_connect
+    consumer = RecipeConsumer()
+
+    async def scenario():
+        return await asyncio.gather(*(consumer._get_orchestrator() for _ in range(5)))
+
+    orchestrators = asyncio.run(scenario())
+
+    mock_orchestrator_class.assert_called_once()
+    assert all(orchestrator is orchestrators[0] for orchestrator in orchestrators)
@@ -1,37 +1,90 @@
-import pika
-import os
-import json
 import logging
 import asyncio
+import os
+import signal
 
-import uuid
+from dotenv import load_dotenv
 
-from workflow_orchestrator import WorkflowOrchestrator
 from recipe_consumer import RecipeConsumer
 from metrics_consumer import MetricsConsumer
+from admin_server import AdminServer
+from log_config import configure_logging
+from memory import install_memory_tracing
+from profiling import install_profiling
+from readiness import mark_not_ready, mark_ready, warmup
+from supervisor import heartbeat_loop
 
 
 async def main():
-    logging.basicConfig(
-        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-    )
+    load_dotenv()
+    configure_logging()
+    profiler, loop_lag_monitor = install_profiling()
+    memory_tracer = install_memory_tracing()
 
     recipe_consumer = RecipeConsumer()
     metrics_consumer = MetricsConsumer()
+    shutdown_grace_seconds = float(os.environ.get("SHUTDOWN_GRACE_SECONDS", 25))
+
+    shutdown_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, shutdown_event.set)
 
+    admin_server = None
+    if os.environ.get("ADMIN_SERVER_ENABLED", "true").lower() == "true":
+        admin_server = AdminServer(recipe_consumer, metrics_consumer, loop_lag_monitor)
+        try:
+            # Up before warmup so liveness probes answer while the service starts
+            await admin_server.start()
+        except OSError as e:
+            logging.warning(f"Admin server disabled, could not listen: {e}")
+            admin_server = None
+
+    heartbeat_task = None
     try:
-        await recipe_consumer.connect_to_rabbitmq()
-        await metrics_consumer.connect_to_rabbitmq()
+        # Warm up the LLM client and scraper stack while connecting to the broker
+        await asyncio.gather(
+            asyncio.to_thread(warmup),
+            recipe_consumer.connect_to_rabbitmq(),
+            metrics_consumer.connect_to_rabbitmq(),
+        )
+
+        await recipe_consumer.start_consuming()
+        await metrics_consumer.start_consuming()
+        mark_ready()
 
-        asyncio.create_task(recipe_consumer.start_consuming())
-        asyncio.create_task(metrics_consumer.start_consuming())
+        worker_index = os.environ.get("RECIPE_WORKER_INDEX")
+        if worker_index is not None:
+            heartbeat_task = asyncio.create_task(
+                heartbeat_loop(
+                    int(worker_index),
+                    recipe_consumer,
+                    queue_depths=admin_server.queue_depths if admin_server else None,
+                )
+            )
 
-        await asyncio.Future()  # Run forever
+        await shutdown_event.wait()
+        logging.info("Shutdown requested, draining in-flight workflows...")
+        mark_not_ready()
+        await recipe_consumer.stop_consuming()
+        await metrics_consumer.stop_consuming()
+        interrupted = await recipe_consumer.drain(shutdown_grace_seconds)
+        await metrics_consumer.drain(timeout=1.0)
+        logging.info(f"Drain complete, {interrupted} workflows checkpointed and requeued")
     except Exception as e:
         logging.error(f"Main error: {e}")
     finally:
+        mark_not_ready()
+        if heartbeat_task:
+            heartbeat_task.cancel()
         await recipe_consumer.close()
         await metrics_consumer.close()
+        if admin_server:
+            await admin_server.stop()
+        if loop_lag_monitor:
+            await loop_lag_monitor.stop()
+        profiler.stop()
+        memory_tracer.stop()
 
 
 if __name__ == "__main__":
@@ -1,24 +1,25 @@
+import asyncio
 import logging
+from collections import OrderedDict
 from datetime import datetime
 import uuid
 import time
-import pika
 import os
-import json
 from search_agent import search_recipes
 from event_models import WorkflowType, WorkflowPayload
 from recipe_scraper_step import RecipeScraperWorkflowStep
 import aio_pika
-import google.generativeai as genai
-from dotenv import load_dotenv
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Set, Tuple
 from api_client import PantryChefAPIClient
 from models import Recipe
 from event_models import MetricsEvent
-
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel("gemini-2.0-flash", generation_config={"temperature": 0})
+from profiling import stage_timer, timed_stage
+import structs
+from checkpoints import WorkflowCheckpointStore, workflow_checkpoint_key
+from ingredient_index import canonicalize_ingredients
+from deadlines import DeadlineExceeded, WorkflowDeadline
+from recipe_index import get_recipe_index
+from memory import memory_accounting
 
 
 class WorkflowOrchestrator:
@@ -31,6 +32,9 @@ class WorkflowOrchestrator:
         Initializes the WorkflowOrchestrator.
         """
         self.workflow_instances = {}  # In-memory workflow instance storage (for MVP)
+        # Finished instances stay for status lookups until this many newer ones finish
+        self.instance_retention = max(1, int(os.environ.get("WORKFLOW_INSTANCE_RETENTION", 200)))
+        self._finished_instances: "OrderedDict[uuid.UUID, None]" = OrderedDict()
         logging.info("WorkflowOrchestrator initialized.")
 
         # Initialize RabbitMQ connection parameters
@@ -44,37 +48,42 @@ class WorkflowOrchestrator:
         self.connection = None
         self.channel = None
 
-        self.scraperStep = RecipeScraperWorkflowStep(model)
+        # The LLM client is built lazily on the first scrape (see llm.get_model)
+        self.scraperStep = RecipeScraperWorkflowStep()
+        self.checkpoints = WorkflowCheckpointStore()
+        self.recipe_index = get_recipe_index()
 
-    async def _publish_to_metrics_queue(self, message_json):
+    async def _publish_to_metrics_queue(self, body: bytes):
         """
         Publishes a message to the metrics queue.
         """
         try:
             if not self.channel or self.channel.is_closed:
                 await self._connect_to_rabbitmq()
-            channel = await self.connection.channel()
-            await channel.default_exchange.publish(
-                aio_pika.Message(body=message_json.encode()),
+            await self.channel.default_exchange.publish(
+                aio_pika.Message(body=body),
                 routing_key=self.metrics_queue_name,
             )
-            logging.info(f"Sent message to metrics queue: {message_json}")
+            logging.debug("Sent message to metrics queue: %r", body)
         except Exception as e:
-            logging.error(f"Error publishing to metrics queue: {e}")
+            logging.error("Error publishing to metrics queue: %s", e)
 
     async def _publish_metrics(
         self, event_type: str, metadata: dict, workflow_instance: dict | None = None
     ):
         """
         Publishes metrics to the metrics queue.
+
+        Internal hop: events are built as generated transport structs and
+        encoded without pydantic validation (the consumer validates cheaply).
         """
         try:
             if isinstance(workflow_instance, dict):  # Check if it's actually a dict
                 workflow_name = workflow_instance.get("workflow_type", "unknown")
-                message = {
-                    "event_type": f"{workflow_name}.status",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "metadata": {
+                event = structs.MetricsEvent(
+                    event_type=f"{workflow_name}.status",
+                    timestamp=datetime.utcnow().isoformat(),
+                    metadata={
                         "workflow_id": str(workflow_instance.get("workflow_id")),
                         "workflow_type": workflow_instance.get("workflow_type"),
                         "status": workflow_instance.get("status"),
@@ -83,30 +92,25 @@ class WorkflowOrchestrator:
                         "last_updated_timestamp": workflow_instance.get(
                             "last_updated_timestamp"
                         ),
+                        "deadline_seconds": getattr(
+                            workflow_instance.get("deadline"), "seconds", None
+                        ),
+                        "deadline_exceeded_step": workflow_instance.get(
+                            "deadline_exceeded_step"
+                        ),
                     },
-                }
+                )
             else:
-                # Ensure all values in metadata are JSON serializable
-                sanitized_metadata = {}
-                for key, value in metadata.items():
-                    if (
-                        hasattr(value, "__class__")
-                        and value.__class__.__name__ == "HttpUrl"
-                    ):
-                        sanitized_metadata[key] = str(value)
-                    else:
-                        sanitized_metadata[key] = value
-
-                message = {
-                    "event_type": event_type,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "metadata": sanitized_metadata,
-                }
-
-            message_json = json.dumps(message)
-            await self._publish_to_metrics_queue(message_json)
+                # Non-JSON values (e.g. HttpUrl) are encoded as strings
+                event = structs.MetricsEvent(
+                    event_type=event_type,
+                    timestamp=datetime.utcnow().isoformat(),
+                    metadata=metadata,
+                )
+
+            await self._publish_to_metrics_queue(event.encode())
         except Exception as e:
-            logging.error(f"Error publishing metrics: {e}", exc_info=True)
+            logging.error("Error publishing metrics: %s", e, exc_info=True)
 
     async def _connect_to_rabbitmq(self):
         """Connects to RabbitMQ using aio_pika."""
@@ -130,11 +134,9 @@ class WorkflowOrchestrator:
                     "x-overflow": "reject-publish",
                 },
             )
-            logging.info(
-                f"Connected to RabbitMQ and declared queue: {self.metrics_queue_name}"
-            )
+            logging.info("Connected to RabbitMQ and declared queue: %s", self.metrics_queue_name)
         except Exception as e:
-            logging.error(f"Error connecting to RabbitMQ: {e}")
+            logging.error("Error connecting to RabbitMQ: %s", e)
             if self.channel and not self.channel.is_closed:
                 await self.channel.close()
             if self.connection and not self.connection.is_closed:
@@ -142,12 +144,26 @@ class WorkflowOrchestrator:
             raise
 
     async def initiate_workflow(
-        self, workflow_type: WorkflowType, workflow_payload: WorkflowPayload
+        self,
+        workflow_type: WorkflowType,
+        workflow_payload: WorkflowPayload,
+        workflow_id: Optional[uuid.UUID] = None,
+        deadline_seconds: Optional[float] = None,
     ):
         """
         Initiates a new workflow instance.
+
+        If a checkpoint exists for this workflow (it was interrupted during a
+        previous delivery), the workflow resumes from it. The workflow must
+        finish within `deadline_seconds` (default WORKFLOW_DEADLINE_SECONDS).
         """
-        workflow_id = uuid.uuid4()
+        checkpoint_key = workflow_checkpoint_key(
+            workflow_type, workflow_payload, workflow_id
+        )
+        workflow_id = uuid.UUID(str(workflow_id)) if workflow_id else uuid.uuid4()
+        context_data = self.checkpoints.load(checkpoint_key) or {}
+        if context_data:
+            logging.info("Resuming workflow %s from checkpoint %s", workflow_id, checkpoint_key)
         workflow_instance = {
             "workflow_id": workflow_id,
             "workflow_type": workflow_type,
@@ -156,39 +172,120 @@ class WorkflowOrchestrator:
             "current_step": "init",
             "start_timestamp": datetime.now().isoformat(),
             "last_updated_timestamp": datetime.now().isoformat(),
-            "context_data": {},
+            "checkpoint_key": checkpoint_key,
+            "context_data": context_data,
+            "deadline": WorkflowDeadline(deadline_seconds),
+            "deadline_exceeded_step": None,
         }
         self.workflow_instances[workflow_id] = workflow_instance
+        self._finished_instances.pop(workflow_id, None)
         logging.info(
-            f"Initiating workflow: workflow_id={workflow_id}, workflow_type={workflow_type}"
-        )
-        logging.info(
-            f"Workflow {workflow_id} initiated: type={workflow_type}, status=pending"
+            "Initiating workflow: workflow_id=%s, workflow_type=%s",
+            workflow_id,
+            workflow_type,
         )
 
         # Start the workflow execution
-        await self._execute_workflow(workflow_id)
+        try:
+            await self._execute_workflow(workflow_id)
+        finally:
+            self._release_intermediates(workflow_instance)
+            self._retire_instance(workflow_id)
         return workflow_id
 
+    def _release_intermediates(self, workflow_instance: Dict[str, Any]):
+        """
+        Drops the workflow's search results, scraped recipes and saved URLs
+        once it has finished (a resumable workflow has checkpointed them by
+        then), keeping only their counts on the instance.
+        """
+        context_data = workflow_instance["context_data"]
+        workflow_instance["summary"] = {
+            "recipe_urls": len(context_data.get("recipe_search_results") or ()),
+            "scraped": len(context_data.get("scraped_by_url") or ()),
+            "saved": len(context_data.get("saved_urls") or ()),
+        }
+        workflow_instance["context_data"] = {}
+
+    def _retire_instance(self, workflow_id: uuid.UUID):
+        """Forgets the oldest finished instances beyond instance_retention."""
+        self._finished_instances[workflow_id] = None
+        while len(self._finished_instances) > self.instance_retention:
+            retired, _ = self._finished_instances.popitem(last=False)
+            self.workflow_instances.pop(retired, None)
+
     async def _execute_workflow(self, workflow_id: uuid.UUID):
         """
         Executes the workflow steps based on the workflow type.
         """
         workflow_instance = self.workflow_instances.get(workflow_id)
         if not workflow_instance:
-            logging.error(f"Workflow instance not found: {workflow_id}")
+            logging.error("Workflow instance not found: %s", workflow_id)
             return
 
         workflow_type = workflow_instance["workflow_type"]
-        logging.info(
-            f"Processing '{workflow_type}' workflow: workflow_id={workflow_id}"
-        )
+        logging.info("Processing '%s' workflow: workflow_id=%s", workflow_type, workflow_id)
 
         if workflow_type == "recipe_workflow_full":
-            await self._execute_recipe_workflow_full(workflow_id)
+            with memory_accounting.workflow(str(workflow_id)):
+                await self._execute_recipe_workflow_full(workflow_id)
         else:
-            logging.warning(f"Unknown workflow type: {workflow_type}")
+            logging.warning("Unknown workflow type: %s", workflow_type)
 
+    def _search_ranked_urls(
+        self, search_query: str, excluded_domains: List[str], number_of_urls: int
+    ) -> Tuple[List[str], MetricsEvent]:
+        """
+        Searches with chronically failing domains excluded, then keeps the
+        `number_of_urls` candidates with the best expected recipes per second
+        of fetching (see domain_stats). Candidates already in the recipe index
+        are dropped either way.
+        """
+        domain_stats = self.scraperStep.domain_stats
+        if domain_stats is None and self.recipe_index is None:
+            return search_recipes(
+                search_query=search_query,
+                excluded_domains=excluded_domains,
+                num_urls=number_of_urls,
+            )
+
+        failing_domains = []
+        if domain_stats is not None:
+            try:
+                failing_domains = [
+                    domain for domain in domain_stats.excluded_domains() if domain not in excluded_domains
+                ]
+            except Exception as e:
+                logging.warning("Could not read domain exclusions: %s", e)
+            if failing_domains:
+                logging.info("Temporarily excluding failing domains: %s", failing_domains)
+
+        # Extra candidates make up for the ones ranked out or already indexed
+        candidate_factor = int(os.environ.get("DOMAIN_RANKING_CANDIDATE_FACTOR", 2))
+        recipe_urls, search_metrics = search_recipes(
+            search_query=search_query,
+            excluded_domains=list(excluded_domains) + failing_domains,
+            num_urls=number_of_urls * candidate_factor,
+        )
+        if domain_stats is not None:
+            try:
+                recipe_urls = domain_stats.rank_urls(recipe_urls)
+            except Exception as e:
+                logging.warning("Could not rank search results: %s", e)
+        return self._drop_indexed_urls(recipe_urls)[:number_of_urls], search_metrics
+
+    def _drop_indexed_urls(self, urls: List[str]) -> List[str]:
+        """Skips candidates whose recipe was already ingested on this node."""
+        if self.recipe_index is None:
+            return urls
+        try:
+            known = self.recipe_index.known_urls(urls)
+        except Exception as e:
+            logging.warning("Could not check recipe index: %s", e)
+            return urls
+        return [url for url in urls if url not in known]
+
+    @timed_stage("workflow.total")
     async def _execute_recipe_workflow_full(self, workflow_id: uuid.UUID):
         """
         Executes the steps for the 'recipe_workflow_full' workflow.
@@ -198,38 +295,51 @@ class WorkflowOrchestrator:
         workflow_type = workflow_instance["workflow_type"]
 
         if not workflow_instance:
-            logging.error(f"Workflow instance not found: {workflow_id}")
+            logging.error("Workflow instance not found: %s", workflow_id)
             return
 
-        try:
-            # Step 1: Recipe Search
-            logging.info(f"Executing recipe search step: workflow_id={workflow_id}")
-            search_query = workflow_instance["payload"].get("search_query")
-            excluded_domains = workflow_instance["payload"].get("excluded_domains", [])
-            number_of_urls = workflow_instance["payload"].get("number_of_urls", 10)
-            recipe_urls, search_metrics = search_recipes(
-                search_query=search_query,
-                excluded_domains=excluded_domains,
-                num_urls=number_of_urls,
-            )
-            workflow_instance["context_data"]["recipe_search_results"] = recipe_urls
-            workflow_instance["current_step"] = "recipe_search"
-            workflow_instance["status"] = "recipe_search_completed"
-            workflow_instance["last_updated_timestamp"] = datetime.now().isoformat()
+        context_data = workflow_instance["context_data"]
+        search_query = workflow_instance["payload"].get("search_query")
+        deadline: WorkflowDeadline = workflow_instance["deadline"]
 
-            # Publish search metrics
-            await self._publish_metrics(
-                "recipe.search_completed",
-                {
-                    "recipe_urls": recipe_urls,
-                    "duration": search_metrics.duration,
-                    "attempts": search_metrics.metadata.get("attempts", 1),
-                },
-                workflow_instance,
-            )
-            logging.info(
-                f"Recipe search completed: workflow_id={workflow_id}, found {len(recipe_urls)} recipes"
-            )
+        try:
+            # Step 1: Recipe Search (skipped when resuming from a checkpoint)
+            recipe_urls = context_data.get("recipe_search_results")
+            if recipe_urls is None:
+                logging.info("Executing recipe search step: workflow_id=%s", workflow_id)
+                excluded_domains = workflow_instance["payload"].get(
+                    "excluded_domains", []
+                )
+                number_of_urls = workflow_instance["payload"].get("number_of_urls", 10)
+                async with deadline.step("search"):
+                    with stage_timer("workflow.search"):
+                        # Search blocks on network I/O; run it off the event loop
+                        recipe_urls, search_metrics = await asyncio.to_thread(
+                            self._search_ranked_urls,
+                            search_query,
+                            excluded_domains,
+                            number_of_urls,
+                        )
+                context_data["recipe_search_results"] = recipe_urls
+                workflow_instance["current_step"] = "recipe_search"
+                workflow_instance["status"] = "recipe_search_completed"
+                workflow_instance["last_updated_timestamp"] = datetime.now().isoformat()
+
+                # Publish search metrics
+                await self._publish_metrics(
+                    "recipe.search_completed",
+                    {
+                        "recipe_urls": recipe_urls,
+                        "duration": search_metrics.duration,
+                        "attempts": search_metrics.metadata.get("attempts", 1),
+                    },
+                    workflow_instance,
+                )
+                logging.info(
+                    "Recipe search completed: workflow_id=%s, found %s recipes",
+                    workflow_id,
+                    len(recipe_urls),
+                )
 
             # Step 2: Recipe Scraping
             workflow_instance["current_step"] = "recipe_scraping"
@@ -238,12 +348,26 @@ class WorkflowOrchestrator:
             await self._publish_metrics(
                 "recipe.scraping_started", {}, workflow_instance
             )
-            logging.info(
-                f"Starting parallel recipe scraping: workflow_id={workflow_id}"
-            )
-
-            scraped_recipes = await self.scraperStep.scrape_recipes(recipe_urls)
-            workflow_instance["context_data"]["scraped_recipes"] = scraped_recipes
+            logging.info("Starting parallel recipe scraping: workflow_id=%s", workflow_id)
+
+            # URLs finished in an earlier, interrupted delivery are not re-scraped
+            scraped_by_url = context_data.setdefault("scraped_by_url", {})
+            pending_urls = [url for url in recipe_urls if url not in scraped_by_url]
+
+            def record_result(url, result):
+                scraped_by_url[url] = result
+
+            try:
+                async with deadline.step("scrape"):
+                    with stage_timer("workflow.scrape"):
+                        await self.scraperStep.scrape_recipes(
+                            pending_urls, on_result=record_result
+                        )
+            except DeadlineExceeded as e:
+                # Save whatever finished in time rather than failing the workflow
+                await self._report_deadline_exceeded(workflow_instance, e)
+            scraped_recipes = list(scraped_by_url.values())
+            context_data["scraped_recipes"] = scraped_recipes
             workflow_instance["status"] = "recipe_scraping_completed"
             workflow_instance["last_updated_timestamp"] = datetime.now().isoformat()
             await self._publish_metrics(
@@ -256,11 +380,15 @@ class WorkflowOrchestrator:
             workflow_instance["current_step"] = "save_recipes_api"
             workflow_instance["status"] = "save_recipes_api_pending"
             workflow_instance["last_updated_timestamp"] = datetime.now().isoformat()
-            await self.save_recipes(
-                scraped_recipes=scraped_recipes,
-                workflow_id=workflow_id,
-                search_query=search_query,
-            )
+            async with deadline.step("save"):
+                await self.save_recipes(
+                    scraped_recipes=scraped_recipes,
+                    workflow_id=workflow_id,
+                    search_query=search_query,
+                    saved_urls=context_data.setdefault("saved_urls", set()),
+                    deadline=deadline,
+                )
+            self.checkpoints.delete(workflow_instance["checkpoint_key"])
 
             # Workflow Completion
             workflow_instance["status"] = "completed"
@@ -274,9 +402,23 @@ class WorkflowOrchestrator:
                 workflow_instance,
             )
 
-            logging.info(
-                f"Workflow '{workflow_type}' completed: workflow_id={workflow_id}"
-            )
+            logging.info("Workflow '%s' completed: workflow_id=%s", workflow_type, workflow_id)
+
+        except DeadlineExceeded as e:
+            # Keep the finished work so a resubmitted request resumes from it
+            workflow_instance["status"] = "deadline_exceeded"
+            self.checkpoints.save(workflow_instance["checkpoint_key"], context_data)
+            await self._report_deadline_exceeded(workflow_instance, e)
+            await self._publish_metrics("workflow.deadline_exceeded", {}, workflow_instance)
+
+        except asyncio.CancelledError:
+            # Shutdown drain deadline hit: keep the finished work for the redelivery
+            workflow_instance["status"] = "interrupted"
+            workflow_instance["last_updated_timestamp"] = datetime.now().isoformat()
+            self.checkpoints.save(workflow_instance["checkpoint_key"], context_data)
+            await self._publish_metrics("workflow.interrupted", {}, workflow_instance)
+            logging.warning("Workflow %s interrupted and checkpointed", workflow_id)
+            raise
 
         except Exception as e:
             workflow_instance["status"] = "failed"
@@ -286,13 +428,64 @@ class WorkflowOrchestrator:
             await self._publish_metrics(
                 "workflow.failed", {"error": str(e)}, workflow_instance
             )
-            logging.error(f"Error executing workflow {workflow_id}: {e}", exc_info=True)
+            logging.error("Error executing workflow %s: %s", workflow_id, e, exc_info=True)
 
+    async def _report_deadline_exceeded(
+        self, workflow_instance: Dict[str, Any], error: DeadlineExceeded
+    ):
+        deadline: WorkflowDeadline = workflow_instance["deadline"]
+        workflow_instance["deadline_exceeded_step"] = error.step
+        workflow_instance["last_updated_timestamp"] = datetime.now().isoformat()
+        await self._publish_metrics(
+            "workflow.deadline_exceeded",
+            {
+                "workflow_id": str(workflow_instance["workflow_id"]),
+                "step": error.step,
+                "step_budget": round(error.budget, 3),
+                "deadline_seconds": deadline.seconds,
+                "elapsed": round(deadline.elapsed(), 3),
+            },
+            None,
+        )
+        logging.warning(
+            "Workflow %s exceeded its deadline in step '%s'",
+            workflow_instance['workflow_id'],
+            error.step,
+        )
+
+    def _prepare_recipe(self, recipe: Recipe, search_query: str) -> Dict[str, Any]:
+        """
+        Canonicalizes ingredient names and builds the API payload. May refresh
+        the ingredient lexicon from the API, so it runs in a worker thread.
+        """
+        canonicalize_ingredients(recipe)
+        # Use model_dump() instead of model_dump_json() to get dict
+        recipe_dict = recipe.model_dump()
+        recipe_dict["created_from_query"] = search_query
+        return recipe_dict
+
+    def _index_saved_recipe(self, recipe: Recipe, saved_recipe: Dict[str, Any], search_query: str):
+        if self.recipe_index is None:
+            return
+        try:
+            self.recipe_index.add(
+                source_url=str(recipe.source_url),
+                title=recipe.title,
+                ingredients=[ingredient.name for ingredient in recipe.ingredients],
+                created_from_query=search_query,
+                recipe_id=str(saved_recipe.get("id")) if saved_recipe else None,
+            )
+        except Exception as e:
+            logging.warning("Could not index saved recipe %s: %s", recipe.source_url, e)
+
+    @timed_stage("workflow.save")
     async def save_recipes(
         self,
         scraped_recipes: List[Tuple[Recipe | None, List[MetricsEvent]]],
         workflow_id: uuid.UUID,
         search_query: str,
+        saved_urls: Optional[Set[str]] = None,
+        deadline: Optional[WorkflowDeadline] = None,
     ) -> None:
         """
         Save successfully scraped recipes to database through API
@@ -300,7 +493,13 @@ class WorkflowOrchestrator:
         Args:
             scraped_recipes: List of tuples containing (Recipe | None, List[MetricsEvent])
                             where Recipe is None if scraping failed
+            saved_urls: Source URLs already saved by this workflow; they are
+                        skipped, and newly saved URLs are added to the set
+            deadline: Bounds each API request by the time the workflow has left
         """
+        if saved_urls is None:
+            saved_urls = set()
+
         try:
             api_client = PantryChefAPIClient()
 
@@ -308,15 +507,30 @@ class WorkflowOrchestrator:
                 if recipe is None:
                     # Skip failed recipes but log the failure
                     logging.warning(
-                        f"Skipping failed recipe: {metrics[0].metadata.get('url', 'Unknown URL')}"
+                        "Skipping failed recipe: %s",
+                        metrics[0].metadata.get('url', 'Unknown URL'),
                     )
                     continue
 
+                if recipe.source_url in saved_urls:
+                    continue
+
+                # The near-duplicate fingerprint is keyed by the URL that was scraped
+                scraped_url = (
+                    metrics[0].metadata.get("url", recipe.source_url) if metrics else recipe.source_url
+                )
                 try:
-                    # Use model_dump() instead of model_dump_json() to get dict
-                    recipe_dict = recipe.model_dump()
-                    recipe_dict["created_from_query"] = search_query
-                    saved_recipe = api_client.create_recipe(recipe_dict)
+                    recipe_dict = await asyncio.to_thread(self._prepare_recipe, recipe, search_query)
+                    # Off the event loop. The save step's deadline only cancels the
+                    # await, not the request in its thread, so the request carries
+                    # its own timeout from the time the workflow has left
+                    timeout = max(0.1, deadline.remaining()) if deadline is not None else 30
+                    saved_recipe = await asyncio.to_thread(
+                        api_client.create_recipe, recipe_dict, timeout
+                    )
+                    saved_urls.add(recipe.source_url)
+                    self.scraperStep.confirm_near_duplicate(scraped_url)
+                    self._index_saved_recipe(recipe, saved_recipe, search_query)
 
                     await self._publish_metrics(
                         "recipe.saved",
@@ -328,10 +542,12 @@ class WorkflowOrchestrator:
                         None,
                     )
 
+                except asyncio.CancelledError:
+                    self.scraperStep.release_near_duplicate(scraped_url)
+                    raise
                 except Exception as e:
-                    logging.error(
-                        f"Failed to save recipe from {recipe.source_url}: {e}"
-                    )
+                    self.scraperStep.release_near_duplicate(scraped_url)
+                    logging.error("Failed to save recipe from %s: %s", recipe.source_url, e)
                     await self._publish_metrics(
                         "recipe.save_failed",
                         {
@@ -345,7 +561,7 @@ class WorkflowOrchestrator:
                     continue
 
         except Exception as e:
-            logging.error(f"Fatal error in save_recipe: {e}")
+            logging.error("Fatal error in save_recipe: %s", e)
             await self._publish_metrics(
                 "recipe.save_batch_failed",
                 {"error": str(e), "workflow_id": str(workflow_id)},
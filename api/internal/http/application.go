@@ -128,9 +128,12 @@ func (app *application) Mount() *chi.Mux {
 
 			// Internal recipes endpoints for service communication
 			r.Post("/internal/recipes", recipeHandler.Create)
+			// Ingredient list used by the recipe service's canonical ingredient index
+			r.Get("/internal/ingredients", ingredientHandler.List)
 			app.logger.Info("Internal routes configured",
 				"paths", []string{
 					"POST /api/v1/internal/recipes",
+					"GET /api/v1/internal/ingredients",
 				})
 		})
 